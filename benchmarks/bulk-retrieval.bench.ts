@@ -0,0 +1,207 @@
+/**
+ * Compares the round trips and latency of the two ways `getMultipleObjectsBulk()` in
+ * `lib/fetch-request.ts` can retrieve objects by their paths: one GET search per group of paths
+ * that fits in a URL, or POST searches carrying up to 1000 paths each in their bodies. Both run
+ * the real `FetchRequest` against a local stub of the data provider's `/search-quick/` endpoint
+ * that adds a fixed delay to every request, standing in for the network and search time of a real
+ * round trip. `FetchRequest` imports the Next.js runtime config, so this runs under Jest like the
+ * unit tests, but only when named explicitly:
+ *
+ *   $ LATENCY=25 REPEAT=5 npx jest --coverage=false \
+ *       --testMatch '**\/benchmarks/bulk-retrieval.bench.ts'
+ *
+ * Set `JSON=1` to print the results as JSON.
+ *
+ * @jest-environment node
+ */
+
+// node_modules
+import { createServer, type Server } from "node:http";
+import { type AddressInfo } from "node:net";
+import { setConfig } from "next/config";
+
+// Turned on for the POST method only, as the BULK_SEARCH_POST environment variable would.
+let mockBulkSearchPostEnabled = false;
+jest.mock("../lib/constants", () => ({
+  ...jest.requireActual("../lib/constants"),
+  get BULK_SEARCH_POST_ENABLED() {
+    return mockBulkSearchPostEnabled;
+  },
+}));
+
+/**
+ * Numbers of paths to retrieve, and the fields to retrieve for each object.
+ */
+const PATH_COUNTS = [100, 1000, 10000];
+const FIELDS = ["accession", "file_format", "content_type", "status"];
+
+const LATENCY = Number(process.env.LATENCY || 25);
+const REPEAT = Number(process.env.REPEAT || 5);
+
+/**
+ * Requests the stub data provider received and the bytes they sent.
+ */
+type StubStats = {
+  requests: number;
+  requestBytes: number;
+};
+
+/**
+ * Measurements of one retrieval method for one number of paths.
+ */
+type MethodResult = {
+  method: string;
+  requests: number;
+  requestBytes: number;
+  medianMs: number;
+};
+
+/**
+ * Start a stub data provider that answers GET searches from their `@id` query-string parameters
+ * and POST searches from the `@id` property of their JSON bodies, after waiting `latency`
+ * milliseconds. Counts the requests and the bytes they send.
+ *
+ * @param latency - Milliseconds to wait before answering each request
+ * @returns Server, its base URL, and its request counts
+ */
+async function startStubServer(
+  latency: number
+): Promise<{ server: Server; baseUrl: string; stats: StubStats }> {
+  const stats: StubStats = { requests: 0, requestBytes: 0 };
+  const server = createServer((req, res) => {
+    const chunks: Buffer[] = [];
+    req.on("data", (chunk: Buffer) => chunks.push(chunk));
+    req.on("end", () => {
+      const body = Buffer.concat(chunks).toString();
+      const requestUrl = req.url || "";
+      stats.requests += 1;
+      stats.requestBytes += requestUrl.length + body.length;
+
+      const ids: string[] =
+        req.method === "POST"
+          ? JSON.parse(body)["@id"]
+          : new URL(requestUrl, "http://localhost").searchParams.getAll("@id");
+      const graph = ids.map((id) => ({
+        "@id": id,
+        "@type": ["File", "Item"],
+        accession: id.split("/")[2],
+        file_format: "bam",
+        content_type: "alignments",
+        status: "released",
+      }));
+      setTimeout(() => {
+        res.writeHead(200, { "Content-Type": "application/json" });
+        res.end(JSON.stringify({ "@graph": graph, total: graph.length }));
+      }, latency);
+    });
+  });
+  await new Promise<void>((resolve) =>
+    server.listen(0, "127.0.0.1", resolve)
+  );
+  const { port } = server.address() as AddressInfo;
+  return { server, baseUrl: `http://127.0.0.1:${port}`, stats };
+}
+
+/**
+ * Get the median of some numbers.
+ *
+ * @param values - Numbers to get the median of
+ * @returns Median
+ */
+function median(values: number[]): number {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+/**
+ * Format the results as a table for each number of paths.
+ *
+ * @param results - Measurements of each method for each number of paths
+ * @returns Text of the tables
+ */
+function formatResults(
+  results: Array<{ paths: number; rows: MethodResult[] }>
+): string {
+  const lines = [`${LATENCY} ms per request`];
+  for (const { paths, rows } of results) {
+    lines.push(`${paths} paths`);
+    lines.push("  method         requests   request bytes   median ms");
+    for (const row of rows) {
+      const columns = [
+        row.method.padEnd(12),
+        String(row.requests).padStart(11),
+        String(row.requestBytes).padStart(16),
+        row.medianMs.toFixed(1).padStart(12),
+      ];
+      lines.push(`  ${columns.join("")}`);
+    }
+  }
+  return lines.join("\n");
+}
+
+describe("bulk retrieval benchmark", () => {
+  it(
+    "compares grouped GET and POST searches",
+    async () => {
+      const stub = await startStubServer(LATENCY);
+      setConfig({
+        serverRuntimeConfig: { BACKEND_URL: stub.baseUrl },
+        publicRuntimeConfig: { SERVER_URL: "", PUBLIC_BACKEND_URL: "" },
+      });
+      // Import after setting the config because constants read it when first imported.
+      const { default: FetchRequest } = await import("../lib/fetch-request");
+      // FetchRequest logs every request.
+      jest.spyOn(console, "log").mockImplementation();
+
+      const methods = [
+        { method: "grouped GET", bulkSearchPost: false },
+        { method: "POST", bulkSearchPost: true },
+      ];
+      const results: Array<{ paths: number; rows: MethodResult[] }> = [];
+      try {
+        for (const count of PATH_COUNTS) {
+          const paths = Array.from(
+            { length: count },
+            (_, i) => `/files/IGVFFI${String(i).padStart(5, "0")}AAAA/`
+          );
+          const rows: MethodResult[] = [];
+          for (const { method, bulkSearchPost } of methods) {
+            mockBulkSearchPostEnabled = bulkSearchPost;
+            const times: number[] = [];
+            for (let i = 0; i < REPEAT; i += 1) {
+              stub.stats.requests = 0;
+              stub.stats.requestBytes = 0;
+              const start = performance.now();
+              const objects = await new FetchRequest().getMultipleObjectsBulk(
+                paths,
+                FIELDS,
+                ["File"]
+              );
+              times.push(performance.now() - start);
+              expect(objects.unwrap()).toHaveLength(count);
+            }
+            rows.push({
+              method,
+              requests: stub.stats.requests,
+              requestBytes: stub.stats.requestBytes,
+              medianMs: median(times),
+            });
+          }
+          results.push({ paths: count, rows });
+        }
+      } finally {
+        stub.server.close();
+        jest.restoreAllMocks();
+      }
+
+      process.stdout.write(
+        `${
+          process.env.JSON
+            ? JSON.stringify(results, null, 2)
+            : formatResults(results)
+        }\n`
+      );
+    },
+    10 * 60 * 1000
+  );
+});
@@ -0,0 +1,138 @@
+/**
+ * Measures how each cache value encoding in `lib/cache-codec.ts` trades encode and decode time
+ * for Redis bytes. Pass JSON files, or URLs to fetch JSON from, such as the profiles and
+ * facet-config objects the server caches:
+ *
+ *   $ curl -s "https://api.data.igvf.org/profiles/?format=json" > profiles.json
+ *   $ node benchmarks/cache-codec.mjs profiles.json --repeat 50
+ *
+ * Needs a Node.js version that runs TypeScript files directly (22.18 or later).
+ */
+
+// node_modules
+import { readFile } from "node:fs/promises";
+import { parseArgs } from "node:util";
+// lib
+import {
+  configureCacheCodec,
+  decodeCacheValue,
+  encodeCacheValue,
+  zstdCompressor,
+} from "../lib/cache-codec.ts";
+
+const ENCODINGS = [
+  { serializer: "json", compressor: "" },
+  { serializer: "json", compressor: "gzip" },
+  { serializer: "json", compressor: "zstd" },
+  { serializer: "v8", compressor: "" },
+  { serializer: "v8", compressor: "gzip" },
+  { serializer: "v8", compressor: "zstd" },
+].filter(({ compressor }) => compressor !== "zstd" || zstdCompressor);
+
+/**
+ * Load the JSON to encode from a file or URL.
+ *
+ * @param {string} source - Path or URL of the JSON
+ * @returns {Promise<unknown>} Parsed JSON
+ */
+async function loadSource(source) {
+  if (/^https?:\/\//.test(source)) {
+    const response = await fetch(source, {
+      headers: { Accept: "application/json" },
+    });
+    return await response.json();
+  }
+  return JSON.parse(await readFile(source, "utf8"));
+}
+
+/**
+ * Get the median of some numbers.
+ *
+ * @param {number[]} values - Numbers to get the median of
+ * @returns {number} Median
+ */
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+/**
+ * Encode and decode the data with one encoding `repeat` times.
+ *
+ * @param {unknown} data - Data to encode
+ * @param {{ serializer: string, compressor: string }} encoding - Encoding to measure
+ * @param {number} repeat - Number of times to encode and decode
+ * @returns {Promise<object>} Stored bytes and median encode and decode milliseconds
+ */
+async function measure(data, encoding, repeat) {
+  configureCacheCodec({ ...encoding, threshold: 0 });
+  const encodeTimes = [];
+  const decodeTimes = [];
+  let encoded;
+  for (let i = 0; i < repeat; i += 1) {
+    let start = performance.now();
+    encoded = await encodeCacheValue(data);
+    encodeTimes.push(performance.now() - start);
+
+    start = performance.now();
+    await decodeCacheValue(encoded.value);
+    decodeTimes.push(performance.now() - start);
+  }
+  const { serializer, compressor } = encoding;
+  return {
+    encoding: compressor ? `${serializer}+${compressor}` : serializer,
+    bytes: Buffer.byteLength(encoded.value),
+    encodeMs: median(encodeTimes),
+    decodeMs: median(decodeTimes),
+  };
+}
+
+const { values: options, positionals: sources } = parseArgs({
+  allowPositionals: true,
+  options: {
+    repeat: { type: "string", default: "20" },
+    json: { type: "boolean", default: false },
+  },
+});
+if (sources.length === 0) {
+  console.error(
+    "Usage: node benchmarks/cache-codec.mjs <file or URL>... [--repeat N] [--json]"
+  );
+  process.exit(2);
+}
+
+const results = [];
+for (const source of sources) {
+  const data = await loadSource(source);
+  const rows = [];
+  for (const encoding of ENCODINGS) {
+    rows.push(await measure(data, encoding, Number(options.repeat)));
+  }
+
+  // Compare every encoding against the plain JSON the cache stored before compression.
+  const baseline = rows[0].bytes;
+  for (const row of rows) {
+    row.savedPercent = (100 * (baseline - row.bytes)) / baseline;
+  }
+  results.push({ source, rows });
+}
+configureCacheCodec();
+
+if (options.json) {
+  console.log(JSON.stringify(results, null, 2));
+} else {
+  for (const { source, rows } of results) {
+    console.log(source);
+    console.log("  encoding      bytes     saved   encode ms   decode ms");
+    for (const row of rows) {
+      const columns = [
+        row.encoding.padEnd(10),
+        String(row.bytes).padStart(10),
+        `${row.savedPercent.toFixed(1)}%`.padStart(10),
+        row.encodeMs.toFixed(2).padStart(12),
+        row.decodeMs.toFixed(2).padStart(12),
+      ];
+      console.log(`  ${columns.join("")}`);
+    }
+  }
+}
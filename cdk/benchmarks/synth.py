@@ -0,0 +1,273 @@
+'''
+Times synthesis of the CDK app for every pipeline config in
+`infrastructure/config.py` and reports the size of what gets synthesized.
+
+For each entry in `config['pipeline']` this records how long `build(App())`
+and `app.synth()` take, the number of constructs in the app, and the template
+bytes and resource count of every stack (including the stacks in pipeline
+stages). Results are printed as JSON so they can be saved and compared across
+commits.
+
+Each repeat runs in a fresh Python process, which imports the app and then
+synthesizes it twice. The first synth is cold, like a `cdk synth` run. The
+second is warm, with modules imported and configs memoized, like every test
+after the first in a unit test worker. Cold and warm times are reported
+separately, along with the time to import the app.
+
+Usage (from the cdk directory):
+
+$ python -m benchmarks.synth
+$ python -m benchmarks.synth --config-name demo --repeat 3 --output synth.json
+'''
+import argparse
+
+import json
+
+import logging
+
+import os
+
+import statistics
+
+import sys
+
+import time
+
+from datetime import datetime
+from datetime import timezone
+
+from subprocess import CalledProcessError
+from subprocess import check_call
+from subprocess import check_output
+
+from tempfile import TemporaryDirectory
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Imported only for type checking so the cold runs time the aws_cdk import.
+    from aws_cdk.cx_api import CloudFormationStackArtifact
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+CONTEXT_FILE = 'cdk.context.json'
+
+# Branch used for each pipeline config. Matches what
+# get_pipeline_config_name_from_branch would pick.
+BRANCHES = {
+    'demo': 'IGVF-1234-synth-benchmark',
+    'dev': 'dev',
+    'production': 'main',
+}
+
+
+def load_json(path: str) -> Any:
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_context() -> Dict[str, Any]:
+    # The CDK CLI passes cached lookups from cdk.context.json to the app.
+    # Do the same so lookups don't fall back to dummy values.
+    if not os.path.exists(CONTEXT_FILE):
+        return {}
+    context: Dict[str, Any] = load_json(CONTEXT_FILE)
+    return context
+
+
+def get_git_commit() -> str:
+    try:
+        return check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            encoding='UTF-8',
+        ).strip()
+    except (CalledProcessError, OSError):
+        return 'unknown'
+
+
+def get_stack_metrics(stack: 'CloudFormationStackArtifact') -> Dict[str, Any]:
+    return {
+        'name': stack.hierarchical_id,
+        'template_bytes': os.path.getsize(stack.template_full_path),
+        'resource_count': len(stack.template.get('Resources', {})),
+    }
+
+
+def synth_pipeline_config(name: str, branch: str, outdir: str) -> Dict[str, Any]:
+    from aws_cdk import App
+    from infrastructure.build import build
+    start = time.perf_counter()
+    app = App(
+        outdir=outdir,
+        context={
+            **load_context(),
+            'branch': branch,
+            'config-name': name,
+        },
+    )
+    build(app)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    assembly = app.synth()
+    synth_seconds = time.perf_counter() - start
+    return {
+        'build_seconds': build_seconds,
+        'synth_seconds': synth_seconds,
+        'construct_count': len(app.node.find_all()),
+        'stacks': [
+            get_stack_metrics(stack)
+            for stack in assembly.stacks_recursively
+        ],
+    }
+
+
+def summarize_seconds(values: List[float]) -> Dict[str, float]:
+    return {
+        'min': min(values),
+        'median': statistics.median(values),
+        'max': max(values),
+    }
+
+
+def synth_cold_and_warm(name: str) -> Dict[str, Any]:
+    # Only meaningful in a fresh process, see run_in_subprocess.
+    branch = BRANCHES.get(name, BRANCHES['demo'])
+    start = time.perf_counter()
+    import aws_cdk
+    import infrastructure.build
+    import_seconds = time.perf_counter() - start
+    runs = {}
+    for kind in ['cold', 'warm']:
+        with TemporaryDirectory() as outdir:
+            runs[kind] = synth_pipeline_config(name, branch, outdir)
+    return {
+        'import_seconds': import_seconds,
+        **runs,
+    }
+
+
+def run_in_subprocess(name: str) -> Dict[str, Any]:
+    with TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'run.json')
+        check_call(
+            [
+                sys.executable,
+                '-m',
+                'benchmarks.synth',
+                '--config-name',
+                name,
+                '--single-process',
+                '--output',
+                output,
+            ]
+        )
+        result: Dict[str, Any] = load_json(output)
+        return result
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'build_seconds': summarize_seconds(
+            [run['build_seconds'] for run in runs]
+        ),
+        'synth_seconds': summarize_seconds(
+            [run['synth_seconds'] for run in runs]
+        ),
+    }
+
+
+def benchmark_pipeline_config(name: str, repeat: int = 1) -> Dict[str, Any]:
+    branch = BRANCHES.get(name, BRANCHES['demo'])
+    processes = []
+    for i in range(repeat):
+        logging.info(f'Synthesizing {name} ({i + 1}/{repeat})')
+        processes.append(
+            run_in_subprocess(name)
+        )
+    # Construct and template metrics don't change between runs.
+    last_run = processes[-1]['warm']
+    stacks = last_run['stacks']
+    return {
+        'config_name': name,
+        'branch': branch,
+        'import_seconds': summarize_seconds(
+            [process['import_seconds'] for process in processes]
+        ),
+        'cold': summarize_runs(
+            [process['cold'] for process in processes]
+        ),
+        'warm': summarize_runs(
+            [process['warm'] for process in processes]
+        ),
+        'construct_count': last_run['construct_count'],
+        'stack_count': len(stacks),
+        'template_bytes': sum(stack['template_bytes'] for stack in stacks),
+        'resource_count': sum(stack['resource_count'] for stack in stacks),
+        'stacks': stacks,
+    }
+
+
+def run_benchmarks(names: List[str], repeat: int = 1) -> Dict[str, Any]:
+    return {
+        'commit': get_git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'repeat': repeat,
+        'results': [
+            benchmark_pipeline_config(name, repeat=repeat)
+            for name in names
+        ],
+    }
+
+
+def get_parser() -> argparse.ArgumentParser:
+    # Doesn't import infrastructure.config so --single-process can time the
+    # import of the app.
+    parser = argparse.ArgumentParser(
+        description='Benchmark synthesis of every pipeline config.'
+    )
+    parser.add_argument(
+        '--config-name',
+        action='append',
+        dest='config_names',
+        help='Pipeline config to benchmark. Repeat for several, defaults to all.',
+    )
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', help='Write JSON here instead of stdout.')
+    # Set by run_in_subprocess for the process running each repeat.
+    parser.add_argument(
+        '--single-process',
+        action='store_true',
+        help=argparse.SUPPRESS,
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]]) -> None:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.single_process:
+        results = synth_cold_and_warm(args.config_names[0])
+    else:
+        from infrastructure.config import config
+        names = args.config_names or list(config['pipeline'])
+        for name in names:
+            if name not in config['pipeline']:
+                parser.error(f'Unknown pipeline config {name}')
+        results = run_benchmarks(names, repeat=args.repeat)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        logging.info(f'Wrote results to {args.output}')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
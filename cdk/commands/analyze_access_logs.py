@@ -0,0 +1,492 @@
+'''
+Summarizes request latency from `nginxfe` access logs.
+
+Parses lines written with the `main` log_format in
+`docker/nginx/production.conf` and reports, per route family, the request
+count, p50/p95/p99 of `request_time` and `upstream_response_time`, a status
+breakdown, plus overall requests per minute and the slowest requests. The
+JSON output is what `commands/plan_capacity.py` reads as traffic.
+
+Reads the logs as a stream, so memory use doesn't grow with file size.
+Percentiles come from log-scaled histograms and are accurate to about 1%.
+Files ending in `.gz` are decompressed on the fly, and `-` reads stdin. Lines
+can have a prefix (e.g. a CloudWatch timestamp) in front of the log entry.
+
+Route families group paths that hit the same page type, for example
+`/measurement-sets/IGVFDS0000AAAA/` becomes `/measurement-sets/:id/`. The query
+string is dropped except for the parameters given with `--query-param`
+(default `type`), so `/search/?type=Lab&lab=x` becomes `/search/?type=Lab`.
+
+Usage:
+
+$ python commands/analyze_access_logs.py nginxfe.log
+$ python commands/analyze_access_logs.py logs/*.gz --worst 20 --json
+$ aws logs tail /igvf-ui/nginxfe --since 1h | python commands/analyze_access_logs.py -
+'''
+import argparse
+
+import gzip
+
+import heapq
+
+import json
+
+import math
+
+import re
+
+import sys
+
+from datetime import datetime
+
+from dataclasses import dataclass
+from dataclasses import field
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
+from typing import TypedDict
+
+from urllib.parse import parse_qsl
+from urllib.parse import urlsplit
+
+
+# Matches log_format main in docker/nginx/production.conf.
+LOG_LINE_REGEX = re.compile(
+    r'(?P<remote_addr>\S+) - (?P<remote_user>\S+) \[(?P<time_local>[^\]]+)\] '
+    r'"(?P<request>[^"]*)" '
+    r'(?P<status>\d{3}) (?P<body_bytes_sent>\d+) "(?P<http_referer>[^"]*)" '
+    r'"(?P<http_user_agent>[^"]*)" '
+    r'client_ip=(?P<client_ip>.*?) '
+    r'request_time=(?P<request_time>\S+) '
+    r'upstream_response_time=(?P<upstream_response_time>.*?) '
+    r'upstream_connect_time=(?P<upstream_connect_time>.*?) '
+    r'upstream_header_time=(?P<upstream_header_time>.*?) ?$'
+)
+
+ID_PLACEHOLDER = ':id'
+
+DEFAULT_QUERY_PARAMS = ['type']
+
+PERCENTILES = [50, 95, 99]
+
+# Relative width of each histogram bucket.
+HISTOGRAM_PRECISION = 0.01
+
+# Prefix of $time_local up to the minute, e.g. 19/Oct/2026:10:00
+MINUTE_FORMAT = '%d/%b/%Y:%H:%M'
+
+MINUTE_PREFIX_LENGTH = len('19/Oct/2026:10:00')
+
+
+@dataclass
+class LogEntry:
+    method: str
+    path: str
+    status: int
+    request_time: float
+    upstream_response_time: Optional[float]
+    time_local: str
+    request: str
+
+
+class LatencyHistogram:
+    '''
+    Log-scaled histogram that keeps a bounded number of buckets however
+    many values get added, so percentiles use constant memory.
+    '''
+
+    def __init__(self, precision: float = HISTOGRAM_PRECISION) -> None:
+        self.log_base = math.log1p(precision)
+        self.counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zero_count += 1
+            return
+        bucket = math.floor(math.log(value) / self.log_base)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.count:
+            return None
+        # Nearest-rank percentile.
+        rank = max(math.ceil(percent / 100 * self.count), 1)
+        if rank <= self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                # Upper edge of the bucket, capped at the real maximum.
+                return min(math.exp((bucket + 1) * self.log_base), self.max)
+        return self.max
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    request_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    upstream_response_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class Report:
+    lines: int = 0
+    unparsed_lines: int = 0
+    request_time: LatencyHistogram = field(default_factory=LatencyHistogram)
+    routes: Dict[str, RouteStats] = field(default_factory=dict)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    # Grows with the time span of the logs, not the number of lines.
+    requests_per_minute: Dict[str, int] = field(default_factory=dict)
+    worst: List[Tuple[float, int, LogEntry]] = field(default_factory=list)
+
+
+# Shapes of the JSON summary, keyed by percentile (p50) or statistic (mean).
+HistogramSummary = Dict[str, Optional[float]]
+
+CountsSummary = Dict[str, float]
+
+
+class ThroughputSummary(TypedDict):
+    start: Optional[str]
+    end: Optional[str]
+    minutes: int
+    requests_per_minute: CountsSummary
+
+
+class RouteSummary(TypedDict):
+    route: str
+    count: int
+    request_time: HistogramSummary
+    upstream_response_time: HistogramSummary
+    statuses: Dict[str, int]
+
+
+class SlowRequest(TypedDict):
+    request_time: float
+    upstream_response_time: Optional[float]
+    status: int
+    request: str
+    time_local: str
+    line: int
+
+
+class ReportSummary(TypedDict):
+    lines: int
+    unparsed_lines: int
+    throughput: ThroughputSummary
+    request_time: HistogramSummary
+    statuses: Dict[str, int]
+    routes: List[RouteSummary]
+    worst: List[SlowRequest]
+
+
+def parse_time(value: str) -> Optional[float]:
+    # Upstream times are "-" when nginx didn't reach an upstream, and a
+    # comma or colon separated list when it tried several. Add them up.
+    total = 0.0
+    found = False
+    for part in re.split(r'[,:]', value):
+        part = part.strip()
+        if not part or part == '-':
+            continue
+        total += float(part)
+        found = True
+    return total if found else None
+
+
+def parse_line(line: str) -> Optional[LogEntry]:
+    match = LOG_LINE_REGEX.search(line.rstrip('\n'))
+    if match is None:
+        return None
+    request = match.group('request')
+    parts = request.split(' ')
+    if len(parts) >= 2:
+        method, path = parts[0], parts[1]
+    else:
+        method, path = '-', request or '-'
+    request_time = parse_time(match.group('request_time'))
+    return LogEntry(
+        method=method,
+        path=path,
+        status=int(match.group('status')),
+        request_time=request_time if request_time is not None else 0.0,
+        upstream_response_time=parse_time(match.group('upstream_response_time')),
+        time_local=match.group('time_local'),
+        request=request,
+    )
+
+
+def get_route_family(path: str, query_params: Iterable[str] = DEFAULT_QUERY_PARAMS) -> str:
+    if not path.startswith('/'):
+        return path
+    url = urlsplit(path)
+    segments = [segment for segment in url.path.split('/') if segment]
+    trailing_slash = '/' if url.path.endswith('/') else ''
+    if not segments:
+        family = '/'
+    elif segments[0] == '_next':
+        # Static chunks and data routes carry build IDs and hashes.
+        family = '/' + '/'.join(segments[:2]) + '/*'
+    elif segments[0] == 'api':
+        family = '/' + '/'.join(segments[:2]) + trailing_slash
+    elif len(segments) == 1:
+        family = f'/{segments[0]}{trailing_slash}'
+    elif len(segments) == 2:
+        family = f'/{segments[0]}/{ID_PLACEHOLDER}/'
+    else:
+        family = f'/{segments[0]}/{ID_PLACEHOLDER}/*'
+    query_params = set(query_params)
+    kept = sorted(
+        (key, value)
+        for key, value in parse_qsl(url.query, keep_blank_values=True)
+        if key in query_params
+    )
+    if kept:
+        family += '?' + '&'.join(f'{key}={value}' for key, value in kept)
+    return family
+
+
+def open_log(path: str) -> TextIO:
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='UTF-8', errors='replace')
+    return open(path, encoding='UTF-8', errors='replace')
+
+
+def iter_lines(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        f = open_log(path)
+        try:
+            yield from f
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def add_to_counts(counts: Dict[Any, int], key: Any) -> None:
+    counts[key] = counts.get(key, 0) + 1
+
+
+def analyze_lines(
+        lines: Iterable[str],
+        worst: int = 10,
+        query_params: Iterable[str] = DEFAULT_QUERY_PARAMS,
+) -> Report:
+    report = Report()
+    query_params = list(query_params)
+    for line in lines:
+        report.lines += 1
+        entry = parse_line(line)
+        if entry is None:
+            report.unparsed_lines += 1
+            continue
+        family = get_route_family(entry.path, query_params)
+        stats = report.routes.get(family)
+        if stats is None:
+            stats = report.routes[family] = RouteStats()
+        stats.count += 1
+        stats.request_time.add(entry.request_time)
+        report.request_time.add(entry.request_time)
+        add_to_counts(report.requests_per_minute, entry.time_local[:MINUTE_PREFIX_LENGTH])
+        if entry.upstream_response_time is not None:
+            stats.upstream_response_time.add(entry.upstream_response_time)
+        add_to_counts(stats.statuses, entry.status)
+        add_to_counts(report.statuses, entry.status)
+        # Min-heap of the slowest requests, the line number breaks ties.
+        item = (entry.request_time, report.lines, entry)
+        if len(report.worst) < worst:
+            heapq.heappush(report.worst, item)
+        elif worst and item[:2] > report.worst[0][:2]:
+            heapq.heapreplace(report.worst, item)
+    return report
+
+
+def summarize_histogram(histogram: LatencyHistogram) -> HistogramSummary:
+    return {
+        f'p{percent}': histogram.percentile(percent)
+        for percent in PERCENTILES
+    }
+
+
+def summarize_throughput(requests_per_minute: Dict[str, int]) -> ThroughputSummary:
+    minutes = sorted(
+        datetime.strptime(minute, MINUTE_FORMAT)
+        for minute in requests_per_minute
+    )
+    if not minutes:
+        return {
+            'start': None,
+            'end': None,
+            'minutes': 0,
+            'requests_per_minute': summarize_counts([]),
+        }
+    span = int((minutes[-1] - minutes[0]).total_seconds() // 60) + 1
+    # Minutes without any requests count as zero.
+    counts = list(requests_per_minute.values()) + [0] * (span - len(minutes))
+    return {
+        'start': minutes[0].strftime(MINUTE_FORMAT),
+        'end': minutes[-1].strftime(MINUTE_FORMAT),
+        'minutes': span,
+        'requests_per_minute': summarize_counts(counts),
+    }
+
+
+def summarize_counts(counts: List[int]) -> CountsSummary:
+    if not counts:
+        return {
+            'mean': 0.0,
+            'p50': 0.0,
+            'p95': 0.0,
+            'max': 0.0,
+        }
+    ordered = sorted(counts)
+    return {
+        'mean': sum(ordered) / len(ordered),
+        'p50': float(ordered[max(math.ceil(0.5 * len(ordered)), 1) - 1]),
+        'p95': float(ordered[max(math.ceil(0.95 * len(ordered)), 1) - 1]),
+        'max': float(ordered[-1]),
+    }
+
+
+def report_to_dict(report: Report) -> ReportSummary:
+    routes = sorted(
+        report.routes.items(),
+        key=lambda item: (-item[1].count, item[0]),
+    )
+    return {
+        'lines': report.lines,
+        'unparsed_lines': report.unparsed_lines,
+        'throughput': summarize_throughput(report.requests_per_minute),
+        'request_time': summarize_histogram(report.request_time),
+        'statuses': {
+            str(status): count
+            for status, count in sorted(report.statuses.items())
+        },
+        'routes': [
+            {
+                'route': family,
+                'count': stats.count,
+                'request_time': summarize_histogram(stats.request_time),
+                'upstream_response_time': summarize_histogram(stats.upstream_response_time),
+                'statuses': {
+                    str(status): count
+                    for status, count in sorted(stats.statuses.items())
+                },
+            }
+            for family, stats in routes
+        ],
+        'worst': [
+            {
+                'request_time': entry.request_time,
+                'upstream_response_time': entry.upstream_response_time,
+                'status': entry.status,
+                'request': entry.request,
+                'time_local': entry.time_local,
+                'line': line_number,
+            }
+            for _, line_number, entry in sorted(
+                report.worst,
+                key=lambda item: (-item[0], item[1]),
+            )
+        ],
+    }
+
+
+def format_seconds(value: Optional[float]) -> str:
+    return '-' if value is None else f'{value:.3f}'
+
+
+def format_report(report: Report) -> str:
+    summary = report_to_dict(report)
+    throughput = summary['throughput']
+    requests_per_minute = throughput['requests_per_minute']
+    lines = [
+        f'lines={summary["lines"]} unparsed={summary["unparsed_lines"]}',
+        f'from={throughput["start"]} to={throughput["end"]} '
+        f'requests_per_minute mean={requests_per_minute["mean"]:.1f} '
+        f'p95={requests_per_minute["p95"]:.0f} max={requests_per_minute["max"]:.0f}',
+        'statuses: ' + ' '.join(
+            f'{status}={count}'
+            for status, count in summary['statuses'].items()
+        ),
+        '',
+        f'{"route":<50} {"count":>8} {"p50":>7} {"p95":>7} {"p99":>7} '
+        f'{"up_p50":>7} {"up_p95":>7} {"up_p99":>7}  statuses',
+    ]
+    for route in summary['routes']:
+        request_time = route['request_time']
+        upstream_response_time = route['upstream_response_time']
+        lines.append(
+            f'{route["route"]:<50} {route["count"]:>8} '
+            + ' '.join(
+                f'{format_seconds(request_time[f"p{percent}"]):>7}'
+                for percent in PERCENTILES
+            )
+            + ' '
+            + ' '.join(
+                f'{format_seconds(upstream_response_time[f"p{percent}"]):>7}'
+                for percent in PERCENTILES
+            )
+            + '  '
+            + ' '.join(
+                f'{status}={count}'
+                for status, count in route['statuses'].items()
+            )
+        )
+    if summary['worst']:
+        lines.extend(['', 'slowest requests:'])
+        for entry in summary['worst']:
+            lines.append(
+                f'{format_seconds(entry["request_time"])}s '
+                f'upstream={format_seconds(entry["upstream_response_time"])}s '
+                f'{entry["status"]} [{entry["time_local"]}] {entry["request"]}'
+            )
+    return '\n'.join(lines)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Summarize latency per route from nginx access logs.'
+    )
+    parser.add_argument('paths', nargs='+', help='Log files, .gz files or - for stdin.')
+    parser.add_argument('--worst', type=int, default=10, help='Number of slowest requests to list.')
+    parser.add_argument(
+        '--query-param',
+        action='append',
+        dest='query_params',
+        help='Query parameter to keep in route families. Repeat for several, defaults to type.',
+    )
+    parser.add_argument('--json', action='store_true')
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    args = get_parser().parse_args(argv)
+    report = analyze_lines(
+        iter_lines(args.paths),
+        worst=args.worst,
+        query_params=args.query_params or DEFAULT_QUERY_PARAMS,
+    )
+    if args.json:
+        print(json.dumps(report_to_dict(report), indent=2))
+    else:
+        print(format_report(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -5,76 +5,262 @@ and not the stacks deployed by the CodePipeline.
 See: https://github.com/aws/aws-cdk/issues/10190
 
 Until there's official support for cleaning up all the stacks in an application
-we can generate all the stacks in an application and iterate through them in
-reverse-dependency order to destroy them one at a time.
+we synthesize the application, read the stack dependency graph from the cloud
+assembly manifest, and destroy the stacks in reverse-dependency order. Stacks
+that don't depend on each other (e.g. the stacks in different stages) get
+destroyed at the same time, up to `--max-workers` at once.
+
+Stacks deployed by a pipeline stage are destroyed before the pipeline stack.
+
+By default every `cdk destroy` synthesizes the app again. Pass `--synth-once`
+to synthesize once and destroy every stack from that cloud assembly with
+`--app`, or `--assembly cdk.out` to reuse a cloud assembly you already
+synthesized with the same arguments (e.g. from `cdk synth`).
 
 You can also manually destroy dangling stacks in the CloudFormation console.
 
 Usage:
 
-Include all arguments from original deploy command. All argmuments get passed to underlying `cdk` command.
+Include all arguments from original deploy command. All argmuments except
+`--max-workers`, `--synth-once` and `--assembly` get passed to underlying `cdk`
+command.
+
+$ python -m commands.cdk_destroy_all_stacks -c branch=IGVF-1234-xyz --profile igvf-dev
 
-$ python commands/cdk_destroy_all_stacks.py -c branch=IGVF-1234-xyz --profile igvf-dev
+$ python -m commands.cdk_destroy_all_stacks -c branch=IGVF-1234-xyz --profile igvf-dev --synth-once
+
+$ cdk synth --quiet -c branch=IGVF-1234-xyz --profile igvf-dev
+$ python -m commands.cdk_destroy_all_stacks --profile igvf-dev --assembly cdk.out
 
 Follow (y/n) destroy prompt...
 
+Since stacks are destroyed in parallel you only get asked once for all of them.
+Pass `--force` to skip the prompt.
+
 Note removing stacks can take some time.
 '''
+import argparse
+
 import logging
 
 import sys
 
-from subprocess import check_output
+import time
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from dataclasses import dataclass
+from dataclasses import field
+
 from subprocess import check_call
 
+from tempfile import TemporaryDirectory
+
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Set
+
+from commands.cloud_assembly import iter_cloud_assemblies
+
 
 logging.basicConfig(level=logging.DEBUG)
 
 
-CDK_LS = ['cdk', 'ls']
+CDK_SYNTH = ['cdk', 'synth', '--quiet']
 
 CDK_DESTROY = ['cdk', 'destroy']
 
+FORCE_FLAGS = ['--force', '-f']
 
-def get_all_stacks_in_app(args):
-    command = CDK_LS + args
-    logging.info(f'Getting all stacks with {command}')
-    return check_output(
-        command,
-        encoding='UTF-8',
-    )
+DEFAULT_MAX_WORKERS = 4
 
 
-def parse_ls_output(output):
-    parsed_output = [
-        value
-        for value in output.split('\n')
-        if value
-    ]
-    return parsed_output
+@dataclass
+class Stack:
+    name: str
+    dependencies: Set[str] = field(default_factory=set)
 
 
-def reverse_stacks(stacks):
-    return list(reversed(stacks))
+def synthesize_app(args, output):
+    command = CDK_SYNTH + args + ['--output', output]
+    logging.info(f'Synthesizing app with {command}')
+    return check_call(command)
 
 
-def destroy_stack(args, stack):
-    command = CDK_DESTROY + args + [stack]
-    logging.info(f'Destroying {stack} with {command}')
-    return check_call(command)
+def get_stacks_in_assembly(assembly_directory):
+    # Stacks are keyed by their display name. Dependencies in the manifest
+    # refer to artifact IDs in the same assembly and include non-stack
+    # artifacts like assets.
+    stacks = {}
+    for assembly in iter_cloud_assemblies(assembly_directory):
+        names = assembly.get_stack_names()
+        # Stage stacks get deployed by the pipeline stack in the parent
+        # assembly, so treat them as depending on it.
+        parent_stacks = (
+            set(assembly.parent.get_stack_names().values())
+            if assembly.parent
+            else set()
+        )
+        for artifact_id, name in names.items():
+            stacks[name] = Stack(
+                name=name,
+                dependencies={
+                    names[dependency]
+                    for dependency in assembly.artifacts[artifact_id].get('dependencies', [])
+                    if dependency in names
+                } | parent_stacks
+            )
+    return stacks
+
+
+def get_dependents(stacks):
+    dependents: Dict[str, Set[str]] = {
+        name: set()
+        for name in stacks
+    }
+    for stack in stacks.values():
+        for dependency in stack.dependencies:
+            dependents[dependency].add(stack.name)
+    return dependents
 
 
-def destroy_all_stacks(args):
-    stacks = reverse_stacks(
-        parse_ls_output(
-            get_all_stacks_in_app(
-                args
+def destroy_stacks_in_reverse_dependency_order(
+        stacks: Dict[str, Stack],
+        destroy: Callable[[str], None],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+) -> List[str]:
+    # A stack can go once every stack that depends on it is gone.
+    remaining_dependents = get_dependents(stacks)
+    destroyed: List[str] = []
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(destroyed) < len(stacks):
+            ready = sorted(
+                name
+                for name, dependents in remaining_dependents.items()
+                if not dependents and name not in destroyed
+                and name not in running.values()
             )
+            for name in ready:
+                running[executor.submit(destroy, name)] = name
+            if not running:
+                raise ValueError(
+                    f'Dependency cycle between stacks: {sorted(set(stacks) - set(destroyed))}'
+                )
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                # Raises if the destroy failed. Stacks already running are
+                # allowed to finish, nothing new is started.
+                future.result()
+                destroyed.append(name)
+                for dependency in stacks[name].dependencies:
+                    remaining_dependents[dependency].discard(name)
+    return destroyed
+
+
+def run_destroy(command, stack):
+    logging.info(f'Destroying {stack} with {command}')
+    start = time.perf_counter()
+    check_call(command)
+    logging.info(
+        f'Destroyed {stack} in {time.perf_counter() - start:.0f} seconds'
+    )
+
+
+def destroy_stack(args, stack):
+    with TemporaryDirectory() as output:
+        # Each destroy synthesizes the app, so give concurrent calls
+        # their own output directory.
+        run_destroy(
+            CDK_DESTROY + args + ['--output', output, stack],
+            stack,
         )
+
+
+def destroy_stack_from_assembly(args, stack, assembly_directory):
+    # Pointing --app at a cloud assembly directory skips synthesis.
+    run_destroy(
+        CDK_DESTROY + args + ['--app', assembly_directory, stack],
+        stack,
+    )
+
+
+def confirm_destroy(stacks):
+    print('Stacks to destroy:')
+    for name in sorted(stacks):
+        print(f'  {name}')
+    answer = input(f'Destroy {len(stacks)} stacks (y/n)? ')
+    return answer.strip().lower() in ['y', 'yes']
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Destroy all stacks in the CDK app.'
     )
+    parser.add_argument(
+        '--max-workers',
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+    )
+    parser.add_argument(
+        '--synth-once',
+        action='store_true',
+        help='Destroy every stack from a single synthesized cloud assembly.',
+    )
+    parser.add_argument(
+        '--assembly',
+        help='Existing cloud assembly directory (e.g. cdk.out) to destroy from without synthesizing.',
+    )
+    return parser
+
+
+def destroy_all_stacks(argv):
+    options, args = get_parser().parse_known_args(argv)
+    if options.assembly:
+        destroy_stacks_in_assembly(
+            args,
+            options.assembly,
+            options.max_workers,
+            from_assembly=True,
+        )
+        return
+    with TemporaryDirectory() as output:
+        synthesize_app(args, output)
+        destroy_stacks_in_assembly(
+            args,
+            output,
+            options.max_workers,
+            from_assembly=options.synth_once,
+        )
+
+
+def destroy_stacks_in_assembly(args, assembly_directory, max_workers, from_assembly=False):
+    stacks = get_stacks_in_assembly(assembly_directory)
     logging.info(f'Found {len(stacks)} stacks')
-    for stack in stacks:
-        destroy_stack(args, stack)
+    if not any(flag in args for flag in FORCE_FLAGS):
+        if not confirm_destroy(stacks):
+            logging.info('Not destroying stacks')
+            return
+        args = args + ['--force']
+    if from_assembly:
+        def destroy(stack):
+            destroy_stack_from_assembly(args, stack, assembly_directory)
+    else:
+        def destroy(stack):
+            destroy_stack(args, stack)
+    start = time.perf_counter()
+    destroy_stacks_in_reverse_dependency_order(
+        stacks,
+        destroy,
+        max_workers=max_workers,
+    )
+    logging.info(
+        f'Destroyed {len(stacks)} stacks in {time.perf_counter() - start:.0f} seconds'
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,261 @@
+'''
+Reports the size of every stack in a synthesized cloud assembly and fails
+when a stack goes over budget.
+
+For each stack (including the stacks in pipeline stages) this reports the
+resource count, template bytes, outputs, cross-stack exports (e.g. from
+`export_default_explicit_values`) and imports, and the size of the assets the
+stack publishes. CloudFormation rejects templates over its hard limits, and
+deploy time grows with template size, so the default budgets sit below them.
+
+See: https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/cloudformation-limits.html
+
+Usage (from the cdk folder, after `cdk synth`):
+
+$ python -m commands.check_template_budgets cdk.out
+$ python -m commands.check_template_budgets cdk.out --max-resources 300 --json
+
+Exits with status 1 when a budget is exceeded.
+
+From tests, synthesize an app and pass its assembly directory:
+
+    reports = analyze_cloud_assembly(app.synth().directory)
+    assert check_budgets(reports, Budgets()) == []
+'''
+import argparse
+
+import json
+
+import logging
+
+import os
+
+import sys
+
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from commands.cloud_assembly import ASSET_MANIFEST_ARTIFACT_TYPE
+from commands.cloud_assembly import iter_cloud_assemblies
+from commands.cloud_assembly import load_json
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+# CloudFormation hard limits.
+MAX_RESOURCES_LIMIT = 500
+
+MAX_TEMPLATE_BYTES_LIMIT = 1024 * 1024
+
+MAX_OUTPUTS_LIMIT = 200
+
+
+@dataclass
+class Budgets:
+    max_resources: int = 400
+    max_template_bytes: int = 800 * 1024
+    max_outputs: int = 160
+    max_exports: int = 50
+    # Docker image assets include the whole build context, so no default.
+    max_asset_bytes: Optional[int] = None
+
+
+@dataclass
+class StackReport:
+    name: str
+    template_file: str
+    template_bytes: int
+    resource_count: int
+    output_count: int
+    exports: List[str] = field(default_factory=list)
+    import_count: int = 0
+    asset_count: int = 0
+    asset_bytes: int = 0
+    resource_types: Dict[str, int] = field(default_factory=dict)
+
+
+def get_path_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if not os.path.islink(file_path):
+                size += os.path.getsize(file_path)
+    return size
+
+
+def count_imports(value):
+    if isinstance(value, dict):
+        return (
+            int('Fn::ImportValue' in value)
+            + sum(count_imports(v) for v in value.values())
+        )
+    if isinstance(value, list):
+        return sum(count_imports(v) for v in value)
+    return 0
+
+
+def get_exports(template):
+    exports = []
+    for output in template.get('Outputs', {}).values():
+        if 'Export' not in output:
+            continue
+        name = output['Export'].get('Name')
+        exports.append(name if isinstance(name, str) else json.dumps(name))
+    return sorted(exports)
+
+
+def get_resource_types(template):
+    resource_types: Dict[str, int] = {}
+    for resource in template.get('Resources', {}).values():
+        resource_types[resource['Type']] = resource_types.get(resource['Type'], 0) + 1
+    return dict(sorted(resource_types.items()))
+
+
+def get_asset_paths(assembly_directory, asset_manifest, template_file):
+    # Asset manifests also list the stack template itself, skip it.
+    for asset in asset_manifest.get('files', {}).values():
+        path = asset['source'].get('path')
+        if path and path != template_file:
+            yield os.path.join(assembly_directory, path)
+    for asset in asset_manifest.get('dockerImages', {}).values():
+        directory = asset['source'].get('directory')
+        if directory:
+            yield os.path.join(assembly_directory, directory)
+
+
+def analyze_stack(assembly_directory, artifacts, artifact):
+    template_file = artifact['properties']['templateFile']
+    template_path = os.path.join(assembly_directory, template_file)
+    template = load_json(template_path)
+    asset_paths: List[str] = []
+    for dependency in artifact.get('dependencies', []):
+        dependency_artifact = artifacts.get(dependency, {})
+        if dependency_artifact.get('type') != ASSET_MANIFEST_ARTIFACT_TYPE:
+            continue
+        asset_manifest = load_json(
+            os.path.join(
+                assembly_directory,
+                dependency_artifact['properties']['file'],
+            )
+        )
+        asset_paths.extend(
+            get_asset_paths(assembly_directory, asset_manifest, template_file)
+        )
+    return StackReport(
+        name=artifact.get('displayName', template_file),
+        template_file=template_path,
+        template_bytes=os.path.getsize(template_path),
+        resource_count=len(template.get('Resources', {})),
+        output_count=len(template.get('Outputs', {})),
+        exports=get_exports(template),
+        import_count=count_imports(template),
+        asset_count=len(asset_paths),
+        asset_bytes=sum(
+            get_path_size(path)
+            for path in asset_paths
+            if os.path.exists(path)
+        ),
+        resource_types=get_resource_types(template),
+    )
+
+
+def iter_stack_reports(assembly_directory) -> Iterator[StackReport]:
+    for assembly in iter_cloud_assemblies(assembly_directory):
+        for artifact in assembly.get_stack_artifacts().values():
+            yield analyze_stack(assembly.directory, assembly.artifacts, artifact)
+
+
+def analyze_cloud_assembly(assembly_directory) -> List[StackReport]:
+    return sorted(
+        iter_stack_reports(assembly_directory),
+        key=lambda report: report.name,
+    )
+
+
+def check_budgets(reports: List[StackReport], budgets: Budgets) -> List[str]:
+    failures = []
+    for report in reports:
+        checks = [
+            ('resources', report.resource_count, budgets.max_resources),
+            ('template bytes', report.template_bytes, budgets.max_template_bytes),
+            ('outputs', report.output_count, budgets.max_outputs),
+            ('exports', len(report.exports), budgets.max_exports),
+            ('asset bytes', report.asset_bytes, budgets.max_asset_bytes),
+        ]
+        for name, value, budget in checks:
+            if budget is not None and value > budget:
+                failures.append(
+                    f'{report.name}: {value} {name} exceeds budget of {budget}'
+                )
+    return failures
+
+
+def format_reports(reports, failures):
+    lines = []
+    for report in reports:
+        lines.append(
+            f'{report.name}: resources={report.resource_count}/{MAX_RESOURCES_LIMIT} '
+            f'template_bytes={report.template_bytes}/{MAX_TEMPLATE_BYTES_LIMIT} '
+            f'outputs={report.output_count}/{MAX_OUTPUTS_LIMIT} '
+            f'exports={len(report.exports)} imports={report.import_count} '
+            f'assets={report.asset_count} asset_bytes={report.asset_bytes}'
+        )
+        for export in report.exports:
+            lines.append(f'  export {export}')
+    for failure in failures:
+        lines.append(f'FAILED: {failure}')
+    return '\n'.join(lines)
+
+
+def get_parser():
+    defaults = Budgets()
+    parser = argparse.ArgumentParser(
+        description='Check synthesized stacks against size budgets.'
+    )
+    parser.add_argument('assembly_directory', nargs='?', default='cdk.out')
+    parser.add_argument('--max-resources', type=int, default=defaults.max_resources)
+    parser.add_argument('--max-template-bytes', type=int, default=defaults.max_template_bytes)
+    parser.add_argument('--max-outputs', type=int, default=defaults.max_outputs)
+    parser.add_argument('--max-exports', type=int, default=defaults.max_exports)
+    parser.add_argument('--max-asset-bytes', type=int, default=defaults.max_asset_bytes)
+    parser.add_argument('--json', action='store_true')
+    return parser
+
+
+def main(argv):
+    args = get_parser().parse_args(argv)
+    budgets = Budgets(
+        max_resources=args.max_resources,
+        max_template_bytes=args.max_template_bytes,
+        max_outputs=args.max_outputs,
+        max_exports=args.max_exports,
+        max_asset_bytes=args.max_asset_bytes,
+    )
+    reports = analyze_cloud_assembly(args.assembly_directory)
+    logging.info(f'Found {len(reports)} stacks in {args.assembly_directory}')
+    failures = check_budgets(reports, budgets)
+    if args.json:
+        output: Dict[str, Any] = {
+            'budgets': asdict(budgets),
+            'stacks': [asdict(report) for report in reports],
+            'failures': failures,
+        }
+        print(json.dumps(output, indent=2))
+    else:
+        print(format_reports(reports, failures))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,88 @@
+'''
+Reads the manifests of a synthesized cloud assembly (e.g. `cdk.out`) without
+the CDK libraries. Pipeline stages synthesize into nested assemblies, one
+directory per stage, so this walks those too.
+
+See: https://github.com/aws/aws-cdk/tree/main/packages/aws-cdk-lib/cloud-assembly-schema
+'''
+import json
+
+import os
+
+from dataclasses import dataclass
+
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+
+MANIFEST_FILE = 'manifest.json'
+
+STACK_ARTIFACT_TYPE = 'aws:cloudformation:stack'
+
+ASSET_MANIFEST_ARTIFACT_TYPE = 'cdk:asset-manifest'
+
+NESTED_ASSEMBLY_ARTIFACT_TYPE = 'cdk:cloud-assembly'
+
+
+@dataclass
+class CloudAssembly:
+    directory: str
+    artifacts: Dict[str, Dict[str, Any]]
+    # Assembly that holds this one, for the assemblies of pipeline stages.
+    parent: Optional['CloudAssembly'] = None
+
+    def get_path(self, relative_path: str) -> str:
+        return os.path.join(self.directory, relative_path)
+
+    def get_stack_artifacts(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            artifact_id: artifact
+            for artifact_id, artifact in self.artifacts.items()
+            if artifact['type'] == STACK_ARTIFACT_TYPE
+        }
+
+    def get_stack_names(self) -> Dict[str, str]:
+        # Display names (e.g. Pipeline/Stage/Stack) are unique across nested
+        # assemblies and are what `cdk` commands match stacks against.
+        return {
+            artifact_id: artifact.get('displayName', artifact_id)
+            for artifact_id, artifact in self.get_stack_artifacts().items()
+        }
+
+
+def load_json(path: str) -> Any:
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_cloud_assembly(
+        directory: str,
+        parent: Optional[CloudAssembly] = None,
+) -> CloudAssembly:
+    manifest = load_json(
+        os.path.join(directory, MANIFEST_FILE)
+    )
+    return CloudAssembly(
+        directory=directory,
+        artifacts=manifest.get('artifacts', {}),
+        parent=parent,
+    )
+
+
+def iter_cloud_assemblies(
+        directory: str,
+        parent: Optional[CloudAssembly] = None,
+) -> Iterator[CloudAssembly]:
+    # Yields the assembly in the directory, then every nested assembly.
+    assembly = load_cloud_assembly(directory, parent=parent)
+    yield assembly
+    for artifact in assembly.artifacts.values():
+        if artifact['type'] == NESTED_ASSEMBLY_ARTIFACT_TYPE:
+            yield from iter_cloud_assemblies(
+                assembly.get_path(
+                    artifact['properties']['directoryName']
+                ),
+                parent=assembly,
+            )
@@ -0,0 +1,280 @@
+'''
+Replays a weighted mix of routes against a running frontend and fails if the
+p95 latency or the error rate goes past the given thresholds. Any response
+other than 2xx or 3xx counts as an error, so a WAF block (403), a missing
+route (404) or throttling (429) fails the test as much as a server error.
+
+The deployment pipelines run this after deploying a stage that has
+`load_test` enabled in `infrastructure/config.py`, with the thresholds and
+route mix from that config.
+
+Only uses the standard library, so you can also run it against a local
+docker-compose stack without installing the CDK requirements. Run it from the
+`cdk` directory so it can import the default routes:
+
+$ docker compose up
+$ python -m commands.load_test --url http://localhost:3000
+
+Usage:
+
+$ python -m commands.load_test --url https://igvf-ui-dev.demo.igvf.org \
+    --route /:3 --route /search/?type=MeasurementSet:2 \
+    --requests 300 --concurrency 10 \
+    --max-p95-latency-ms 3000 --max-error-rate 0.01
+
+Exits with status 1 when a threshold is exceeded.
+'''
+import argparse
+
+import json
+
+import logging
+
+import math
+
+import random
+
+import sys
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from urllib.error import HTTPError
+from urllib.error import URLError
+from urllib.request import Request
+from urllib.request import urlopen
+
+from infrastructure.default_routes import DEFAULT_ROUTES
+
+
+USER_AGENT = 'igvf-ui-load-test'
+
+
+@dataclass
+class Result:
+    route: str
+    status: int
+    latency_ms: float
+    error: bool
+
+
+@dataclass
+class RouteSummary:
+    route: str
+    requests: int
+    errors: int
+    p50_latency_ms: float
+    p95_latency_ms: float
+
+
+@dataclass
+class Summary:
+    requests: int
+    errors: int
+    error_rate: float
+    p50_latency_ms: float
+    p95_latency_ms: float
+    max_latency_ms: float
+    routes: List[RouteSummary] = field(default_factory=list)
+    failures: List[str] = field(default_factory=list)
+
+
+def parse_route(value: str) -> Tuple[str, int]:
+    # Weight is optional and separated by the last colon: /search/?type=Lab:2
+    path, separator, weight = value.rpartition(':')
+    if separator and weight.isdigit():
+        return (path, int(weight))
+    return (value, 1)
+
+
+def build_route_mix(
+    routes: Sequence[Tuple[str, int]],
+    requests: int,
+    seed: Optional[int] = None,
+) -> List[str]:
+    paths = [path for path, _ in routes]
+    weights = [weight for _, weight in routes]
+    return random.Random(seed).choices(
+        paths,
+        weights=weights,
+        k=requests,
+    )
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank percentile.
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def is_success_status(status: int) -> bool:
+    # urlopen follows redirects, so 3xx only shows up when it can't.
+    return 200 <= status < 400
+
+
+def fetch(url: str, route: str, timeout: float) -> Result:
+    request = Request(
+        url + route,
+        headers={
+            'User-Agent': USER_AGENT,
+        }
+    )
+    start = time.perf_counter()
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except HTTPError as e:
+        status = e.code
+    except (URLError, OSError):
+        status = 0
+    latency_ms = (time.perf_counter() - start) * 1000
+    return Result(
+        route=route,
+        status=status,
+        latency_ms=latency_ms,
+        error=not is_success_status(status),
+    )
+
+
+def run_load_test(
+    url: str,
+    routes: Sequence[Tuple[str, int]],
+    requests: int,
+    concurrency: int,
+    timeout: float,
+    seed: Optional[int] = None,
+) -> List[Result]:
+    route_mix = build_route_mix(routes, requests, seed=seed)
+    logging.info(
+        f'Sending {requests} requests to {url} with concurrency {concurrency}'
+    )
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(
+            executor.map(
+                lambda route: fetch(url, route, timeout),
+                route_mix,
+            )
+        )
+
+
+def summarize(
+    results: Sequence[Result],
+    max_p95_latency_ms: float,
+    max_error_rate: float,
+) -> Summary:
+    latencies = [result.latency_ms for result in results]
+    errors = sum(result.error for result in results)
+    error_rate = errors / len(results) if results else 0.0
+    summary = Summary(
+        requests=len(results),
+        errors=errors,
+        error_rate=error_rate,
+        p50_latency_ms=percentile(latencies, 50),
+        p95_latency_ms=percentile(latencies, 95),
+        max_latency_ms=max(latencies, default=0.0),
+    )
+    for route in sorted({result.route for result in results}):
+        route_results = [
+            result
+            for result in results
+            if result.route == route
+        ]
+        route_latencies = [result.latency_ms for result in route_results]
+        summary.routes.append(
+            RouteSummary(
+                route=route,
+                requests=len(route_results),
+                errors=sum(result.error for result in route_results),
+                p50_latency_ms=percentile(route_latencies, 50),
+                p95_latency_ms=percentile(route_latencies, 95),
+            )
+        )
+    if summary.p95_latency_ms > max_p95_latency_ms:
+        summary.failures.append(
+            f'p95 latency {summary.p95_latency_ms:.0f} ms exceeds {max_p95_latency_ms:.0f} ms'
+        )
+    if summary.error_rate > max_error_rate:
+        summary.failures.append(
+            f'error rate {summary.error_rate:.2%} exceeds {max_error_rate:.2%}'
+        )
+    return summary
+
+
+def format_summary(summary: Summary) -> str:
+    lines = [
+        f'requests={summary.requests} errors={summary.errors} '
+        f'error_rate={summary.error_rate:.2%} '
+        f'p50={summary.p50_latency_ms:.0f}ms p95={summary.p95_latency_ms:.0f}ms '
+        f'max={summary.max_latency_ms:.0f}ms',
+    ]
+    for route in summary.routes:
+        lines.append(
+            f'  {route.route} requests={route.requests} errors={route.errors} '
+            f'p50={route.p50_latency_ms:.0f}ms p95={route.p95_latency_ms:.0f}ms'
+        )
+    for failure in summary.failures:
+        lines.append(f'FAILED: {failure}')
+    return '\n'.join(lines)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Load test a deployed or local igvf-ui frontend.'
+    )
+    parser.add_argument('--url', required=True)
+    parser.add_argument(
+        '--route',
+        action='append',
+        type=parse_route,
+        dest='routes',
+        help='Route and optional weight, e.g. /search/:2. Repeat for each route.',
+    )
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--max-p95-latency-ms', type=float, default=3000)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', action='store_true')
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    args = get_parser().parse_args(argv)
+    results = run_load_test(
+        args.url.rstrip('/'),
+        args.routes or DEFAULT_ROUTES,
+        args.requests,
+        args.concurrency,
+        args.timeout,
+        seed=args.seed,
+    )
+    summary = summarize(
+        results,
+        args.max_p95_latency_ms,
+        args.max_error_rate,
+    )
+    if args.json:
+        print(json.dumps(asdict(summary), indent=2))
+    else:
+        print(format_summary(summary))
+    return 1 if summary.failures else 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,386 @@
+'''
+Recommends frontend task size and scaling settings from measured traffic.
+
+Takes, for each environment, the JSON summary of its nginx access logs from
+`commands/analyze_access_logs.py` and a CSV of per-task CPU samples, and
+recommends `cpu`, `memory_limit_mib`, `min_capacity`, `max_capacity` and
+`requests_per_target` for its `frontend` entry in `infrastructure/config.py`.
+Prints a diff against the current entry.
+
+The CSV uses the Container Insights task performance log fields. Export it
+from CloudWatch Logs Insights on the `/aws/ecs/containerinsights/<cluster>/performance`
+log group with:
+
+    fields @timestamp, TaskId, CpuUtilized, CpuReserved, MemoryUtilized
+    | filter Type = "Task"
+
+`CpuUtilized` is in CPU units (1024 per vCPU) and `MemoryUtilized` in MiB.
+Use the same time range for the logs and the CPU samples.
+
+How the numbers are picked:
+
+- CPU cost per request is the mean CPU used by all tasks divided by the mean
+  request rate.
+- `cpu` is the smallest task size that keeps the p99 CPU use of a single task
+  below 80%, and `memory_limit_mib` the smallest valid memory for it with 30%
+  headroom over the p99 memory use.
+- `requests_per_target` (requests per task per minute) is the request rate
+  that puts a task at the same utilization as the CPU scaling policy.
+- `min_capacity` covers the median requests per minute and `max_capacity` the
+  busiest minute with 50% headroom.
+
+Usage (from the cdk folder):
+
+$ python commands/analyze_access_logs.py prod-logs/*.gz --json > prod-traffic.json
+$ python -m commands.plan_capacity --traffic production=prod-traffic.json --cpu-samples production=prod-cpu.csv
+'''
+import argparse
+
+import csv
+
+import difflib
+
+import json
+
+import logging
+
+import math
+
+import pprint
+
+import sys
+
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+
+from datetime import datetime
+from datetime import timezone
+
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from infrastructure.config import FARGATE_CPU_TO_MEMORY_MIB
+from infrastructure.config import FrontendSettings
+from infrastructure.config import config
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+# The task runs one Next.js process, which serves requests on a single
+# thread. 2048 leaves the second vCPU to nginx, garbage collection and the
+# libuv thread pool. Anything past that is capacity for more tasks, not
+# bigger ones.
+TASK_CPU_CHOICES = [512, 1024, 2048]
+
+# Matches target_utilization_percent of CpuScaling in the Frontend construct.
+TARGET_CPU_UTILIZATION = 0.55
+
+MAX_TASK_CPU_UTILIZATION = 0.8
+
+MEMORY_HEADROOM = 1.3
+
+MAX_CAPACITY_HEADROOM = 1.5
+
+TIMESTAMP_COLUMNS = ['@timestamp', 'Timestamp', 'timestamp']
+
+
+@dataclass
+class CpuSample:
+    minute: str
+    task_id: str
+    cpu_units: float
+    memory_mib: Optional[float] = None
+
+
+@dataclass
+class Measurements:
+    mean_requests_per_minute: float
+    median_requests_per_minute: float
+    max_requests_per_minute: float
+    mean_total_cpu_units: float
+    p99_task_cpu_units: float
+    p99_task_memory_mib: Optional[float] = None
+
+    @property
+    def cpu_unit_seconds_per_request(self) -> Optional[float]:
+        if not self.mean_requests_per_minute:
+            return None
+        return self.mean_total_cpu_units / (self.mean_requests_per_minute / 60)
+
+
+@dataclass
+class Recommendation:
+    environment: str
+    current: FrontendSettings
+    recommended: FrontendSettings
+    measurements: Measurements
+    notes: List[str] = field(default_factory=list)
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Nearest-rank percentile.
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def parse_key_value(value):
+    key, separator, path = value.partition('=')
+    if not separator or not key or not path:
+        raise argparse.ArgumentTypeError(
+            f'Expected ENVIRONMENT=PATH, got {value}'
+        )
+    return (key, path)
+
+
+def get_minute(timestamp):
+    # Logs Insights exports `2026-10-19 10:00:05.000`, raw performance
+    # log events have milliseconds since the epoch.
+    if timestamp.isdigit():
+        moment = datetime.fromtimestamp(int(timestamp) / 1000, tz=timezone.utc)
+        return moment.strftime('%Y-%m-%d %H:%M')
+    return timestamp.replace('T', ' ')[:16]
+
+
+def read_cpu_samples(path) -> List[CpuSample]:
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        timestamp_column = next(
+            (column for column in TIMESTAMP_COLUMNS if column in fieldnames),
+            None,
+        )
+        if timestamp_column is None or 'CpuUtilized' not in fieldnames:
+            raise ValueError(
+                f'{path} needs a timestamp column and CpuUtilized, got {fieldnames}'
+            )
+        return [
+            CpuSample(
+                minute=get_minute(row[timestamp_column]),
+                task_id=row.get('TaskId') or '-',
+                cpu_units=float(row['CpuUtilized']),
+                memory_mib=float(row['MemoryUtilized']) if row.get('MemoryUtilized') else None,
+            )
+            for row in reader
+            if row.get('CpuUtilized')
+        ]
+
+
+def get_total_cpu_units_per_minute(samples: Iterable[CpuSample]) -> Dict[str, float]:
+    # Average each task over the minute, then add up the tasks.
+    per_task: Dict[str, Dict[str, List[float]]] = {}
+    for sample in samples:
+        per_task.setdefault(sample.minute, {}).setdefault(sample.task_id, []).append(sample.cpu_units)
+    return {
+        minute: sum(
+            sum(values) / len(values)
+            for values in tasks.values()
+        )
+        for minute, tasks in per_task.items()
+    }
+
+
+def measure(traffic: Dict[str, Any], samples: List[CpuSample]) -> Measurements:
+    requests_per_minute = traffic['throughput']['requests_per_minute']
+    total_cpu_units = list(get_total_cpu_units_per_minute(samples).values())
+    memory = [
+        sample.memory_mib
+        for sample in samples
+        if sample.memory_mib is not None
+    ]
+    return Measurements(
+        mean_requests_per_minute=requests_per_minute['mean'],
+        median_requests_per_minute=requests_per_minute['p50'],
+        max_requests_per_minute=requests_per_minute['max'],
+        mean_total_cpu_units=(
+            sum(total_cpu_units) / len(total_cpu_units)
+            if total_cpu_units else 0.0
+        ),
+        p99_task_cpu_units=percentile(
+            [sample.cpu_units for sample in samples],
+            99,
+        ),
+        p99_task_memory_mib=percentile(memory, 99) if memory else None,
+    )
+
+
+def choose_cpu(p99_task_cpu_units):
+    for cpu in TASK_CPU_CHOICES:
+        if p99_task_cpu_units <= cpu * MAX_TASK_CPU_UTILIZATION:
+            return cpu
+    return TASK_CPU_CHOICES[-1]
+
+
+def choose_memory_limit_mib(cpu, p99_task_memory_mib, current_memory_limit_mib):
+    choices = FARGATE_CPU_TO_MEMORY_MIB[cpu]
+    if p99_task_memory_mib is None:
+        # Nothing measured, keep what we have if it's valid for this cpu.
+        if current_memory_limit_mib in choices:
+            return current_memory_limit_mib
+        return choices[0]
+    needed = p99_task_memory_mib * MEMORY_HEADROOM
+    for memory_limit_mib in choices:
+        if memory_limit_mib >= needed:
+            return memory_limit_mib
+    return choices[-1]
+
+
+def recommend(environment: str, current: FrontendSettings, measurements: Measurements) -> Recommendation:
+    notes = []
+    cpu = choose_cpu(measurements.p99_task_cpu_units)
+    if measurements.p99_task_cpu_units > TASK_CPU_CHOICES[-1] * MAX_TASK_CPU_UTILIZATION:
+        notes.append(
+            f'p99 task CPU {measurements.p99_task_cpu_units:.0f} units is above '
+            f'{MAX_TASK_CPU_UTILIZATION:.0%} of the largest task size, '
+            'check for work blocking the Next.js event loop'
+        )
+    memory_limit_mib = choose_memory_limit_mib(
+        cpu,
+        measurements.p99_task_memory_mib,
+        current.memory_limit_mib,
+    )
+    if measurements.p99_task_memory_mib is None:
+        notes.append('No MemoryUtilized samples, memory not sized from usage')
+    cost = measurements.cpu_unit_seconds_per_request
+    if cost:
+        requests_per_target = max(
+            math.floor(TARGET_CPU_UTILIZATION * cpu * 60 / cost),
+            1,
+        )
+    else:
+        requests_per_target = current.requests_per_target
+        notes.append('No traffic or CPU use measured, requests_per_target unchanged')
+    min_capacity = max(
+        math.ceil(measurements.median_requests_per_minute / requests_per_target),
+        1,
+    )
+    max_capacity = max(
+        math.ceil(
+            measurements.max_requests_per_minute * MAX_CAPACITY_HEADROOM / requests_per_target
+        ),
+        min_capacity,
+    )
+    return Recommendation(
+        environment=environment,
+        current=current,
+        recommended=replace(
+            current,
+            cpu=cpu,
+            memory_limit_mib=memory_limit_mib,
+            min_capacity=min_capacity,
+            max_capacity=max_capacity,
+            requests_per_target=requests_per_target,
+        ),
+        measurements=measurements,
+        notes=notes,
+    )
+
+
+def get_current_frontend_settings(environment) -> FrontendSettings:
+    return FrontendSettings(
+        **config['environment'][environment]['frontend']
+    )
+
+
+def format_diff(recommendation: Recommendation) -> str:
+    path = f"config['environment']['{recommendation.environment}']['frontend']"
+    return ''.join(
+        difflib.unified_diff(
+            pprint.pformat(asdict(recommendation.current), sort_dicts=False).splitlines(keepends=True),
+            pprint.pformat(asdict(recommendation.recommended), sort_dicts=False).splitlines(keepends=True),
+            fromfile=path,
+            tofile=f'{path} (recommended)',
+        )
+    )
+
+
+def format_recommendation(recommendation: Recommendation) -> str:
+    measurements = recommendation.measurements
+    cost = measurements.cpu_unit_seconds_per_request
+    lines = [
+        f'{recommendation.environment}: '
+        f'requests_per_minute mean={measurements.mean_requests_per_minute:.1f} '
+        f'p50={measurements.median_requests_per_minute:.0f} '
+        f'max={measurements.max_requests_per_minute:.0f} '
+        f'cpu_unit_seconds_per_request={"-" if cost is None else f"{cost:.1f}"} '
+        f'p99_task_cpu_units={measurements.p99_task_cpu_units:.0f}',
+    ]
+    for note in recommendation.notes:
+        lines.append(f'  note: {note}')
+    diff = format_diff(recommendation)
+    lines.append(diff.rstrip('\n') if diff else '  no changes')
+    return '\n'.join(lines)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Recommend frontend capacity settings from traffic and CPU samples.'
+    )
+    parser.add_argument(
+        '--traffic',
+        action='append',
+        type=parse_key_value,
+        required=True,
+        help='ENVIRONMENT=PATH to analyze_access_logs.py --json output. Repeat for each environment.',
+    )
+    parser.add_argument(
+        '--cpu-samples',
+        action='append',
+        type=parse_key_value,
+        required=True,
+        help='ENVIRONMENT=PATH to a Container Insights task CSV export. Repeat for each environment.',
+    )
+    parser.add_argument('--json', action='store_true')
+    return parser
+
+
+def main(argv):
+    args = get_parser().parse_args(argv)
+    traffic_paths = dict(args.traffic)
+    cpu_sample_paths = dict(args.cpu_samples)
+    missing = set(traffic_paths) ^ set(cpu_sample_paths)
+    if missing:
+        get_parser().error(
+            f'Need both --traffic and --cpu-samples for {sorted(missing)}'
+        )
+    recommendations = []
+    for environment in sorted(traffic_paths):
+        with open(traffic_paths[environment]) as f:
+            traffic = json.load(f)
+        samples = read_cpu_samples(cpu_sample_paths[environment])
+        logging.info(f'Read {len(samples)} CPU samples for {environment}')
+        recommendations.append(
+            recommend(
+                environment,
+                get_current_frontend_settings(environment),
+                measure(traffic, samples),
+            )
+        )
+    if args.json:
+        print(
+            json.dumps(
+                [
+                    {
+                        **asdict(recommendation),
+                        'diff': format_diff(recommendation),
+                    }
+                    for recommendation in recommendations
+                ],
+                indent=2,
+            )
+        )
+    else:
+        print('\n\n'.join(format_recommendation(r) for r in recommendations))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,185 @@
+'''
+Fargate only starts a container after it has pulled the whole image, unless
+the image has a SOCI (Seekable OCI) index in the same ECR repository. With an
+index, Fargate lazily loads the image and new tasks can start serving before
+the pull finishes.
+
+This creates and pushes a SOCI index for each deployed image. The pipeline
+runs it after each deploy stage with the image URIs from the FrontendStack
+outputs. Fargate only lazy loads a task if every container image in the task
+has an index, so pass all of them.
+
+See: https://docs.aws.amazon.com/AmazonECS/latest/developerguide/container-considerations.html
+
+Needs `soci`, `ctr` and a running containerd, plus the AWS CLI with permission
+to assume the CDK image-publishing role in the account that owns the images.
+That role's name includes the qualifier of the account's CDK bootstrap stack,
+which the pipeline passes with `--qualifier`.
+
+Usage:
+
+$ python commands/push_soci_indexes.py --qualifier hnb659fds $APPLICATION_IMAGE_URI $NGINX_IMAGE_URI
+'''
+import argparse
+
+import json
+
+import logging
+
+import os
+
+import sys
+
+from dataclasses import dataclass
+
+from subprocess import check_call
+from subprocess import check_output
+
+
+logging.basicConfig(level=logging.DEBUG)
+
+
+@dataclass
+class ImageUri:
+    uri: str
+    account: str
+    region: str
+    registry: str
+
+
+def parse_image_uri(uri):
+    # e.g. 123456789012.dkr.ecr.us-west-2.amazonaws.com/repository:tag
+    registry = uri.split('/')[0]
+    registry_parts = registry.split('.')
+    if len(registry_parts) < 6 or registry_parts[1:3] != ['dkr', 'ecr']:
+        raise ValueError(f'Not an ECR image URI: {uri}')
+    return ImageUri(
+        uri=uri,
+        account=registry_parts[0],
+        region=registry_parts[3],
+        registry=registry,
+    )
+
+
+def get_image_publishing_role_arn(qualifier, account, region):
+    return (
+        f'arn:aws:iam::{account}:role/'
+        f'cdk-{qualifier}-image-publishing-role-{account}-{region}'
+    )
+
+
+def assume_role(role_arn):
+    logging.info(f'Assuming {role_arn}')
+    credentials = json.loads(
+        check_output(
+            [
+                'aws',
+                'sts',
+                'assume-role',
+                '--role-arn',
+                role_arn,
+                '--role-session-name',
+                'push-soci-indexes',
+                '--query',
+                'Credentials',
+            ],
+            encoding='UTF-8',
+        )
+    )
+    return {
+        **os.environ,
+        'AWS_ACCESS_KEY_ID': credentials['AccessKeyId'],
+        'AWS_SECRET_ACCESS_KEY': credentials['SecretAccessKey'],
+        'AWS_SESSION_TOKEN': credentials['SessionToken'],
+    }
+
+
+def get_ecr_password(image_uri, env):
+    return check_output(
+        [
+            'aws',
+            'ecr',
+            'get-login-password',
+            '--region',
+            image_uri.region,
+        ],
+        encoding='UTF-8',
+        env=env,
+    ).strip()
+
+
+def pull_image(image_uri, password):
+    logging.info(f'Pulling {image_uri.uri}')
+    check_call(
+        [
+            'ctr',
+            'image',
+            'pull',
+            '--user',
+            f'AWS:{password}',
+            image_uri.uri,
+        ]
+    )
+
+
+def create_soci_index(image_uri):
+    logging.info(f'Creating SOCI index for {image_uri.uri}')
+    check_call(
+        [
+            'soci',
+            'create',
+            image_uri.uri,
+        ]
+    )
+
+
+def push_soci_index(image_uri, password):
+    logging.info(f'Pushing SOCI index for {image_uri.uri}')
+    check_call(
+        [
+            'soci',
+            'push',
+            '--user',
+            f'AWS:{password}',
+            image_uri.uri,
+        ]
+    )
+
+
+def push_soci_index_for_image(qualifier, uri):
+    image_uri = parse_image_uri(uri)
+    env = assume_role(
+        get_image_publishing_role_arn(
+            qualifier,
+            image_uri.account,
+            image_uri.region,
+        )
+    )
+    password = get_ecr_password(image_uri, env)
+    pull_image(image_uri, password)
+    create_soci_index(image_uri)
+    push_soci_index(image_uri, password)
+
+
+def push_soci_indexes(qualifier, uris):
+    logging.info(f'Found {len(uris)} images')
+    for uri in uris:
+        push_soci_index_for_image(qualifier, uri)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description='Create and push SOCI indexes for deployed ECR images.'
+    )
+    parser.add_argument(
+        '--qualifier',
+        required=True,
+        help='Qualifier of the CDK bootstrap stack that owns the image assets.',
+    )
+    parser.add_argument('uris', nargs='+')
+    return parser
+
+
+if __name__ == '__main__':
+    args = get_parser().parse_args(sys.argv[1:])
+    push_soci_indexes(args.qualifier, args.uris)
@@ -5,23 +5,43 @@ from aws_cdk import Environment
 from dataclasses import dataclass
 from dataclasses import field
 
+from functools import lru_cache
+
+from types import MappingProxyType
+
 from infrastructure.constructs.existing import igvf_dev
 from infrastructure.constructs.existing import igvf_prod
 
 from infrastructure.constructs.existing.types import ExistingResourcesClass
 
+from infrastructure.default_routes import DEFAULT_ROUTES
+
 
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
+from typing import Union
+
+
+default_load_test: Dict[str, Any] = {
+    'enabled': True,
+    'routes': DEFAULT_ROUTES,
+    'requests': 300,
+    'concurrency': 10,
+    'max_p95_latency_ms': 3000,
+    'max_error_rate': 0.01,
+}
 
 
 config: Dict[str, Any] = {
     'pipeline': {
         'demo': {
             'pipeline': 'DemoDeploymentPipelineStack',
+            'soci_index': True,
             'existing_resources_class': igvf_dev.Resources,
             'account_and_region': igvf_dev.US_WEST_2,
             'tags': [
@@ -31,6 +51,8 @@ config: Dict[str, Any] = {
         },
         'dev': {
             'pipeline': 'DevDeploymentPipelineStack',
+            'soci_index': True,
+            'load_test': True,
             'existing_resources_class': igvf_dev.Resources,
             'account_and_region': igvf_dev.US_WEST_2,
             'tags': [
@@ -39,6 +61,8 @@ config: Dict[str, Any] = {
         'production': {
             'pipeline': 'ProductionDeploymentPipelineStack',
             'cross_account_keys': True,
+            'soci_index': True,
+            'load_test': True,
             'existing_resources_class': igvf_prod.Resources,
             'account_and_region': igvf_prod.US_WEST_2,
             'tags': [
@@ -98,6 +122,7 @@ config: Dict[str, Any] = {
                 'arn': 'arn:aws:wafv2:us-west-2:109189702753:regional/webacl/IgvfUiDemoWaf-HGyhnH6Z5X0B/84cce4ee-629b-41e1-9918-feb83b50f187',
             },
             'backend_url': 'https://igvfd-dev.demo.igvf.org',
+            'load_test': default_load_test,
             'tags': [
             ],
         },
@@ -126,6 +151,7 @@ config: Dict[str, Any] = {
             },
             'backend_url': 'https://api.staging.igvf.org',
             'use_subdomain': False,
+            'load_test': default_load_test,
             'tags': [
             ],
         },
@@ -195,23 +221,203 @@ class Common:
     project_name: str = 'igvf-ui'
     default_region: str = 'us-west-2'
     aws_cdk_version: str = '2.1031.2'
+    soci_snapshotter_version: str = '0.9.0'
 
 
 @dataclass
+class BuildCache:
+    pip: bool = True
+    npm: bool = True
+    docker_layers: bool = True
+    docker_registry: bool = True
+
+
+# Valid Fargate task memory (MiB) for each task cpu value.
+# See: https://docs.aws.amazon.com/AmazonECS/latest/developerguide/fargate-tasks-services.html#fargate-tasks-size
+FARGATE_CPU_TO_MEMORY_MIB: Dict[int, List[int]] = {
+    256: [512, 1024, 2048],
+    512: list(range(1024, 4096 + 1, 1024)),
+    1024: list(range(2048, 8192 + 1, 1024)),
+    2048: list(range(4096, 16384 + 1, 1024)),
+    4096: list(range(8192, 30720 + 1, 1024)),
+    8192: list(range(16384, 61440 + 1, 4096)),
+    16384: list(range(32768, 122880 + 1, 8192)),
+}
+
+
+def validate_fargate_cpu_and_memory(cpu: int, memory_limit_mib: int) -> None:
+    if cpu not in FARGATE_CPU_TO_MEMORY_MIB:
+        raise ValueError(
+            f'Invalid Fargate cpu {cpu}, must be one of {list(FARGATE_CPU_TO_MEMORY_MIB)}'
+        )
+    if memory_limit_mib not in FARGATE_CPU_TO_MEMORY_MIB[cpu]:
+        raise ValueError(
+            f'Invalid Fargate memory_limit_mib {memory_limit_mib} for cpu {cpu}, '
+            f'must be one of {FARGATE_CPU_TO_MEMORY_MIB[cpu]}'
+        )
+
+
+@dataclass(frozen=True)
+class FrontendSettings:
+    cpu: int
+    memory_limit_mib: int
+    max_capacity: int
+    use_redis_named: str
+    min_capacity: int = 1
+    # Requests per task per minute before scaling out.
+    requests_per_target: int = 100
+
+    def __post_init__(self) -> None:
+        validate_fargate_cpu_and_memory(self.cpu, self.memory_limit_mib)
+        if self.max_capacity < 1:
+            raise ValueError(
+                f'Invalid frontend max_capacity {self.max_capacity}, must be at least 1'
+            )
+        if not 1 <= self.min_capacity <= self.max_capacity:
+            raise ValueError(
+                f'Invalid frontend min_capacity {self.min_capacity}, '
+                f'must be between 1 and max_capacity {self.max_capacity}'
+            )
+        if self.requests_per_target < 1:
+            raise ValueError(
+                f'Invalid frontend requests_per_target {self.requests_per_target}, must be at least 1'
+            )
+
+
+@dataclass(frozen=True)
+class RedisClusterProps:
+    cache_node_type: str
+    engine_version: str
+
+    def __post_init__(self) -> None:
+        if not self.cache_node_type.startswith('cache.'):
+            raise ValueError(
+                f'Invalid Redis cache_node_type {self.cache_node_type}'
+            )
+
+
+@dataclass(frozen=True)
+class RedisClusterSettings:
+    construct_id: str
+    on: bool
+    props: RedisClusterProps
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'RedisClusterSettings':
+        return cls(
+            construct_id=values['construct_id'],
+            on=values['on'],
+            props=RedisClusterProps(
+                **values['props']
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class RedisSettings:
+    clusters: Tuple[RedisClusterSettings, ...]
+
+    def __post_init__(self) -> None:
+        construct_ids = [
+            cluster.construct_id
+            for cluster in self.clusters
+        ]
+        if len(construct_ids) != len(set(construct_ids)):
+            raise ValueError(
+                f'Duplicate Redis cluster construct_id in {construct_ids}'
+            )
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> 'RedisSettings':
+        return cls(
+            clusters=tuple(
+                RedisClusterSettings.from_dict(cluster)
+                for cluster in values['clusters']
+            )
+        )
+
+
+@dataclass(frozen=True)
+class WafSettings:
+    enabled: bool
+    arn: str
+
+
+def as_frontend_settings(value: Union[FrontendSettings, Dict[str, Any]]) -> FrontendSettings:
+    if isinstance(value, FrontendSettings):
+        return value
+    return FrontendSettings(**value)
+
+
+def as_redis_settings(value: Union[RedisSettings, Dict[str, Any]]) -> RedisSettings:
+    if isinstance(value, RedisSettings):
+        return value
+    return RedisSettings.from_dict(value)
+
+
+def as_waf_settings(value: Union[WafSettings, Dict[str, Any]]) -> WafSettings:
+    if isinstance(value, WafSettings):
+        return value
+    return WafSettings(**value)
+
+
+def freeze(value: Any) -> Any:
+    # Read-only copy of nested dicts and lists, so a config shared through
+    # the memoized builder can't be changed by one of its callers.
+    if isinstance(value, Mapping):
+        return MappingProxyType(
+            {
+                key: freeze(item)
+                for key, item in value.items()
+            }
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(
+            freeze(item)
+            for item in value
+        )
+    return value
+
+
+@dataclass(frozen=True)
 class Config:
     name: str
     branch: str
     backend_url: str
-    redis: Dict[str, Any]
-    frontend: Dict[str, Any]
-    waf: Dict[str, Any]
-    tags: List[Tuple[str, str]]
+    redis: RedisSettings
+    frontend: FrontendSettings
+    waf: WafSettings
+    tags: Sequence[Tuple[str, str]]
     url_prefix: Optional[str] = None
     use_subdomain: bool = True
+    load_test: Mapping[str, Any] = field(
+        default_factory=dict
+    )
+    docker_cache_repository_uri: Optional[str] = None
     common: Common = field(
         default_factory=Common
     )
 
+    def __post_init__(self) -> None:
+        # Accepts the raw dicts from the config above and validates them
+        # here, so bad sizing fails at synth instead of during a deploy.
+        # Frozen so the memoized configs can be shared between pipelines.
+        object.__setattr__(self, 'redis', as_redis_settings(self.redis))
+        object.__setattr__(self, 'frontend', as_frontend_settings(self.frontend))
+        object.__setattr__(self, 'waf', as_waf_settings(self.waf))
+        object.__setattr__(self, 'tags', freeze(self.tags))
+        object.__setattr__(self, 'load_test', freeze(self.load_test))
+        redis_clusters = [
+            cluster.construct_id
+            for cluster in self.redis.clusters
+            if cluster.on
+        ]
+        if self.frontend.use_redis_named not in redis_clusters:
+            raise ValueError(
+                f'Frontend use_redis_named {self.frontend.use_redis_named} '
+                f'is not an enabled Redis cluster: {redis_clusters}'
+            )
+
 
 @dataclass
 class PipelineConfig:
@@ -222,6 +428,11 @@ class PipelineConfig:
     account_and_region: Environment
     tags: List[Tuple[str, str]]
     cross_account_keys: bool = False
+    soci_index: bool = False
+    load_test: bool = False
+    build_cache: BuildCache = field(
+        default_factory=BuildCache
+    )
     common: Common = field(
         default_factory=Common
     )
@@ -260,6 +471,23 @@ def build_config_from_name(name: str, **kwargs: Any) -> Config:
     return config_factory(**calculated_config)
 
 
+@lru_cache(maxsize=None)
+def build_cached_config_from_name(
+        name: str,
+        branch: str,
+        docker_cache_repository_uri: Optional[str] = None,
+) -> Config:
+    # Pipelines build the same environment configs every time they're
+    # constructed. Build and validate them once per process.
+    raw_config = get_raw_config_from_name(
+        name,
+        branch=branch,
+        docker_cache_repository_uri=docker_cache_repository_uri,
+    )
+    calculated_config = fill_in_calculated_config(raw_config)
+    return config_factory(**calculated_config)
+
+
 def build_pipeline_config_from_name(name: str, **kwargs: Any) -> PipelineConfig:
     return PipelineConfig(
         **{
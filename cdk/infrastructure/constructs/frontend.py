@@ -1,3 +1,4 @@
+from aws_cdk import CfnOutput
 from aws_cdk import Duration
 from aws_cdk import Tags
 
@@ -5,10 +6,14 @@ from constructs import Construct
 
 from aws_cdk.aws_ec2 import Port
 
+from aws_cdk.aws_ecr_assets import DockerCacheOption
+
 from aws_cdk.aws_ecs import AwsLogDriverMode
 from aws_cdk.aws_ecs import CfnService
+from aws_cdk.aws_ecs import ContainerDefinition
 from aws_cdk.aws_ecs import ContainerImage
 from aws_cdk.aws_ecs import DeploymentCircuitBreaker
+from aws_cdk.aws_ecs import FargatePlatformVersion
 from aws_cdk.aws_ecs import Secret
 from aws_cdk.aws_ecs import LogDriver
 
@@ -35,6 +40,7 @@ from infrastructure.constructs.waf import WAF
 from infrastructure.constructs.existing.types import ExistingResources
 
 from typing import Any
+from typing import Dict
 from typing import cast
 
 from dataclasses import dataclass
@@ -55,6 +61,8 @@ class FrontendProps:
     memory_limit_mib: int
     max_capacity: int
     use_redis_named: str
+    min_capacity: int = 1
+    requests_per_target: int = 100
 
 
 class Frontend(Construct):
@@ -64,6 +72,9 @@ class Frontend(Construct):
     nginx_image: ContainerImage
     domain_name: str
     fargate_service: ApplicationLoadBalancedFargateService
+    application_container: ContainerDefinition
+    application_image_uri_output: CfnOutput
+    nginx_image_uri_output: CfnOutput
     redis: Redis
 
     def __init__(
@@ -81,6 +92,7 @@ class Frontend(Construct):
         self._define_domain_name()
         self._define_fargate_service()
         self._add_application_container_to_task()
+        self._add_image_uri_outputs()
         self._allow_connections_to_redis()
         self._configure_health_check()
         self._add_tags_to_fargate_service()
@@ -97,13 +109,42 @@ class Frontend(Construct):
             )
         )
 
+    def _get_docker_cache_options(self, tag: str) -> Dict[str, Any]:
+        repository_uri = self.props.config.docker_cache_repository_uri
+        if repository_uri is None:
+            return {}
+        ref = f'{repository_uri}:{tag}'
+        return {
+            'cache_from': [
+                DockerCacheOption(
+                    type='registry',
+                    params={
+                        'ref': ref,
+                    }
+                )
+            ],
+            'cache_to': DockerCacheOption(
+                type='registry',
+                params={
+                    'ref': ref,
+                    'mode': 'max',
+                    # Required for ECR to accept the cache manifest.
+                    'image-manifest': 'true',
+                    'oci-mediatypes': 'true',
+                }
+            ),
+        }
+
     def _define_docker_assets(self) -> None:
         self.application_image = ContainerImage.from_asset(
             '../',
             file='docker/nextjs/Dockerfile',
+            target='production',
+            **self._get_docker_cache_options('nextjs'),
         )
         self.nginx_image = ContainerImage.from_asset(
             '../docker/nginx/',
+            **self._get_docker_cache_options('nginx'),
         )
 
     def _define_domain_name(self) -> None:
@@ -124,6 +165,8 @@ class Frontend(Construct):
             service_name='Frontend',
             vpc=self.props.existing_resources.network.vpc,
             cpu=self.props.cpu,
+            # Lazy loading images with SOCI indexes needs platform 1.4.0.
+            platform_version=FargatePlatformVersion.VERSION1_4,
             min_healthy_percent=100,
             max_healthy_percent=200,
             circuit_breaker=DeploymentCircuitBreaker(
@@ -148,7 +191,7 @@ class Frontend(Construct):
 
     def _add_application_container_to_task(self) -> None:
         container_name = 'nextjs'
-        self.fargate_service.task_definition.add_container(
+        self.application_container = self.fargate_service.task_definition.add_container(
             'ApplicationContainer',
             container_name=container_name,
             image=self.application_image,
@@ -163,6 +206,23 @@ class Frontend(Construct):
             ),
         )
 
+    def _add_image_uri_outputs(self) -> None:
+        # Used by the pipeline to push SOCI indexes for the deployed images.
+        nginx_container = cast(
+            ContainerDefinition,
+            self.fargate_service.task_definition.default_container,
+        )
+        self.application_image_uri_output = CfnOutput(
+            self,
+            'ApplicationImageUri',
+            value=self.application_container.image_name,
+        )
+        self.nginx_image_uri_output = CfnOutput(
+            self,
+            'NginxImageUri',
+            value=nginx_container.image_name,
+        )
+
     def _allow_connections_to_redis(self) -> None:
         self.fargate_service.service.connections.allow_to_default_port(
             self.redis.connections,
@@ -199,11 +259,12 @@ class Frontend(Construct):
 
     def _configure_task_scaling(self) -> None:
         scalable_task = self.fargate_service.service.auto_scale_task_count(
+            min_capacity=self.props.min_capacity,
             max_capacity=self.props.max_capacity,
         )
         scalable_task.scale_on_request_count(
             'RequestCountScaling',
-            requests_per_target=100,
+            requests_per_target=self.props.requests_per_target,
             target_group=self.fargate_service.target_group,
             scale_in_cooldown=Duration.seconds(300),
             scale_out_cooldown=Duration.seconds(60),
@@ -231,7 +292,8 @@ class Frontend(Construct):
             self,
             'WAF',
             props=WAFProps(
-                **self.props.config.waf,
+                enabled=self.props.config.waf.enabled,
+                arn=self.props.config.waf.arn,
                 alb=self.fargate_service.load_balancer,
             )
         )
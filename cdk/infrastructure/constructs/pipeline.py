@@ -1,26 +1,44 @@
 from constructs import Construct
 
+from aws_cdk import DefaultStackSynthesizer
+from aws_cdk import Duration
 from aws_cdk import RemovalPolicy
 
+from aws_cdk.aws_codebuild import BuildEnvironment
+from aws_cdk.aws_codebuild import BuildSpec
+from aws_cdk.aws_codebuild import Cache
+from aws_cdk.aws_codebuild import LocalCacheMode
+
 from aws_cdk.aws_codepipeline import Pipeline
 
+from aws_cdk.aws_ecr import LifecycleRule
+from aws_cdk.aws_ecr import Repository
+from aws_cdk.aws_ecr import TagStatus
+
+from aws_cdk.aws_iam import PolicyStatement
+
 from aws_cdk.aws_s3 import Bucket
 from aws_cdk.aws_s3 import BlockPublicAccess
 
+from aws_cdk.pipelines import CodeBuildOptions
+from aws_cdk.pipelines import CodeBuildStep
 from aws_cdk.pipelines import CodePipeline
 from aws_cdk.pipelines import CodePipelineSource
 from aws_cdk.pipelines import DockerCredential
 from aws_cdk.pipelines import ManualApprovalStep
 from aws_cdk.pipelines import ShellStep
+from aws_cdk.pipelines import Step
 from aws_cdk.pipelines import Wave
 
 from infrastructure.config import Config
 from infrastructure.config import PipelineConfig
-from infrastructure.config import build_config_from_name
+from infrastructure.config import build_cached_config_from_name
 
 from infrastructure.naming import prepend_branch_name
 from infrastructure.naming import prepend_project_name
 
+from infrastructure.stacks.frontend import FrontendStack
+
 from infrastructure.stages.demo import DemoDeployStage
 from infrastructure.stages.dev import DevelopmentDeployStage
 from infrastructure.stages.staging import StagingDeployStage
@@ -30,10 +48,40 @@ from infrastructure.stages.production import ProductionDeployStage
 from infrastructure.constructs.existing.types import ExistingResources
 
 from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
 
 from dataclasses import dataclass
 
+from shlex import quote
+
+
+PIP_CACHE_PATH = '/root/.cache/pip/**/*'
+
+NPM_CACHE_PATH = '/root/.npm/**/*'
+
+# Context key that sets the qualifier of the CDK bootstrap stack when it
+# isn't the default, e.g. after `cdk bootstrap --qualifier`.
+BOOTSTRAP_QUALIFIER_CONTEXT_KEY = '@aws-cdk/core:bootstrapQualifier'
+
+
+def get_bootstrap_qualifier(scope: Construct) -> str:
+    # The stack synthesizer names the bootstrap roles and asset repositories
+    # with this qualifier.
+    qualifier = scope.node.try_get_context(BOOTSTRAP_QUALIFIER_CONTEXT_KEY)
+    return str(qualifier or DefaultStackSynthesizer.DEFAULT_QUALIFIER)
+
+
+def get_docker_cache_repository_name(branch: str) -> str:
+    # ECR repository names must be lowercase.
+    return prepend_project_name(
+        prepend_branch_name(
+            branch,
+            'docker-cache',
+        )
+    ).lower()
+
 
 @dataclass
 class BasicSelfUpdatingPipelineProps:
@@ -47,6 +95,8 @@ class BasicSelfUpdatingPipeline(Construct):
     github: CodePipelineSource
     synth: ShellStep
     artifact_bucket: Optional[Bucket] = None
+    docker_cache_repository: Optional[Repository] = None
+    docker_cache_repository_uri: Optional[str] = None
     underlying_pipeline: Pipeline
     code_pipeline: CodePipeline
     pipeline: Pipeline
@@ -63,6 +113,7 @@ class BasicSelfUpdatingPipeline(Construct):
         self.props = props
         self._define_github_connection()
         self._define_cdk_synth_step()
+        self._maybe_define_docker_cache_repository()
         self._maybe_define_artifact_bucket()
         self._define_underlying_pipeline()
         self._make_code_pipeline()
@@ -94,6 +145,36 @@ class BasicSelfUpdatingPipeline(Construct):
             primary_output_directory='cdk/cdk.out',
         )
 
+    def _define_docker_cache_repository(self) -> None:
+        repository_name = get_docker_cache_repository_name(
+            self.props.config.branch
+        )
+        self.docker_cache_repository = Repository(
+            self,
+            'DockerCacheRepository',
+            repository_name=repository_name,
+            removal_policy=RemovalPolicy.DESTROY,
+            empty_on_delete=True,
+            lifecycle_rules=[
+                LifecycleRule(
+                    description='Expire cache manifests replaced by newer builds',
+                    tag_status=TagStatus.UNTAGGED,
+                    max_image_age=Duration.days(7),
+                )
+            ]
+        )
+        # Asset manifests can't contain tokens, so build the URI from the
+        # concrete pipeline environment instead of the repository attribute.
+        account_and_region = self.props.config.account_and_region
+        self.docker_cache_repository_uri = (
+            f'{account_and_region.account}.dkr.ecr.{account_and_region.region}'
+            f'.amazonaws.com/{repository_name}'
+        )
+
+    def _maybe_define_docker_cache_repository(self) -> None:
+        if self.props.config.build_cache.docker_registry:
+            self._define_docker_cache_repository()
+
     def _get_docker_credentials(self) -> DockerCredential:
         return DockerCredential.docker_hub(
             self.props.existing_resources.docker_hub_credentials.secret,
@@ -128,6 +209,118 @@ class BasicSelfUpdatingPipeline(Construct):
             artifact_bucket=self.artifact_bucket,
         )
 
+    def _get_local_build_cache(self, custom_cache_paths: List[str]) -> Cache:
+        # Local caches live on the CodeBuild host and are best-effort,
+        # so a cold host just falls back to a full install/build.
+        cache_modes = []
+        if custom_cache_paths:
+            cache_modes.append(LocalCacheMode.CUSTOM)
+        if self.props.config.build_cache.docker_layers:
+            cache_modes.append(LocalCacheMode.DOCKER_LAYER)
+        if not cache_modes:
+            return Cache.none()
+        return Cache.local(*cache_modes)
+
+    def _get_partial_build_spec(
+            self,
+            custom_cache_paths: List[str],
+            install_commands: List[str],
+    ) -> Optional[BuildSpec]:
+        build_spec: Dict[str, Any] = {}
+        if custom_cache_paths:
+            build_spec['cache'] = {
+                'paths': custom_cache_paths,
+            }
+        if install_commands:
+            build_spec['phases'] = {
+                'install': {
+                    'commands': install_commands,
+                }
+            }
+        if not build_spec:
+            return None
+        return BuildSpec.from_object(build_spec)
+
+    def _get_synth_custom_cache_paths(self) -> List[str]:
+        custom_cache_paths = []
+        if self.props.config.build_cache.npm:
+            custom_cache_paths.append(NPM_CACHE_PATH)
+        if self.props.config.build_cache.pip:
+            custom_cache_paths.append(PIP_CACHE_PATH)
+        return custom_cache_paths
+
+    def _get_synth_code_build_defaults(self) -> CodeBuildOptions:
+        custom_cache_paths = self._get_synth_custom_cache_paths()
+        return CodeBuildOptions(
+            cache=self._get_local_build_cache(custom_cache_paths),
+            partial_build_spec=self._get_partial_build_spec(
+                custom_cache_paths,
+                [],
+            ),
+        )
+
+    def _get_docker_cache_repository_install_commands(self) -> List[str]:
+        if self.docker_cache_repository is None:
+            return []
+        account_and_region = self.props.config.account_and_region
+        registry = (
+            f'{account_and_region.account}.dkr.ecr.{account_and_region.region}.amazonaws.com'
+        )
+        # Registry cache export isn't supported by the default docker
+        # driver, so publish through a docker-container builder that still
+        # loads the result into the local image store for cdk-assets to push.
+        return [
+            f'aws ecr get-login-password --region {account_and_region.region} '
+            f'| docker login --username AWS --password-stdin {registry}',
+            'docker buildx create --name cdk-assets --driver docker-container '
+            '--driver-opt default-load=true --use',
+        ]
+
+    def _get_docker_cache_repository_role_policy(self) -> Optional[List[PolicyStatement]]:
+        if self.docker_cache_repository is None:
+            return None
+        return [
+            PolicyStatement(
+                actions=[
+                    'ecr:GetAuthorizationToken',
+                ],
+                resources=[
+                    '*',
+                ],
+            ),
+            PolicyStatement(
+                actions=[
+                    'ecr:BatchCheckLayerAvailability',
+                    'ecr:BatchGetImage',
+                    'ecr:CompleteLayerUpload',
+                    'ecr:GetDownloadUrlForLayer',
+                    'ecr:InitiateLayerUpload',
+                    'ecr:PutImage',
+                    'ecr:UploadLayerPart',
+                ],
+                resources=[
+                    self.docker_cache_repository.repository_arn,
+                ],
+            ),
+        ]
+
+    def _get_asset_publishing_custom_cache_paths(self) -> List[str]:
+        custom_cache_paths = []
+        if self.props.config.build_cache.npm:
+            custom_cache_paths.append(NPM_CACHE_PATH)
+        return custom_cache_paths
+
+    def _get_asset_publishing_code_build_defaults(self) -> CodeBuildOptions:
+        custom_cache_paths = self._get_asset_publishing_custom_cache_paths()
+        return CodeBuildOptions(
+            cache=self._get_local_build_cache(custom_cache_paths),
+            partial_build_spec=self._get_partial_build_spec(
+                custom_cache_paths,
+                self._get_docker_cache_repository_install_commands(),
+            ),
+            role_policy=self._get_docker_cache_repository_role_policy(),
+        )
+
     def _make_code_pipeline(self) -> None:
         self.code_pipeline = CodePipeline(
             self,
@@ -138,8 +331,97 @@ class BasicSelfUpdatingPipeline(Construct):
             ],
             docker_enabled_for_synth=True,
             code_pipeline=self.underlying_pipeline,
+            synth_code_build_defaults=self._get_synth_code_build_defaults(),
+            asset_publishing_code_build_defaults=self._get_asset_publishing_code_build_defaults(),
         )
 
+    def _get_soci_index_step(self, frontend_stack: FrontendStack) -> CodeBuildStep:
+        version = self.props.config.common.soci_snapshotter_version
+        qualifier = get_bootstrap_qualifier(self)
+        return CodeBuildStep(
+            'PushSociIndexesStep',
+            input=self.github,
+            env_from_cfn_outputs={
+                'APPLICATION_IMAGE_URI': frontend_stack.frontend.application_image_uri_output,
+                'NGINX_IMAGE_URI': frontend_stack.frontend.nginx_image_uri_output,
+            },
+            install_commands=[
+                'curl -sSL https://github.com/awslabs/soci-snapshotter/releases/download/'
+                f'v{version}/soci-snapshotter-{version}-linux-amd64.tar.gz '
+                '| tar -xz -C /usr/local/bin soci',
+                'nohup containerd > /tmp/containerd.log 2>&1 &',
+                'sleep 5',
+            ],
+            commands=[
+                'cd ./cdk',
+                f'python commands/push_soci_indexes.py --qualifier {quote(qualifier)} '
+                '$APPLICATION_IMAGE_URI $NGINX_IMAGE_URI',
+            ],
+            build_environment=BuildEnvironment(
+                privileged=True,
+            ),
+            role_policy_statements=[
+                PolicyStatement(
+                    actions=[
+                        'sts:AssumeRole',
+                    ],
+                    resources=[
+                        f'arn:aws:iam::*:role/cdk-{qualifier}-image-publishing-role-*',
+                    ],
+                ),
+            ],
+        )
+
+    def _get_load_test_command(self, config: Config, frontend_stack: FrontendStack) -> str:
+        load_test = config.load_test
+        arguments = [
+            '--url',
+            f'https://{frontend_stack.frontend.domain_name}',
+            '--requests',
+            str(load_test['requests']),
+            '--concurrency',
+            str(load_test['concurrency']),
+            '--max-p95-latency-ms',
+            str(load_test['max_p95_latency_ms']),
+            '--max-error-rate',
+            str(load_test['max_error_rate']),
+        ]
+        for route, weight in load_test['routes']:
+            arguments.extend(
+                [
+                    '--route',
+                    f'{route}:{weight}',
+                ]
+            )
+        return ' '.join(
+            ['python', '-m', 'commands.load_test'] + [
+                quote(argument)
+                for argument in arguments
+            ]
+        )
+
+    def _get_load_test_step(self, config: Config, frontend_stack: FrontendStack) -> ShellStep:
+        return ShellStep(
+            'LoadTestStep',
+            input=self.github,
+            commands=[
+                'cd ./cdk',
+                self._get_load_test_command(config, frontend_stack),
+            ],
+        )
+
+    def _get_post_deploy_steps(self, config: Config, frontend_stack: FrontendStack) -> List[Step]:
+        steps: List[Step] = []
+        if self.props.config.soci_index:
+            steps.append(
+                self._get_soci_index_step(frontend_stack)
+            )
+        if self.props.config.load_test and config.load_test.get('enabled', False):
+            steps.append(
+                self._get_load_test_step(config, frontend_stack)
+            )
+        return steps
+
     def _get_underlying_pipeline(self) -> Pipeline:
         if getattr(self, 'pipeline', None) is None:
             # Can't modify high-level CodePipeline after build.
@@ -181,9 +463,10 @@ class DemoDeploymentPipeline(BasicSelfUpdatingPipeline):
         self._add_slack_notifications()
 
     def _define_demo_environment_config(self) -> None:
-        self.demo_config = build_config_from_name(
+        self.demo_config = build_cached_config_from_name(
             'demo',
             branch=self.props.config.branch,
+            docker_cache_repository_uri=self.docker_cache_repository_uri,
         )
 
     def _add_development_deploy_stage(self) -> None:
@@ -199,6 +482,10 @@ class DemoDeploymentPipeline(BasicSelfUpdatingPipeline):
         )
         self.code_pipeline.add_stage(
             stage,
+            post=self._get_post_deploy_steps(
+                self.demo_config,
+                stage.frontend_stack,
+            ),
         )
 
 
@@ -228,9 +515,10 @@ class DevDeploymentPipeline(BasicSelfUpdatingPipeline):
         self._add_slack_notifications()
 
     def _define_dev_environment_config(self) -> None:
-        self.dev_config = build_config_from_name(
+        self.dev_config = build_cached_config_from_name(
             'dev',
             branch=self.props.config.branch,
+            docker_cache_repository_uri=self.docker_cache_repository_uri,
         )
 
     def _add_development_deploy_stage(self) -> None:
@@ -246,6 +534,10 @@ class DevDeploymentPipeline(BasicSelfUpdatingPipeline):
         )
         self.code_pipeline.add_stage(
             stage,
+            post=self._get_post_deploy_steps(
+                self.dev_config,
+                stage.frontend_stack,
+            ),
         )
 
 
@@ -289,21 +581,24 @@ class ProductionDeploymentPipeline(BasicSelfUpdatingPipeline):
         self._add_slack_notifications()
 
     def _define_staging_config(self) -> None:
-        self.staging_config = build_config_from_name(
+        self.staging_config = build_cached_config_from_name(
             'staging',
             branch=self.props.config.branch,
+            docker_cache_repository_uri=self.docker_cache_repository_uri,
         )
 
     def _define_sandbox_config(self) -> None:
-        self.sandbox_config = build_config_from_name(
+        self.sandbox_config = build_cached_config_from_name(
             'sandbox',
             branch=self.props.config.branch,
+            docker_cache_repository_uri=self.docker_cache_repository_uri,
         )
 
     def _define_production_config(self) -> None:
-        self.production_config = build_config_from_name(
+        self.production_config = build_cached_config_from_name(
             'production',
             branch=self.props.config.branch,
+            docker_cache_repository_uri=self.docker_cache_repository_uri,
         )
 
     def _define_staging_stage(self) -> None:
@@ -344,7 +639,11 @@ class ProductionDeploymentPipeline(BasicSelfUpdatingPipeline):
 
     def _add_staging_deploy_stage(self) -> None:
         self.code_pipeline.add_stage(
-            self.staging_stage
+            self.staging_stage,
+            post=self._get_post_deploy_steps(
+                self.staging_config,
+                self.staging_stage.frontend_stack,
+            ),
         )
 
     def _add_production_deploy_wave(self) -> None:
@@ -359,10 +658,18 @@ class ProductionDeploymentPipeline(BasicSelfUpdatingPipeline):
 
     def _add_sandbox_stage_to_production_deploy_wave(self) -> None:
         self.production_deploy_wave.add_stage(
-            self.sandbox_stage
+            self.sandbox_stage,
+            post=self._get_post_deploy_steps(
+                self.sandbox_config,
+                self.sandbox_stage.frontend_stack,
+            ),
         )
 
     def _add_production_stage_to_production_deploy_wave(self) -> None:
         self.production_deploy_wave.add_stage(
-            self.production_stage
+            self.production_stage,
+            post=self._get_post_deploy_steps(
+                self.production_config,
+                self.production_stage.frontend_stack,
+            ),
         )
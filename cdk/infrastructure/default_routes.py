@@ -0,0 +1,14 @@
+from typing import List
+from typing import Tuple
+
+
+# Route mix of the pipeline load tests in `infrastructure/config.py` and the
+# default of `commands/load_test.py`. Only uses the standard library so the
+# load test step can run without the CDK requirements installed.
+DEFAULT_ROUTES: List[Tuple[str, int]] = [
+    ('/', 3),
+    ('/search/?type=MeasurementSet', 3),
+    ('/measurement-sets/', 2),
+    ('/labs/', 1),
+    ('/profiles/', 1),
+]
@@ -35,7 +35,12 @@ class FrontendStack(Stack):
             self,
             'Frontend',
             props=FrontendProps(
-                **config.frontend,
+                cpu=config.frontend.cpu,
+                memory_limit_mib=config.frontend.memory_limit_mib,
+                max_capacity=config.frontend.max_capacity,
+                use_redis_named=config.frontend.use_redis_named,
+                min_capacity=config.frontend.min_capacity,
+                requests_per_target=config.frontend.requests_per_target,
                 config=config,
                 redis_multiplexer=redis_multiplexer,
                 existing_resources=self.existing_resources,
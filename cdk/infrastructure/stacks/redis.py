@@ -3,6 +3,7 @@ from aws_cdk import Stack
 from constructs import Construct
 
 from infrastructure.config import Config
+from infrastructure.config import RedisClusterSettings
 
 from infrastructure.constructs.redis import Redis
 from infrastructure.constructs.redis import RedisProps
@@ -13,19 +14,9 @@ from infrastructure.multiplexer import MultiplexerConfig
 from infrastructure.multiplexer import Multiplexer
 
 from typing import Any
-from typing import Dict
 from typing import List
 from typing import Type
 
-from dataclasses import dataclass
-
-
-@dataclass
-class RedisConfig:
-    construct_id: str
-    on: bool
-    props: Dict[str, Any]
-
 
 class RedisStack(Stack):
 
@@ -50,29 +41,22 @@ class RedisStack(Stack):
         self._define_multiplexer_configs()
         self._define_multiplexer()
 
-    def _get_redis_config(self, cluster: Dict[str, Any]) -> RedisConfig:
-        return RedisConfig(
-            **cluster
-        )
-
-    def _get_redis_props(self, redis_config: RedisConfig) -> RedisProps:
+    def _get_redis_props(self, cluster: RedisClusterSettings) -> RedisProps:
         return RedisProps(
-            **redis_config.props,
+            cache_node_type=cluster.props.cache_node_type,
+            engine_version=cluster.props.engine_version,
             config=self.config,
             existing_resources=self.existing_resources,
         )
 
     def _define_multiplexer_configs(self) -> None:
-        for cluster in self.config.redis['clusters']:
-            redis_config = self._get_redis_config(
-                cluster,
-            )
+        for cluster in self.config.redis.clusters:
             redis_props = self._get_redis_props(
-                redis_config,
+                cluster,
             )
             multiplexer_config = MultiplexerConfig(
-                construct_id=redis_config.construct_id,
-                on=redis_config.on,
+                construct_id=cluster.construct_id,
+                on=cluster.on,
                 construct_class=Redis,
                 kwargs={
                     'props': redis_props,
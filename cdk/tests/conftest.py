@@ -1,6 +1,42 @@
 import pytest
 
 
+class TemplateCache:
+    '''
+    Synthesizing a stack goes through the jsii runtime and dominates the
+    time of the unit tests. Tests that build the same construct configuration
+    share one synthesized result per session instead of building their own.
+
+    Cached values are shared between tests, so don't modify them. Pass the
+    inputs that the build depends on (e.g. the config fixture) after the
+    build function. Their reprs are part of the cache key, so a test that
+    overrides one of those fixtures gets its own result.
+
+    Have the build function get the constructs it needs, like `stack` or
+    `existing_resources`, with `request.getfixturevalue()` instead of taking
+    them as test arguments. Then a cache hit doesn't build them.
+    '''
+
+    def __init__(self):
+        self._values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build, *inputs):
+        key = (key, *(repr(value) for value in inputs))
+        if key in self._values:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._values[key] = build()
+        return self._values[key]
+
+
+@pytest.fixture(scope='session')
+def template_cache():
+    return TemplateCache()
+
+
 @pytest.fixture
 def stack():
     from aws_cdk import Stack
@@ -128,33 +164,48 @@ def existing_resources(mocker, domain, network, secret, chatbot, sns_topic):
 
 
 @pytest.fixture
-def config():
+def raw_redis_config():
+    return {
+        'clusters': [
+            {
+                'construct_id': 'Redis71',
+                'on': True,
+                'props': {
+                    'cache_node_type': 'cache.t4g.small',
+                    'engine_version': '7.1',
+                }
+            },
+        ],
+    }
+
+
+@pytest.fixture
+def raw_frontend_config():
+    return {
+        'cpu': 1024,
+        'memory_limit_mib': 2048,
+        'max_capacity': 4,
+        'use_redis_named': 'Redis71',
+    }
+
+
+@pytest.fixture
+def raw_waf_config():
+    return {
+        'enabled': True,
+        'arn': 'some-waf-arn',
+    }
+
+
+@pytest.fixture
+def config(raw_redis_config, raw_frontend_config, raw_waf_config):
     from infrastructure.config import Config
     return Config(
         name='demo',
         branch='some-branch',
-        redis={
-            'clusters': [
-                {
-                    'construct_id': 'Redis71',
-                    'on': True,
-                    'props': {
-                        'cache_node_type': 'cache.t4g.small',
-                        'engine_version': '7.1',
-                    }
-                },
-            ],
-        },
-        frontend={
-            'cpu': 1024,
-            'memory_limit_mib': 2048,
-            'max_capacity': 4,
-            'use_redis_named': 'Redis71',
-        },
-        waf={
-            'enabled': True,
-            'arn': 'some-waf-arn',
-        },
+        redis=raw_redis_config,
+        frontend=raw_frontend_config,
+        waf=raw_waf_config,
         backend_url='https://igvfd-some-test-backend.demo.igvf.org',
         tags=[
             ('test', 'tag')
@@ -199,7 +250,8 @@ def production_pipeline_config():
 def redis_props(existing_resources, config):
     from infrastructure.constructs.redis import RedisProps
     return RedisProps(
-        **config.redis['clusters'][0]['props'],
+        cache_node_type=config.redis.clusters[0].props.cache_node_type,
+        engine_version=config.redis.clusters[0].props.engine_version,
         config=config,
         existing_resources=existing_resources,
     )
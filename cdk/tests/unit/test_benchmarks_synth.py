@@ -0,0 +1,95 @@
+def test_benchmarks_synth_summarize_seconds():
+    from benchmarks.synth import summarize_seconds
+    assert summarize_seconds([3.0, 1.0, 2.0]) == {
+        'min': 1.0,
+        'median': 2.0,
+        'max': 3.0,
+    }
+
+
+def test_benchmarks_synth_get_stack_metrics(tmp_path):
+    import json
+    from benchmarks.synth import get_stack_metrics
+    from types import SimpleNamespace
+    template = {
+        'Resources': {
+            'A': {'Type': 'AWS::SNS::Topic'},
+            'B': {'Type': 'AWS::SQS::Queue'},
+        }
+    }
+    template_file = tmp_path / 'Stack.template.json'
+    template_file.write_text(json.dumps(template))
+    stack = SimpleNamespace(
+        hierarchical_id='Pipeline/Stage/Stack',
+        template_full_path=str(template_file),
+        template=template,
+    )
+    assert get_stack_metrics(stack) == {
+        'name': 'Pipeline/Stage/Stack',
+        'template_bytes': len(json.dumps(template)),
+        'resource_count': 2,
+    }
+
+
+def test_benchmarks_synth_synth_cold_and_warm(mocker):
+    from aws_cdk import Stack
+    from aws_cdk.aws_sns import Topic
+    from benchmarks.synth import synth_cold_and_warm
+
+    def build(app):
+        stack = Stack(app, 'TestStack')
+        Topic(stack, 'Topic')
+
+    # Stand-in for the real app so the unit suite doesn't synthesize a pipeline.
+    mocker.patch('infrastructure.build.build', build)
+    result = synth_cold_and_warm('demo')
+    assert result['import_seconds'] >= 0
+    for kind in ['cold', 'warm']:
+        assert result[kind]['build_seconds'] > 0
+        assert result[kind]['synth_seconds'] > 0
+        assert result[kind]['construct_count'] > 0
+        assert [
+            (stack['name'], stack['resource_count'])
+            for stack in result[kind]['stacks']
+        ] == [('TestStack', 1)]
+
+
+def test_benchmarks_synth_benchmark_pipeline_config(mocker):
+    from benchmarks import synth
+    stacks = [
+        {'name': 'Pipeline', 'template_bytes': 100, 'resource_count': 2},
+        {'name': 'Pipeline/Stage/Stack', 'template_bytes': 50, 'resource_count': 1},
+    ]
+
+    def run(build_seconds, synth_seconds):
+        return {
+            'build_seconds': build_seconds,
+            'synth_seconds': synth_seconds,
+            'construct_count': 10,
+            'stacks': stacks,
+        }
+
+    run_in_subprocess = mocker.patch.object(
+        synth,
+        'run_in_subprocess',
+        side_effect=[
+            {'import_seconds': 7.0, 'cold': run(3.0, 2.0), 'warm': run(1.0, 1.0)},
+            {'import_seconds': 8.0, 'cold': run(5.0, 4.0), 'warm': run(0.5, 2.0)},
+        ],
+    )
+    result = synth.benchmark_pipeline_config('demo', repeat=2)
+    assert run_in_subprocess.call_count == 2
+    assert result['config_name'] == 'demo'
+    assert result['import_seconds'] == {'min': 7.0, 'median': 7.5, 'max': 8.0}
+    assert result['cold'] == {
+        'build_seconds': {'min': 3.0, 'median': 4.0, 'max': 5.0},
+        'synth_seconds': {'min': 2.0, 'median': 3.0, 'max': 4.0},
+    }
+    assert result['warm'] == {
+        'build_seconds': {'min': 0.5, 'median': 0.75, 'max': 1.0},
+        'synth_seconds': {'min': 1.0, 'median': 1.5, 'max': 2.0},
+    }
+    assert result['construct_count'] == 10
+    assert result['stack_count'] == 2
+    assert result['template_bytes'] == 150
+    assert result['resource_count'] == 3
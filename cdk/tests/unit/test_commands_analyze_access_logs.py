@@ -0,0 +1,157 @@
+LOG_LINES = [
+    (
+        '10.0.1.5 - - [19/Oct/2026:10:00:00 +0000] "GET /measurement-sets/IGVFDS0000AAAA/ HTTP/1.1" '
+        '200 5120 "-" "Mozilla/5.0 (X11; Linux x86_64)" client_ip=1.2.3.4, 10.0.0.1 '
+        'request_time=0.250 upstream_response_time=0.240 upstream_connect_time=0.001 '
+        'upstream_header_time=0.200 \n'
+    ),
+    (
+        '10.0.1.5 - - [19/Oct/2026:10:00:01 +0000] "GET /measurement-sets/IGVFDS0000BBBB/ HTTP/1.1" '
+        '200 5120 "-" "curl/8.0" client_ip=- '
+        'request_time=1.500 upstream_response_time=1.000, 0.400 upstream_connect_time=0.001, 0.001 '
+        'upstream_header_time=0.900, 0.300 \n'
+    ),
+    (
+        '10.0.1.5 - - [19/Oct/2026:10:00:02 +0000] "GET /_next/static/chunks/main-abc123.js HTTP/1.1" '
+        '304 0 "-" "curl/8.0" client_ip=- '
+        'request_time=0.000 upstream_response_time=- upstream_connect_time=- '
+        'upstream_header_time=- \n'
+    ),
+    (
+        '2026-10-19T10:00:03.000Z 10.0.1.5 - - [19/Oct/2026:10:00:03 +0000] '
+        '"GET /search/?type=MeasurementSet&lab.title=x HTTP/1.1" '
+        '502 150 "-" "curl/8.0" client_ip=- '
+        'request_time=30.001 upstream_response_time=30.000 upstream_connect_time=0.001 '
+        'upstream_header_time=- \n'
+    ),
+    'not an access log line\n',
+]
+
+
+def test_commands_analyze_access_logs_parse_line():
+    from commands.analyze_access_logs import parse_line
+    entry = parse_line(LOG_LINES[1])
+    assert entry.method == 'GET'
+    assert entry.path == '/measurement-sets/IGVFDS0000BBBB/'
+    assert entry.status == 200
+    assert entry.request_time == 1.5
+    assert round(entry.upstream_response_time, 3) == 1.4
+    entry = parse_line(LOG_LINES[2])
+    assert entry.upstream_response_time is None
+    entry = parse_line(LOG_LINES[3])
+    assert entry.status == 502
+    assert entry.time_local == '19/Oct/2026:10:00:03 +0000'
+    assert parse_line(LOG_LINES[4]) is None
+
+
+def test_commands_analyze_access_logs_get_route_family():
+    from commands.analyze_access_logs import get_route_family
+    assert get_route_family('/') == '/'
+    assert get_route_family('/robots.txt') == '/robots.txt'
+    assert get_route_family('/labs/') == '/labs/'
+    assert get_route_family('/labs/j-michael-cherry/') == '/labs/:id/'
+    assert get_route_family('/measurement-sets/IGVFDS0000AAAA/') == '/measurement-sets/:id/'
+    assert get_route_family('/files/IGVFFI0000AAAA/@@download/a.bam') == '/files/:id/*'
+    assert get_route_family('/_next/static/chunks/main-abc123.js') == '/_next/static/*'
+    assert get_route_family('/api/indexer-state') == '/api/indexer-state'
+    assert get_route_family('/search/?type=Lab&lab=x') == '/search/?type=Lab'
+    assert get_route_family('/search/?lab=x&type=Lab&type=Award') == '/search/?type=Award&type=Lab'
+    assert get_route_family('/search/?type=Lab&lab=x', ['type', 'lab']) == '/search/?lab=x&type=Lab'
+    assert get_route_family('-') == '-'
+
+
+def test_commands_analyze_access_logs_latency_histogram():
+    from commands.analyze_access_logs import LatencyHistogram
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    for value in range(1, 1001):
+        histogram.add(value / 1000)
+    histogram.add(0)
+    assert abs(histogram.percentile(50) - 0.5) < 0.5 * 0.01
+    assert abs(histogram.percentile(99) - 0.99) < 0.99 * 0.01
+    assert histogram.percentile(100) == 1.0
+    assert histogram.percentile(0.01) == 0.0
+    # Buckets stay bounded however many values get added.
+    for _ in range(10):
+        for value in range(1, 1001):
+            histogram.add(value / 1000)
+    assert histogram.count == 11001
+    assert len(histogram.counts) < 800
+
+
+def test_commands_analyze_access_logs_analyze_lines():
+    from commands.analyze_access_logs import analyze_lines
+    from commands.analyze_access_logs import report_to_dict
+    report = analyze_lines(LOG_LINES, worst=2)
+    summary = report_to_dict(report)
+    assert summary['lines'] == 5
+    assert summary['unparsed_lines'] == 1
+    assert summary['statuses'] == {'200': 2, '304': 1, '502': 1}
+    assert summary['throughput'] == {
+        'start': '19/Oct/2026:10:00',
+        'end': '19/Oct/2026:10:00',
+        'minutes': 1,
+        'requests_per_minute': {
+            'mean': 4.0,
+            'p50': 4.0,
+            'p95': 4.0,
+            'max': 4.0,
+        },
+    }
+    assert summary['request_time']['p99'] == 30.001
+    routes = {
+        route['route']: route
+        for route in summary['routes']
+    }
+    assert summary['routes'][0]['route'] == '/measurement-sets/:id/'
+    assert routes['/measurement-sets/:id/']['count'] == 2
+    assert routes['/measurement-sets/:id/']['statuses'] == {'200': 2}
+    assert routes['/measurement-sets/:id/']['request_time']['p99'] == 1.5
+    assert routes['/_next/static/*']['upstream_response_time'] == {
+        'p50': None,
+        'p95': None,
+        'p99': None,
+    }
+    assert routes['/search/?type=MeasurementSet']['statuses'] == {'502': 1}
+    assert [entry['request_time'] for entry in summary['worst']] == [30.001, 1.5]
+    assert summary['worst'][0]['line'] == 4
+
+
+def test_commands_analyze_access_logs_summarize_throughput():
+    from commands.analyze_access_logs import summarize_throughput
+    throughput = summarize_throughput(
+        {
+            '19/Oct/2026:10:03': 30,
+            '19/Oct/2026:10:00': 10,
+        }
+    )
+    assert throughput['start'] == '19/Oct/2026:10:00'
+    assert throughput['end'] == '19/Oct/2026:10:03'
+    # Two quiet minutes in between.
+    assert throughput['minutes'] == 4
+    assert throughput['requests_per_minute'] == {
+        'mean': 10.0,
+        'p50': 0.0,
+        'p95': 30.0,
+        'max': 30.0,
+    }
+    assert summarize_throughput({})['minutes'] == 0
+
+
+def test_commands_analyze_access_logs_main(tmp_path, capsys):
+    import gzip
+    import json
+    from commands.analyze_access_logs import main
+    plain = tmp_path / 'nginxfe.log'
+    plain.write_text(''.join(LOG_LINES[:2]))
+    compressed = tmp_path / 'nginxfe.log.gz'
+    with gzip.open(compressed, 'wt') as f:
+        f.write(''.join(LOG_LINES[2:]))
+    assert main([str(plain), str(compressed), '--json', '--worst', '1']) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert summary['lines'] == 5
+    assert len(summary['worst']) == 1
+    assert main([str(plain)]) == 0
+    output = capsys.readouterr().out
+    assert '/measurement-sets/:id/' in output
+    assert 'slowest requests:' in output
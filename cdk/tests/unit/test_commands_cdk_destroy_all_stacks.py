@@ -0,0 +1,305 @@
+import pytest
+
+
+def write_manifest(directory, artifacts):
+    import json
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'manifest.json').write_text(
+        json.dumps(
+            {
+                'version': '36.0.0',
+                'artifacts': artifacts,
+            }
+        )
+    )
+
+
+@pytest.fixture
+def cloud_assembly(tmp_path):
+    write_manifest(
+        tmp_path,
+        {
+            'PipelineStack.assets': {
+                'type': 'cdk:asset-manifest',
+            },
+            'PipelineStack': {
+                'type': 'aws:cloudformation:stack',
+                'dependencies': ['PipelineStack.assets'],
+                'displayName': 'PipelineStack',
+            },
+            'assembly-PipelineStack-DevStage': {
+                'type': 'cdk:cloud-assembly',
+                'properties': {
+                    'directoryName': 'assembly-PipelineStack-DevStage',
+                    'displayName': 'PipelineStack/DevStage',
+                },
+            },
+            'assembly-PipelineStack-ProdStage': {
+                'type': 'cdk:cloud-assembly',
+                'properties': {
+                    'directoryName': 'assembly-PipelineStack-ProdStage',
+                    'displayName': 'PipelineStack/ProdStage',
+                },
+            },
+        }
+    )
+    for stage in ['DevStage', 'ProdStage']:
+        write_manifest(
+            tmp_path / f'assembly-PipelineStack-{stage}',
+            {
+                f'PipelineStack{stage}RedisStackABC': {
+                    'type': 'aws:cloudformation:stack',
+                    'displayName': f'PipelineStack/{stage}/RedisStack',
+                },
+                f'PipelineStack{stage}FrontendStackDEF.assets': {
+                    'type': 'cdk:asset-manifest',
+                },
+                f'PipelineStack{stage}FrontendStackDEF': {
+                    'type': 'aws:cloudformation:stack',
+                    'dependencies': [
+                        f'PipelineStack{stage}RedisStackABC',
+                        f'PipelineStack{stage}FrontendStackDEF.assets',
+                    ],
+                    'displayName': f'PipelineStack/{stage}/FrontendStack',
+                },
+            }
+        )
+    return tmp_path
+
+
+def test_commands_cdk_destroy_all_stacks_get_stacks_in_assembly(cloud_assembly):
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    stacks = get_stacks_in_assembly(str(cloud_assembly))
+    assert {
+        name: stack.dependencies
+        for name, stack in stacks.items()
+    } == {
+        'PipelineStack': set(),
+        'PipelineStack/DevStage/RedisStack': {'PipelineStack'},
+        'PipelineStack/DevStage/FrontendStack': {
+            'PipelineStack',
+            'PipelineStack/DevStage/RedisStack',
+        },
+        'PipelineStack/ProdStage/RedisStack': {'PipelineStack'},
+        'PipelineStack/ProdStage/FrontendStack': {
+            'PipelineStack',
+            'PipelineStack/ProdStage/RedisStack',
+        },
+    }
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_stacks_in_reverse_dependency_order(cloud_assembly):
+    import threading
+    import time
+    from commands.cdk_destroy_all_stacks import destroy_stacks_in_reverse_dependency_order
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    stacks = get_stacks_in_assembly(str(cloud_assembly))
+    lock = threading.Lock()
+    running = set()
+    concurrent = []
+
+    def destroy(name):
+        with lock:
+            running.add(name)
+            concurrent.append(set(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(name)
+
+    destroyed = destroy_stacks_in_reverse_dependency_order(
+        stacks,
+        destroy,
+        max_workers=4,
+    )
+    assert len(destroyed) == 5
+    for name, stack in stacks.items():
+        for dependency in stack.dependencies:
+            assert destroyed.index(name) < destroyed.index(dependency)
+    assert destroyed[-1] == 'PipelineStack'
+    # Frontend stacks in both stages go down together.
+    assert {
+        'PipelineStack/DevStage/FrontendStack',
+        'PipelineStack/ProdStage/FrontendStack',
+    } in concurrent
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_stacks_respects_max_workers(cloud_assembly):
+    import threading
+    import time
+    from commands.cdk_destroy_all_stacks import destroy_stacks_in_reverse_dependency_order
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    stacks = get_stacks_in_assembly(str(cloud_assembly))
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def destroy(name):
+        with lock:
+            running.append(name)
+            max_running.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(name)
+
+    destroy_stacks_in_reverse_dependency_order(
+        stacks,
+        destroy,
+        max_workers=1,
+    )
+    assert max(max_running) == 1
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_stacks_stops_on_failure(cloud_assembly):
+    from commands.cdk_destroy_all_stacks import destroy_stacks_in_reverse_dependency_order
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    stacks = get_stacks_in_assembly(str(cloud_assembly))
+    destroyed = []
+
+    def destroy(name):
+        if name == 'PipelineStack/DevStage/FrontendStack':
+            raise RuntimeError('Failed to destroy')
+        destroyed.append(name)
+
+    with pytest.raises(RuntimeError):
+        destroy_stacks_in_reverse_dependency_order(
+            stacks,
+            destroy,
+        )
+    assert 'PipelineStack/DevStage/RedisStack' not in destroyed
+    assert 'PipelineStack' not in destroyed
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_stacks_raises_on_cycle():
+    from commands.cdk_destroy_all_stacks import Stack
+    from commands.cdk_destroy_all_stacks import destroy_stacks_in_reverse_dependency_order
+    stacks = {
+        'A': Stack(name='A', dependencies={'B'}),
+        'B': Stack(name='B', dependencies={'A'}),
+    }
+    with pytest.raises(ValueError) as e:
+        destroy_stacks_in_reverse_dependency_order(
+            stacks,
+            lambda name: None,
+        )
+    assert str(e.value) == "Dependency cycle between stacks: ['A', 'B']"
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_all_stacks(mocker, cloud_assembly):
+    from commands import cdk_destroy_all_stacks
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    mocker.patch.object(cdk_destroy_all_stacks, 'synthesize_app')
+    mocker.patch.object(
+        cdk_destroy_all_stacks,
+        'get_stacks_in_assembly',
+        return_value=get_stacks_in_assembly(str(cloud_assembly)),
+    )
+    check_call = mocker.patch.object(cdk_destroy_all_stacks, 'check_call')
+    cdk_destroy_all_stacks.destroy_all_stacks(
+        [
+            '-c',
+            'branch=IGVF-1234-xyz',
+            '--max-workers',
+            '2',
+            '--force',
+        ]
+    )
+    commands = [call.args[0] for call in check_call.call_args_list]
+    assert len(commands) == 5
+    for command in commands:
+        assert command[:6] == ['cdk', 'destroy', '-c', 'branch=IGVF-1234-xyz', '--force', '--output']
+        assert '--max-workers' not in command
+    assert commands[-1][-1] == 'PipelineStack'
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_all_stacks_prompts_once(mocker, cloud_assembly):
+    from commands import cdk_destroy_all_stacks
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    mocker.patch.object(cdk_destroy_all_stacks, 'synthesize_app')
+    mocker.patch.object(
+        cdk_destroy_all_stacks,
+        'get_stacks_in_assembly',
+        return_value=get_stacks_in_assembly(str(cloud_assembly)),
+    )
+    check_call = mocker.patch.object(cdk_destroy_all_stacks, 'check_call')
+    mocker.patch('builtins.input', return_value='n')
+    cdk_destroy_all_stacks.destroy_all_stacks([])
+    assert check_call.call_count == 0
+    mocker.patch('builtins.input', return_value='y')
+    cdk_destroy_all_stacks.destroy_all_stacks([])
+    assert check_call.call_count == 5
+    assert all(
+        '--force' in call.args[0]
+        for call in check_call.call_args_list
+    )
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_all_stacks_synth_once(mocker, cloud_assembly):
+    from commands import cdk_destroy_all_stacks
+    from commands.cdk_destroy_all_stacks import get_stacks_in_assembly
+    synthesize_app = mocker.patch.object(cdk_destroy_all_stacks, 'synthesize_app')
+    mocker.patch.object(
+        cdk_destroy_all_stacks,
+        'get_stacks_in_assembly',
+        return_value=get_stacks_in_assembly(str(cloud_assembly)),
+    )
+    check_call = mocker.patch.object(cdk_destroy_all_stacks, 'check_call')
+    cdk_destroy_all_stacks.destroy_all_stacks(
+        [
+            '-c',
+            'branch=IGVF-1234-xyz',
+            '--synth-once',
+            '--force',
+        ]
+    )
+    assert synthesize_app.call_count == 1
+    output = synthesize_app.call_args.args[1]
+    commands = [call.args[0] for call in check_call.call_args_list]
+    assert len(commands) == 5
+    for command in commands:
+        assert command[:-1] == [
+            'cdk',
+            'destroy',
+            '-c',
+            'branch=IGVF-1234-xyz',
+            '--force',
+            '--app',
+            output,
+        ]
+        assert '--output' not in command
+
+
+def test_commands_cdk_destroy_all_stacks_destroy_all_stacks_from_existing_assembly(mocker, cloud_assembly):
+    from commands import cdk_destroy_all_stacks
+    synthesize_app = mocker.patch.object(cdk_destroy_all_stacks, 'synthesize_app')
+    check_call = mocker.patch.object(cdk_destroy_all_stacks, 'check_call')
+    cdk_destroy_all_stacks.destroy_all_stacks(
+        [
+            '--profile',
+            'igvf-dev',
+            '--assembly',
+            str(cloud_assembly),
+            '--force',
+        ]
+    )
+    assert synthesize_app.call_count == 0
+    commands = [call.args[0] for call in check_call.call_args_list]
+    assert commands[0] == [
+        'cdk',
+        'destroy',
+        '--profile',
+        'igvf-dev',
+        '--force',
+        '--app',
+        str(cloud_assembly),
+        'PipelineStack/DevStage/FrontendStack',
+    ]
+    assert commands[-1] == [
+        'cdk',
+        'destroy',
+        '--profile',
+        'igvf-dev',
+        '--force',
+        '--app',
+        str(cloud_assembly),
+        'PipelineStack',
+    ]
@@ -0,0 +1,124 @@
+import pytest
+
+
+@pytest.fixture
+def cloud_assembly_directory(tmp_path):
+    from aws_cdk import App
+    from aws_cdk import Stack
+    from aws_cdk import Stage
+    from aws_cdk.aws_s3_assets import Asset
+    from aws_cdk.aws_sns import Topic
+    from aws_cdk.aws_sqs import Queue
+    asset_file = tmp_path / 'asset' / 'data.txt'
+    asset_file.parent.mkdir()
+    asset_file.write_text('x' * 1000)
+    app = App(outdir=str(tmp_path / 'cdk.out'))
+    producer = Stack(app, 'ProducerStack')
+    topic = Topic(producer, 'Topic')
+    producer.export_value(topic.topic_arn)
+    consumer = Stack(app, 'ConsumerStack')
+    Queue(
+        consumer,
+        'Queue',
+        queue_name=topic.topic_name,
+    )
+    Asset(
+        consumer,
+        'Asset',
+        path=str(asset_file),
+    )
+    stage = Stage(app, 'TestStage')
+    stage_stack = Stack(stage, 'StageStack')
+    for i in range(3):
+        Topic(stage_stack, f'StageTopic{i}')
+    return app.synth().directory
+
+
+def test_commands_check_template_budgets_analyze_cloud_assembly(cloud_assembly_directory):
+    from commands.check_template_budgets import analyze_cloud_assembly
+    reports = {
+        report.name: report
+        for report in analyze_cloud_assembly(cloud_assembly_directory)
+    }
+    assert list(reports) == [
+        'ConsumerStack',
+        'ProducerStack',
+        'TestStage/StageStack',
+    ]
+    producer = reports['ProducerStack']
+    assert producer.resource_count == 1
+    assert producer.resource_types == {'AWS::SNS::Topic': 1}
+    assert len(producer.exports) == 2
+    assert producer.template_bytes > 0
+    consumer = reports['ConsumerStack']
+    assert consumer.import_count == 1
+    assert consumer.asset_count == 1
+    assert consumer.asset_bytes == 1000
+    assert reports['TestStage/StageStack'].resource_count == 3
+
+
+def test_commands_check_template_budgets_check_budgets(cloud_assembly_directory):
+    from commands.check_template_budgets import Budgets
+    from commands.check_template_budgets import analyze_cloud_assembly
+    from commands.check_template_budgets import check_budgets
+    reports = analyze_cloud_assembly(cloud_assembly_directory)
+    assert check_budgets(reports, Budgets()) == []
+    assert check_budgets(
+        reports,
+        Budgets(
+            max_resources=2,
+            max_exports=1,
+            max_asset_bytes=999,
+        )
+    ) == [
+        'ConsumerStack: 1000 asset bytes exceeds budget of 999',
+        'ProducerStack: 2 exports exceeds budget of 1',
+        'TestStage/StageStack: 3 resources exceeds budget of 2',
+    ]
+
+
+def test_commands_check_template_budgets_main(cloud_assembly_directory, capsys):
+    import json
+    from commands.check_template_budgets import main
+    assert main([cloud_assembly_directory]) == 0
+    assert 'ProducerStack: resources=1/500' in capsys.readouterr().out
+    assert main([cloud_assembly_directory, '--max-resources', '2', '--json']) == 1
+    output = json.loads(capsys.readouterr().out)
+    assert output['budgets']['max_resources'] == 2
+    assert len(output['stacks']) == 3
+    assert output['failures'] == [
+        'TestStage/StageStack: 3 resources exceeds budget of 2',
+    ]
+
+
+def test_commands_check_template_budgets_redis_and_frontend_stacks(config, tmp_path):
+    from aws_cdk import App
+    from commands.check_template_budgets import Budgets
+    from commands.check_template_budgets import analyze_cloud_assembly
+    from commands.check_template_budgets import check_budgets
+    from infrastructure.stacks.redis import RedisStack
+    from infrastructure.stacks.frontend import FrontendStack
+    from infrastructure.constructs.existing import igvf_dev
+    app = App(outdir=str(tmp_path))
+    redis_stack = RedisStack(
+        app,
+        'TestRedisStack',
+        config=config,
+        existing_resources_class=igvf_dev.Resources,
+        env=igvf_dev.US_WEST_2,
+    )
+    FrontendStack(
+        app,
+        'TestFrontendStack',
+        config=config,
+        existing_resources_class=igvf_dev.Resources,
+        redis_multiplexer=redis_stack.multiplexer,
+        env=igvf_dev.US_WEST_2,
+    )
+    reports = analyze_cloud_assembly(app.synth().directory)
+    assert [report.name for report in reports] == [
+        'TestFrontendStack',
+        'TestRedisStack',
+    ]
+    assert reports[1].exports
+    assert check_budgets(reports, Budgets()) == []
@@ -0,0 +1,68 @@
+def write_manifest(directory, artifacts):
+    import json
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / 'manifest.json').write_text(
+        json.dumps(
+            {
+                'version': '36.0.0',
+                'artifacts': artifacts,
+            }
+        )
+    )
+
+
+def test_commands_cloud_assembly_iter_cloud_assemblies(tmp_path):
+    from commands.cloud_assembly import iter_cloud_assemblies
+    write_manifest(
+        tmp_path,
+        {
+            'PipelineStack': {
+                'type': 'aws:cloudformation:stack',
+                'displayName': 'PipelineStack',
+            },
+            'assembly-PipelineStack-DevStage': {
+                'type': 'cdk:cloud-assembly',
+                'properties': {
+                    'directoryName': 'assembly-PipelineStack-DevStage',
+                },
+            },
+        }
+    )
+    write_manifest(
+        tmp_path / 'assembly-PipelineStack-DevStage',
+        {
+            'PipelineStackDevStageRedisStackABC.assets': {
+                'type': 'cdk:asset-manifest',
+            },
+            'PipelineStackDevStageRedisStackABC': {
+                'type': 'aws:cloudformation:stack',
+                'displayName': 'PipelineStack/DevStage/RedisStack',
+            },
+        }
+    )
+    assemblies = list(iter_cloud_assemblies(str(tmp_path)))
+    assert len(assemblies) == 2
+    root, stage = assemblies
+    assert root.directory == str(tmp_path)
+    assert root.parent is None
+    assert root.get_stack_names() == {
+        'PipelineStack': 'PipelineStack',
+    }
+    assert stage.directory == str(tmp_path / 'assembly-PipelineStack-DevStage')
+    assert stage.parent is root
+    assert list(stage.get_stack_artifacts()) == [
+        'PipelineStackDevStageRedisStackABC',
+    ]
+    assert stage.get_stack_names() == {
+        'PipelineStackDevStageRedisStackABC': 'PipelineStack/DevStage/RedisStack',
+    }
+
+
+def test_commands_cloud_assembly_empty_manifest(tmp_path):
+    import json
+    from commands.cloud_assembly import iter_cloud_assemblies
+    (tmp_path / 'manifest.json').write_text(json.dumps({'version': '36.0.0'}))
+    assemblies = list(iter_cloud_assemblies(str(tmp_path)))
+    assert len(assemblies) == 1
+    assert assemblies[0].artifacts == {}
+    assert assemblies[0].get_stack_names() == {}
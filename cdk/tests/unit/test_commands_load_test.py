@@ -0,0 +1,134 @@
+import pytest
+
+
+@pytest.fixture
+def local_server():
+    import threading
+    from http.server import BaseHTTPRequestHandler
+    from http.server import ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.startswith('/broken'):
+                status = 500
+            elif self.path.startswith('/blocked'):
+                status = 403
+            elif self.path.startswith('/missing'):
+                status = 404
+            else:
+                status = 200
+            self.send_response(status)
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_commands_load_test_parse_route():
+    from commands.load_test import parse_route
+    assert parse_route('/') == ('/', 1)
+    assert parse_route('/:3') == ('/', 3)
+    assert parse_route('/search/?type=Lab:2') == ('/search/?type=Lab', 2)
+    assert parse_route('/search/?type=Lab') == ('/search/?type=Lab', 1)
+
+
+def test_commands_load_test_build_route_mix():
+    from commands.load_test import build_route_mix
+    route_mix = build_route_mix([('/a', 1), ('/b', 0)], 20, seed=1)
+    assert route_mix == ['/a'] * 20
+
+
+def test_commands_load_test_percentile():
+    from commands.load_test import percentile
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 100) == 100
+    assert percentile([], 95) == 0.0
+    assert percentile([7], 95) == 7
+
+
+def test_commands_load_test_is_success_status():
+    from commands.load_test import is_success_status
+    assert is_success_status(200)
+    assert is_success_status(304)
+    assert not is_success_status(0)
+    assert not is_success_status(403)
+    assert not is_success_status(404)
+    assert not is_success_status(429)
+    assert not is_success_status(503)
+
+
+def test_commands_load_test_fetch_counts_client_errors(local_server):
+    from commands.load_test import fetch
+    assert not fetch(local_server, '/', timeout=5).error
+    assert fetch(local_server, '/blocked/', timeout=5).error
+    assert fetch(local_server, '/missing/', timeout=5).error
+    assert fetch(local_server, '/broken/', timeout=5).error
+
+
+def test_commands_load_test_summarize():
+    from commands.load_test import Result
+    from commands.load_test import summarize
+    results = [
+        Result(route='/', status=200, latency_ms=10, error=False),
+        Result(route='/', status=200, latency_ms=20, error=False),
+        Result(route='/labs/', status=500, latency_ms=5000, error=True),
+    ]
+    summary = summarize(results, max_p95_latency_ms=1000, max_error_rate=0.5)
+    assert summary.requests == 3
+    assert summary.errors == 1
+    assert summary.p95_latency_ms == 5000
+    assert [route.route for route in summary.routes] == ['/', '/labs/']
+    assert summary.failures == [
+        'p95 latency 5000 ms exceeds 1000 ms',
+    ]
+    summary = summarize(results, max_p95_latency_ms=10000, max_error_rate=0.01)
+    assert summary.failures == [
+        'error rate 33.33% exceeds 1.00%',
+    ]
+
+
+def test_commands_load_test_main_passes_against_local_server(local_server, capsys):
+    from commands.load_test import main
+    exit_code = main(
+        [
+            '--url',
+            local_server,
+            '--route',
+            '/:2',
+            '--route',
+            '/labs/',
+            '--requests',
+            '20',
+            '--concurrency',
+            '4',
+            '--json',
+        ]
+    )
+    assert exit_code == 0
+    assert '"requests": 20' in capsys.readouterr().out
+
+
+def test_commands_load_test_main_fails_on_error_rate(local_server):
+    from commands.load_test import main
+    exit_code = main(
+        [
+            '--url',
+            local_server,
+            '--route',
+            '/broken/',
+            '--requests',
+            '5',
+        ]
+    )
+    assert exit_code == 1
@@ -0,0 +1,155 @@
+import pytest
+
+
+CPU_SAMPLES_CSV = (
+    '@timestamp,TaskId,CpuUtilized,CpuReserved,MemoryUtilized\n'
+    '2026-10-19 10:00:05.000,a,200,1024,600\n'
+    '2026-10-19 10:00:35.000,a,400,1024,700\n'
+    '2026-10-19 10:00:10.000,b,300,1024,650\n'
+    '2026-10-19 10:01:05.000,a,100,1024,600\n'
+    '2026-10-19 10:01:10.000,b,100,1024,640\n'
+)
+
+
+@pytest.fixture
+def traffic():
+    return {
+        'throughput': {
+            'requests_per_minute': {
+                'mean': 600.0,
+                'p50': 500.0,
+                'p95': 1200.0,
+                'max': 1500.0,
+            },
+        },
+    }
+
+
+def test_commands_plan_capacity_read_cpu_samples(tmp_path):
+    from commands.plan_capacity import get_total_cpu_units_per_minute
+    from commands.plan_capacity import read_cpu_samples
+    path = tmp_path / 'cpu.csv'
+    path.write_text(CPU_SAMPLES_CSV)
+    samples = read_cpu_samples(path)
+    assert len(samples) == 5
+    assert samples[0].minute == '2026-10-19 10:00'
+    assert samples[0].memory_mib == 600
+    assert get_total_cpu_units_per_minute(samples) == {
+        '2026-10-19 10:00': 600.0,
+        '2026-10-19 10:01': 200.0,
+    }
+    path.write_text('TaskId,CpuReserved\na,1024\n')
+    with pytest.raises(ValueError):
+        read_cpu_samples(path)
+
+
+def test_commands_plan_capacity_get_minute():
+    from commands.plan_capacity import get_minute
+    assert get_minute('2026-10-19T10:00:05.000Z') == '2026-10-19 10:00'
+    assert get_minute('1792404005000') == '2026-10-19 10:00'
+
+
+def test_commands_plan_capacity_recommend(tmp_path, traffic, raw_frontend_config):
+    from commands.plan_capacity import measure
+    from commands.plan_capacity import read_cpu_samples
+    from commands.plan_capacity import recommend
+    from infrastructure.config import FrontendSettings
+    path = tmp_path / 'cpu.csv'
+    path.write_text(CPU_SAMPLES_CSV)
+    measurements = measure(traffic, read_cpu_samples(path))
+    assert measurements.mean_total_cpu_units == 400.0
+    # 400 CPU units for 10 requests per second.
+    assert measurements.cpu_unit_seconds_per_request == 40.0
+    assert measurements.p99_task_cpu_units == 400
+    assert measurements.p99_task_memory_mib == 700
+    recommendation = recommend(
+        'demo',
+        FrontendSettings(**raw_frontend_config),
+        measurements,
+    )
+    assert recommendation.recommended == FrontendSettings(
+        cpu=512,
+        # 700 MiB with headroom fits in the smallest size for 512 CPU.
+        memory_limit_mib=1024,
+        max_capacity=6,
+        use_redis_named='Redis71',
+        min_capacity=2,
+        # 55% of 512 units for a minute at 40 unit seconds per request.
+        requests_per_target=422,
+    )
+    assert recommendation.notes == []
+
+
+def test_commands_plan_capacity_recommend_without_measurements(raw_frontend_config):
+    from commands.plan_capacity import Measurements
+    from commands.plan_capacity import recommend
+    from infrastructure.config import FrontendSettings
+    current = FrontendSettings(**raw_frontend_config)
+    recommendation = recommend(
+        'demo',
+        current,
+        Measurements(
+            mean_requests_per_minute=0.0,
+            median_requests_per_minute=0.0,
+            max_requests_per_minute=0.0,
+            mean_total_cpu_units=0.0,
+            p99_task_cpu_units=0.0,
+        ),
+    )
+    assert recommendation.recommended.requests_per_target == current.requests_per_target
+    assert recommendation.recommended.min_capacity == 1
+    assert recommendation.recommended.max_capacity == 1
+    assert recommendation.recommended.cpu == 512
+    assert recommendation.recommended.memory_limit_mib == 2048
+    assert len(recommendation.notes) == 2
+
+
+def test_commands_plan_capacity_choose_cpu():
+    from commands.plan_capacity import choose_cpu
+    assert choose_cpu(0) == 512
+    assert choose_cpu(400) == 512
+    assert choose_cpu(500) == 1024
+    assert choose_cpu(1600) == 2048
+    # Never bigger than one Next.js process can use.
+    assert choose_cpu(3000) == 2048
+
+
+def test_commands_plan_capacity_main(tmp_path, capsys, traffic):
+    import json
+    from commands.plan_capacity import main
+    traffic_path = tmp_path / 'traffic.json'
+    traffic_path.write_text(json.dumps(traffic))
+    cpu_path = tmp_path / 'cpu.csv'
+    cpu_path.write_text(CPU_SAMPLES_CSV)
+    assert main(
+        [
+            '--traffic',
+            f'production={traffic_path}',
+            '--cpu-samples',
+            f'production={cpu_path}',
+        ]
+    ) == 0
+    output = capsys.readouterr().out
+    assert "--- config['environment']['production']['frontend']" in output
+    assert "+ 'requests_per_target': 422}" in output
+    assert main(
+        [
+            '--traffic',
+            f'production={traffic_path}',
+            '--cpu-samples',
+            f'production={cpu_path}',
+            '--json',
+        ]
+    ) == 0
+    recommendations = json.loads(capsys.readouterr().out)
+    assert recommendations[0]['environment'] == 'production'
+    assert recommendations[0]['recommended']['cpu'] == 512
+    with pytest.raises(SystemExit):
+        main(
+            [
+                '--traffic',
+                f'production={traffic_path}',
+                '--cpu-samples',
+                f'staging={cpu_path}',
+            ]
+        )
@@ -0,0 +1,65 @@
+import pytest
+
+
+def test_commands_push_soci_indexes_parse_image_uri():
+    from commands.push_soci_indexes import parse_image_uri
+    image_uri = parse_image_uri(
+        '123456789012.dkr.ecr.us-west-2.amazonaws.com/cdk-hnb659fds-container-assets-123456789012-us-west-2:abc123'
+    )
+    assert image_uri.account == '123456789012'
+    assert image_uri.region == 'us-west-2'
+    assert image_uri.registry == '123456789012.dkr.ecr.us-west-2.amazonaws.com'
+
+
+def test_commands_push_soci_indexes_parse_image_uri_raises_ValueError():
+    from commands.push_soci_indexes import parse_image_uri
+    with pytest.raises(ValueError) as e:
+        parse_image_uri('nginx:latest')
+    assert str(e.value) == 'Not an ECR image URI: nginx:latest'
+
+
+def test_commands_push_soci_indexes_get_image_publishing_role_arn():
+    from commands.push_soci_indexes import get_image_publishing_role_arn
+    assert get_image_publishing_role_arn('hnb659fds', '123456789012', 'us-west-2') == (
+        'arn:aws:iam::123456789012:role/cdk-hnb659fds-image-publishing-role-123456789012-us-west-2'
+    )
+
+
+def test_commands_push_soci_indexes_push_soci_index_for_image(mocker):
+    from commands import push_soci_indexes
+    mocker.patch.object(push_soci_indexes, 'assume_role', return_value={})
+    mocker.patch.object(push_soci_indexes, 'get_ecr_password', return_value='pw')
+    check_call = mocker.patch.object(push_soci_indexes, 'check_call')
+    assume_role = push_soci_indexes.assume_role
+    push_soci_indexes.push_soci_index_for_image(
+        'abc123',
+        '123456789012.dkr.ecr.us-west-2.amazonaws.com/repo:tag'
+    )
+    assume_role.assert_called_once_with(
+        'arn:aws:iam::123456789012:role/cdk-abc123-image-publishing-role-123456789012-us-west-2'
+    )
+    commands = [
+        call.args[0][:2]
+        for call in check_call.call_args_list
+    ]
+    assert commands == [
+        ['ctr', 'image'],
+        ['soci', 'create'],
+        ['soci', 'push'],
+    ]
+
+
+def test_commands_push_soci_indexes_get_parser():
+    from commands.push_soci_indexes import get_parser
+    args = get_parser().parse_args(
+        [
+            '--qualifier',
+            'abc123',
+            'some-image-uri',
+            'other-image-uri',
+        ]
+    )
+    assert args.qualifier == 'abc123'
+    assert args.uris == ['some-image-uri', 'other-image-uri']
+    with pytest.raises(SystemExit):
+        get_parser().parse_args(['some-image-uri'])
@@ -14,14 +14,30 @@ def test_config_common_dataclass():
     assert common.project_name == 'igvf-ui'
 
 
-def test_config_config_dataclass():
+def test_config_load_test_config():
+    from infrastructure.config import config
+    from infrastructure.default_routes import DEFAULT_ROUTES
+    assert config['environment']['dev']['load_test']['enabled'] is True
+    assert config['environment']['dev']['load_test']['routes'] is DEFAULT_ROUTES
+    assert config['environment']['staging']['load_test']['enabled'] is True
+    assert 'load_test' not in config['environment']['production']
+    assert config['pipeline']['dev']['load_test'] is True
+    assert 'load_test' not in config['pipeline']['demo']
+
+
+def test_config_config_dataclass(raw_redis_config, raw_frontend_config, raw_waf_config):
     from infrastructure.config import Config
+    from infrastructure.config import FrontendSettings
+    from infrastructure.config import RedisClusterProps
+    from infrastructure.config import RedisClusterSettings
+    from infrastructure.config import RedisSettings
+    from infrastructure.config import WafSettings
     config = Config(
         name='demo',
         branch='xyz-branch',
-        redis={},
-        frontend={},
-        waf={},
+        redis=raw_redis_config,
+        frontend=raw_frontend_config,
+        waf=raw_waf_config,
         backend_url='https://test.backend.org',
         tags=[
             ('test', 'tag'),
@@ -30,11 +46,30 @@ def test_config_config_dataclass():
     assert config.common.organization_name == 'igvf-dacc'
     assert config.common.project_name == 'igvf-ui'
     assert config.branch == 'xyz-branch'
-    assert config.redis == {}
-    assert config.frontend == {}
-    assert config.waf == {}
+    assert config.redis == RedisSettings(
+        clusters=(
+            RedisClusterSettings(
+                construct_id='Redis71',
+                on=True,
+                props=RedisClusterProps(
+                    cache_node_type='cache.t4g.small',
+                    engine_version='7.1',
+                ),
+            ),
+        )
+    )
+    assert config.frontend == FrontendSettings(
+        cpu=1024,
+        memory_limit_mib=2048,
+        max_capacity=4,
+        use_redis_named='Redis71',
+    )
+    assert config.waf == WafSettings(
+        enabled=True,
+        arn='some-waf-arn',
+    )
     assert config.backend_url == 'https://test.backend.org'
-    assert config.tags == [('test', 'tag')]
+    assert config.tags == (('test', 'tag'),)
 
 
 def test_config_pipeline_config_dataclass():
@@ -61,24 +96,27 @@ def test_config_pipeline_config_dataclass():
         ('abc', '123'),
         ('xyz', '321'),
     ]
+    assert config.build_cache.pip is True
+    assert config.build_cache.npm is True
+    assert config.build_cache.docker_layers is True
 
 
-def test_config_build_config_from_name():
+def test_config_build_config_from_name(raw_redis_config, raw_frontend_config, raw_waf_config):
     from infrastructure.config import build_config_from_name
     config = build_config_from_name(
         'demo',
         branch='my-branch',
         backend_url='http://my-specific-endpoint.org',
-        redis={},
-        frontend={},
-        waf={}
+        redis=raw_redis_config,
+        frontend=raw_frontend_config,
+        waf=raw_waf_config,
     )
     assert config.common.organization_name == 'igvf-dacc'
     assert config.common.project_name == 'igvf-ui'
     assert config.branch == 'my-branch'
-    assert config.redis == {}
-    assert config.frontend == {}
-    assert config.waf == {}
+    assert config.redis.clusters[0].construct_id == 'Redis71'
+    assert config.frontend.cpu == 1024
+    assert config.waf.arn == 'some-waf-arn'
     assert config.name == 'demo'
     assert config.backend_url == 'http://my-specific-endpoint.org'
     config = build_config_from_name(
@@ -93,14 +131,14 @@ def test_config_build_config_from_name():
     assert config.backend_url == 'https://igvfd-dev.demo.igvf.org'
 
 
-def test_config_build_config_from_name_demo(mocker):
+def test_config_build_config_from_name_demo(mocker, raw_redis_config, raw_frontend_config, raw_waf_config):
     from infrastructure.config import build_config_from_name
     mocker.patch(
         'infrastructure.config.get_raw_config_from_name',
         return_value={
-            'redis': {},
-            'frontend': {},
-            'waf': {},
+            'redis': raw_redis_config,
+            'frontend': raw_frontend_config,
+            'waf': raw_waf_config,
             'branch': 'my-branch',
             'name': 'demo',
             'tags': [('time-to-live-hours', '3')]
@@ -110,9 +148,9 @@ def test_config_build_config_from_name_demo(mocker):
         'demo',
         branch='my-branch',
         # Overrides.
-        frontend={},
-        waf={},
-        redis={},
+        frontend=raw_frontend_config,
+        waf=raw_waf_config,
+        redis=raw_redis_config,
     )
     assert config.backend_url == 'https://igvfd-my-branch.demo.igvf.org'
 
@@ -242,7 +280,7 @@ def test_config_fill_in_calculated_config():
     }
 
 
-def test_config_config_factory_init():
+def test_config_config_factory_init(raw_redis_config, raw_frontend_config, raw_waf_config):
     from infrastructure.config import config_factory
     from infrastructure.config import Config
     with pytest.raises(TypeError):
@@ -250,9 +288,9 @@ def test_config_config_factory_init():
     kwargs = {
         'name': 'some-name',
         'branch': 'some-branch',
-        'redis': {},
-        'frontend': {},
-        'waf': {},
+        'redis': raw_redis_config,
+        'frontend': raw_frontend_config,
+        'waf': raw_waf_config,
         'backend_url': 'some-backend-url',
         'tags': [('abc', '123')]
     }
@@ -265,3 +303,139 @@ def test_config_get_backend_url_from_branch():
     assert get_backend_url_from_branch(
         'IGVF-my-feature-branch-123'
     ) == 'https://igvfd-IGVF-my-feature-branch-123.demo.igvf.org'
+
+
+def test_config_validate_fargate_cpu_and_memory():
+    from infrastructure.config import validate_fargate_cpu_and_memory
+    validate_fargate_cpu_and_memory(256, 512)
+    validate_fargate_cpu_and_memory(1024, 2048)
+    validate_fargate_cpu_and_memory(4096, 30720)
+    validate_fargate_cpu_and_memory(16384, 122880)
+    with pytest.raises(ValueError) as e:
+        validate_fargate_cpu_and_memory(1000, 2048)
+    assert str(e.value).startswith('Invalid Fargate cpu 1000')
+    with pytest.raises(ValueError) as e:
+        validate_fargate_cpu_and_memory(1024, 1024)
+    assert str(e.value) == (
+        'Invalid Fargate memory_limit_mib 1024 for cpu 1024, '
+        'must be one of [2048, 3072, 4096, 5120, 6144, 7168, 8192]'
+    )
+
+
+def test_config_frontend_settings_validation(raw_frontend_config):
+    from dataclasses import FrozenInstanceError
+    from infrastructure.config import FrontendSettings
+    frontend = FrontendSettings(**raw_frontend_config)
+    with pytest.raises(FrozenInstanceError):
+        frontend.cpu = 2048
+    with pytest.raises(ValueError):
+        FrontendSettings(
+            **{
+                **raw_frontend_config,
+                'memory_limit_mib': 16384,
+            }
+        )
+    with pytest.raises(ValueError):
+        FrontendSettings(
+            **{
+                **raw_frontend_config,
+                'max_capacity': 0,
+            }
+        )
+    assert frontend.min_capacity == 1
+    assert frontend.requests_per_target == 100
+    with pytest.raises(ValueError):
+        FrontendSettings(
+            **{
+                **raw_frontend_config,
+                'min_capacity': 5,
+            }
+        )
+    with pytest.raises(ValueError):
+        FrontendSettings(
+            **{
+                **raw_frontend_config,
+                'requests_per_target': 0,
+            }
+        )
+
+
+def test_config_redis_settings_validation(raw_redis_config):
+    from infrastructure.config import RedisSettings
+    with pytest.raises(ValueError) as e:
+        RedisSettings.from_dict(
+            {
+                'clusters': raw_redis_config['clusters'] * 2
+            }
+        )
+    assert str(e.value) == "Duplicate Redis cluster construct_id in ['Redis71', 'Redis71']"
+    cluster = {
+        **raw_redis_config['clusters'][0],
+        'props': {
+            'cache_node_type': 't4g.small',
+            'engine_version': '7.1',
+        }
+    }
+    with pytest.raises(ValueError):
+        RedisSettings.from_dict({'clusters': [cluster]})
+
+
+def test_config_config_use_redis_named_must_be_enabled_cluster(raw_redis_config, raw_frontend_config, raw_waf_config):
+    from infrastructure.config import Config
+    with pytest.raises(ValueError) as e:
+        Config(
+            name='demo',
+            branch='xyz-branch',
+            redis=raw_redis_config,
+            frontend={
+                **raw_frontend_config,
+                'use_redis_named': 'Redis60',
+            },
+            waf=raw_waf_config,
+            backend_url='https://test.backend.org',
+            tags=[],
+        )
+    assert str(e.value) == "Frontend use_redis_named Redis60 is not an enabled Redis cluster: ['Redis71']"
+
+
+def test_config_all_environment_configs_are_valid():
+    from infrastructure.config import config
+    from infrastructure.config import build_config_from_name
+    for name in config['environment']:
+        build_config_from_name(name, branch='some-branch')
+
+
+def test_config_build_cached_config_from_name_is_memoized():
+    from dataclasses import FrozenInstanceError
+    from infrastructure.config import build_cached_config_from_name
+    from infrastructure.config import build_config_from_name
+    config = build_cached_config_from_name('staging', branch='main')
+    assert build_cached_config_from_name('staging', branch='main') is config
+    assert build_config_from_name('staging', branch='main') is not config
+    with pytest.raises(FrozenInstanceError):
+        config.branch = 'other'
+    assert build_cached_config_from_name('staging', branch='other') is not config
+    assert build_cached_config_from_name(
+        'staging',
+        branch='main',
+        docker_cache_repository_uri='some-uri',
+    ).docker_cache_repository_uri == 'some-uri'
+
+
+def test_config_config_tags_and_load_test_are_read_only():
+    from infrastructure.config import build_cached_config_from_name
+    config = build_cached_config_from_name('dev', branch='dev')
+    with pytest.raises(AttributeError):
+        config.tags.append(('other', 'tag'))
+    with pytest.raises(TypeError):
+        config.load_test['enabled'] = False
+    with pytest.raises(AttributeError):
+        config.load_test['routes'].append(('/other/', 1))
+    assert config.load_test['enabled'] is True
+    assert build_cached_config_from_name('dev', branch='dev').load_test['routes'] == (
+        ('/', 3),
+        ('/search/?type=MeasurementSet', 3),
+        ('/measurement-sets/', 2),
+        ('/labs/', 1),
+        ('/profiles/', 1),
+    )
@@ -1,25 +1,41 @@
 import pytest
 
+from aws_cdk.assertions import Match
 from aws_cdk.assertions import Template
 
 
-def test_constructs_frontend_initialize_frontend_construct(stack, instance_type, existing_resources, vpc, config, redis_multiplexer):
-    from infrastructure.constructs.frontend import Frontend
-    from infrastructure.constructs.frontend import FrontendProps
-    frontend = Frontend(
-        stack,
-        'TestFrontend',
-        props=FrontendProps(
-            config=config,
-            existing_resources=existing_resources,
-            redis_multiplexer=redis_multiplexer,
-            cpu=2048,
-            memory_limit_mib=4096,
-            max_capacity=7,
-            use_redis_named='Redis71',
+def get_frontend_template(template_cache, request, config):
+    def build():
+        from infrastructure.constructs.frontend import Frontend
+        from infrastructure.constructs.frontend import FrontendProps
+        stack = request.getfixturevalue('stack')
+        Frontend(
+            stack,
+            'TestFrontend',
+            props=FrontendProps(
+                config=config,
+                existing_resources=request.getfixturevalue('existing_resources'),
+                redis_multiplexer=request.getfixturevalue('redis_multiplexer'),
+                cpu=2048,
+                memory_limit_mib=4096,
+                max_capacity=7,
+                use_redis_named='Redis71',
+            )
         )
+        return Template.from_stack(stack)
+    return template_cache.get(
+        'constructs.frontend.Frontend',
+        build,
+        config,
+    )
+
+
+def test_constructs_frontend_initialize_frontend_construct(template_cache, request, config):
+    template = get_frontend_template(
+        template_cache,
+        request,
+        config,
     )
-    template = Template.from_stack(stack)
     # Then
     template.resource_count_is(
         'AWS::ECS::Cluster',
@@ -427,8 +443,7 @@ def test_constructs_frontend_initialize_frontend_construct(stack, instance_type,
 
 
 def test_constructs_frontend_frontend_define_domain_name(stack, instance_type, existing_resources, vpc, config, redis_multiplexer):
-    from dataclasses import asdict
-    from infrastructure.config import Config
+    from dataclasses import replace
     from infrastructure.constructs.frontend import Frontend
     from infrastructure.constructs.frontend import FrontendProps
     frontend = Frontend(
@@ -445,18 +460,9 @@ def test_constructs_frontend_frontend_define_domain_name(stack, instance_type, e
         )
     )
     assert frontend.domain_name == 'igvf-ui-some-branch.my.test.domain.org'
-    old_config = {
-        k: v
-        for k, v in asdict(config).items()
-        if k != 'common'
-    }
-    config_with_prefix = Config(
-        **{
-            **old_config,
-            **{
-                'url_prefix': 'some-prefix',
-            }
-        }
+    config_with_prefix = replace(
+        config,
+        url_prefix='some-prefix',
     )
     frontend = Frontend(
         stack,
@@ -474,16 +480,16 @@ def test_constructs_frontend_frontend_define_domain_name(stack, instance_type, e
     assert frontend.domain_name == 'some-prefix.my.test.domain.org'
 
 
-def test_constructs_frontend_get_url_prefix():
+def test_constructs_frontend_get_url_prefix(raw_redis_config, raw_frontend_config, raw_waf_config):
     from infrastructure.config import Config
     from infrastructure.constructs.frontend import get_url_prefix
     config_without_prefix = Config(
         name='abc',
         branch='some-branch',
         backend_url='abc.123',
-        redis={},
-        frontend={},
-        waf={},
+        redis=raw_redis_config,
+        frontend=raw_frontend_config,
+        waf=raw_waf_config,
         tags=[],
     )
     url_prefix = get_url_prefix(config_without_prefix)
@@ -492,11 +498,112 @@ def test_constructs_frontend_get_url_prefix():
         name='abc',
         branch='some-branch',
         backend_url='abc.123',
-        redis={},
-        frontend={},
-        waf={},
+        redis=raw_redis_config,
+        frontend=raw_frontend_config,
+        waf=raw_waf_config,
         tags=[],
         url_prefix='some-prefix',
     )
     url_prefix = get_url_prefix(config_with_prefix)
     assert url_prefix == 'some-prefix'
+
+
+def test_constructs_frontend_get_docker_cache_options(stack, instance_type, existing_resources, vpc, config, redis_multiplexer):
+    from dataclasses import replace
+    from infrastructure.constructs.frontend import Frontend
+    from infrastructure.constructs.frontend import FrontendProps
+    frontend = Frontend(
+        stack,
+        'TestFrontend',
+        props=FrontendProps(
+            config=config,
+            existing_resources=existing_resources,
+            redis_multiplexer=redis_multiplexer,
+            cpu=2048,
+            memory_limit_mib=4096,
+            max_capacity=7,
+            use_redis_named='Redis71',
+        )
+    )
+    assert frontend._get_docker_cache_options('nextjs') == {}
+    frontend.props.config = replace(
+        config,
+        docker_cache_repository_uri='123.dkr.ecr.us-west-2.amazonaws.com/some-cache',
+    )
+    cache_options = frontend._get_docker_cache_options('nextjs')
+    assert cache_options['cache_from'][0].type == 'registry'
+    assert cache_options['cache_from'][0].params == {
+        'ref': '123.dkr.ecr.us-west-2.amazonaws.com/some-cache:nextjs',
+    }
+    assert cache_options['cache_to'].type == 'registry'
+    assert cache_options['cache_to'].params == {
+        'ref': '123.dkr.ecr.us-west-2.amazonaws.com/some-cache:nextjs',
+        'mode': 'max',
+        'image-manifest': 'true',
+        'oci-mediatypes': 'true',
+    }
+
+
+def test_constructs_frontend_image_uri_outputs_and_platform_version(template_cache, request, config):
+    template = get_frontend_template(
+        template_cache,
+        request,
+        config,
+    )
+    template.has_resource_properties(
+        'AWS::ECS::Service',
+        {
+            'PlatformVersion': '1.4.0',
+        }
+    )
+    outputs = template.find_outputs('*')
+    assert any(
+        key.startswith('TestFrontendApplicationImageUri')
+        for key in outputs
+    )
+    assert any(
+        key.startswith('TestFrontendNginxImageUri')
+        for key in outputs
+    )
+
+
+def test_constructs_frontend_task_scaling(stack, instance_type, existing_resources, vpc, config, redis_multiplexer):
+    from infrastructure.constructs.frontend import Frontend
+    from infrastructure.constructs.frontend import FrontendProps
+    Frontend(
+        stack,
+        'TestFrontend',
+        props=FrontendProps(
+            config=config,
+            existing_resources=existing_resources,
+            redis_multiplexer=redis_multiplexer,
+            cpu=2048,
+            memory_limit_mib=4096,
+            max_capacity=7,
+            use_redis_named='Redis71',
+            min_capacity=2,
+            requests_per_target=250,
+        )
+    )
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        'AWS::ApplicationAutoScaling::ScalableTarget',
+        {
+            'MinCapacity': 2,
+            'MaxCapacity': 7,
+        }
+    )
+    template.has_resource_properties(
+        'AWS::ApplicationAutoScaling::ScalingPolicy',
+        {
+            'TargetTrackingScalingPolicyConfiguration': {
+                'PredefinedMetricSpecification': {
+                    'PredefinedMetricType': 'ALBRequestCountPerTarget',
+                    'ResourceLabel': Match.any_value(),
+                },
+                'ScaleInCooldown': 300,
+                'ScaleOutCooldown': 60,
+                'TargetValue': 250,
+            }
+        }
+    )
@@ -3,22 +3,38 @@ import pytest
 from aws_cdk.assertions import Template
 
 
-def test_constructs_pipeline_initialize_basic_self_updating_pipeline_construct(stack, secret, mocker, pipeline_config):
-    from infrastructure.constructs.pipeline import BasicSelfUpdatingPipeline
-    from infrastructure.constructs.pipeline import BasicSelfUpdatingPipelineProps
-    existing_resources = mocker.Mock()
-    existing_resources.code_star_connection.arn = 'some-arn'
-    existing_resources.docker_hub_credentials.secret = secret
-    pipeline = BasicSelfUpdatingPipeline(
-        stack,
-        'TestBasicSelfUpdatingPipeline',
-        props=BasicSelfUpdatingPipelineProps(
-            github_repo='ABC/xyz',
-            existing_resources=existing_resources,
-            config=pipeline_config,
+def get_basic_self_updating_pipeline(template_cache, request, mocker, pipeline_config):
+    def build():
+        from infrastructure.constructs.pipeline import BasicSelfUpdatingPipeline
+        from infrastructure.constructs.pipeline import BasicSelfUpdatingPipelineProps
+        stack = request.getfixturevalue('stack')
+        existing_resources = mocker.Mock()
+        existing_resources.code_star_connection.arn = 'some-arn'
+        existing_resources.docker_hub_credentials.secret = request.getfixturevalue('secret')
+        pipeline = BasicSelfUpdatingPipeline(
+            stack,
+            'TestBasicSelfUpdatingPipeline',
+            props=BasicSelfUpdatingPipelineProps(
+                github_repo='ABC/xyz',
+                existing_resources=existing_resources,
+                config=pipeline_config,
+            )
         )
+        return pipeline, Template.from_stack(stack)
+    return template_cache.get(
+        'constructs.pipeline.BasicSelfUpdatingPipeline',
+        build,
+        pipeline_config,
+    )
+
+
+def test_constructs_pipeline_initialize_basic_self_updating_pipeline_construct(template_cache, request, mocker, pipeline_config):
+    pipeline, template = get_basic_self_updating_pipeline(
+        template_cache,
+        request,
+        mocker,
+        pipeline_config,
     )
-    template = Template.from_stack(stack)
     template.has_resource_properties(
         'AWS::CodePipeline::Pipeline',
         {
@@ -172,7 +188,11 @@ def test_constructs_pipeline_initialize_basic_self_updating_pipeline_construct(s
                 'Type': 'CODEPIPELINE'
             },
             'Cache': {
-                'Type': 'NO_CACHE'
+                'Modes': [
+                    'LOCAL_CUSTOM_CACHE',
+                    'LOCAL_DOCKER_LAYER_CACHE'
+                ],
+                'Type': 'LOCAL'
             },
             'Description': 'Pipeline step Default/Pipeline/Build/SynthStep',
             'EncryptionKey': 'alias/aws/s3'
@@ -257,6 +277,107 @@ def test_constructs_pipeline_initialize_basic_self_updating_pipeline_construct(s
     )
 
 
+def test_constructs_pipeline_basic_self_updating_pipeline_synth_step_build_cache(template_cache, request, mocker, pipeline_config):
+    pipeline, template = get_basic_self_updating_pipeline(
+        template_cache,
+        request,
+        mocker,
+        pipeline_config,
+    )
+    projects = template.find_resources(
+        'AWS::CodeBuild::Project',
+        {
+            'Properties': {
+                'Description': 'Pipeline step Default/Pipeline/Build/SynthStep',
+            }
+        }
+    )
+    assert len(projects) == 1
+    # The build spec references the Docker Hub secret, so it's an Fn::Join
+    # instead of a plain JSON string.
+    build_spec = ''.join(
+        part
+        for part in list(projects.values())[0]['Properties']['Source']['BuildSpec']['Fn::Join'][1]
+        if isinstance(part, str)
+    )
+    assert '"cache": {' in build_spec
+    assert build_spec.index('"/root/.npm/**/*"') < build_spec.index('"/root/.cache/pip/**/*"')
+
+
+def test_constructs_pipeline_basic_self_updating_pipeline_build_cache_disabled(stack, secret, mocker, pipeline_config):
+    from infrastructure.config import BuildCache
+    from infrastructure.constructs.pipeline import BasicSelfUpdatingPipeline
+    from infrastructure.constructs.pipeline import BasicSelfUpdatingPipelineProps
+    existing_resources = mocker.Mock()
+    existing_resources.code_star_connection.arn = 'some-arn'
+    existing_resources.docker_hub_credentials.secret = secret
+    pipeline_config.build_cache = BuildCache(
+        pip=False,
+        npm=False,
+        docker_layers=False,
+    )
+    pipeline = BasicSelfUpdatingPipeline(
+        stack,
+        'TestBasicSelfUpdatingPipeline',
+        props=BasicSelfUpdatingPipelineProps(
+            github_repo='ABC/xyz',
+            existing_resources=existing_resources,
+            config=pipeline_config,
+        )
+    )
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        'AWS::CodeBuild::Project',
+        {
+            'Cache': {
+                'Type': 'NO_CACHE'
+            },
+            'Description': 'Pipeline step Default/Pipeline/Build/SynthStep',
+        }
+    )
+
+
+def test_constructs_pipeline_basic_self_updating_pipeline_docker_cache_repository(template_cache, request, mocker, pipeline_config):
+    pipeline, template = get_basic_self_updating_pipeline(
+        template_cache,
+        request,
+        mocker,
+        pipeline_config,
+    )
+    assert pipeline.docker_cache_repository_uri == (
+        f'{pipeline_config.account_and_region.account}.dkr.ecr.us-west-2.amazonaws.com/'
+        'igvf-ui-some-branch-docker-cache'
+    )
+    template.has_resource_properties(
+        'AWS::ECR::Repository',
+        {
+            'RepositoryName': 'igvf-ui-some-branch-docker-cache',
+        }
+    )
+    template.resource_count_is(
+        'AWS::ECR::Repository',
+        1
+    )
+
+
+def test_constructs_pipeline_get_bootstrap_qualifier():
+    from aws_cdk import App
+    from aws_cdk import Stack
+    from infrastructure.constructs.pipeline import get_bootstrap_qualifier
+    assert get_bootstrap_qualifier(Stack(App())) == 'hnb659fds'
+    app = App(
+        context={
+            '@aws-cdk/core:bootstrapQualifier': 'abc123',
+        }
+    )
+    assert get_bootstrap_qualifier(Stack(app)) == 'abc123'
+
+
+def test_constructs_pipeline_get_docker_cache_repository_name():
+    from infrastructure.constructs.pipeline import get_docker_cache_repository_name
+    assert get_docker_cache_repository_name('IGVF-123-Branch') == 'igvf-ui-igvf-123-branch-docker-cache'
+
+
 def test_constructs_pipeline_initialize_demo_deployment_pipeline_construct(mocker, pipeline_config):
     from aws_cdk import Stack
     from aws_cdk.aws_secretsmanager import Secret
@@ -353,7 +474,7 @@ def test_constructs_pipeline_initialize_demo_deployment_pipeline_construct(mocke
                                 'ProjectName': {
                                     'Ref': 'TestDemoDeploymentPipelineBuildSynthStepCdkBuildProject6B563FFC'
                                 },
-                                'EnvironmentVariables': "[{\"name\":\"_PROJECT_CONFIG_HASH\",\"type\":\"PLAINTEXT\",\"value\":\"663d3af2f62a493998c7e6c0334d84a6bd01853e7bbba5373362d5dd5455c029\"}]"
+                                'EnvironmentVariables': "[{\"name\":\"_PROJECT_CONFIG_HASH\",\"type\":\"PLAINTEXT\",\"value\":\"9445a66cc9e8eeff14e44f53958eaced0bad1b5343924d80170fad672c5f1a17\"}]"
                             },
                             'InputArtifacts': [
                                 {
@@ -624,6 +745,89 @@ def test_constructs_pipeline_initialize_demo_deployment_pipeline_construct(mocke
     )
 
 
+def test_constructs_pipeline_demo_deployment_pipeline_soci_index_step(mocker, pipeline_config):
+    from aws_cdk import Stack
+    from aws_cdk.assertions import Match
+    from aws_cdk.aws_secretsmanager import Secret
+    from aws_cdk.aws_chatbot import SlackChannelConfiguration
+    from infrastructure.constructs.pipeline import DemoDeploymentPipeline
+    from infrastructure.constructs.pipeline import DemoDeploymentPipelineProps
+    from infrastructure.constructs.existing import igvf_dev
+    stack = Stack(
+        env=igvf_dev.US_WEST_2
+    )
+    existing_resources = mocker.Mock()
+    existing_resources.code_star_connection.arn = 'some-arn'
+    existing_resources.docker_hub_credentials.secret = Secret(
+        stack,
+        'TestSecret',
+    )
+    existing_resources.notification.encode_dcc_chatbot = SlackChannelConfiguration(
+        stack,
+        'TestChatbot',
+        slack_channel_configuration_name='some-config-name',
+        slack_channel_id='some-channel-id',
+        slack_workspace_id='some-workspace-id',
+    )
+    pipeline_config.soci_index = True
+    pipeline = DemoDeploymentPipeline(
+        stack,
+        'TestDemoDeploymentPipeline',
+        props=DemoDeploymentPipelineProps(
+            github_repo='ABC/xyz',
+            existing_resources=existing_resources,
+            config=pipeline_config,
+        )
+    )
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        'AWS::CodeBuild::Project',
+        {
+            'Environment': Match.object_like(
+                {
+                    'PrivilegedMode': True,
+                }
+            ),
+            'Source': {
+                'BuildSpec': Match.serialized_json(
+                    Match.object_like(
+                        {
+                            'phases': Match.object_like(
+                                {
+                                    'build': {
+                                        'commands': [
+                                            'cd ./cdk',
+                                            'python commands/push_soci_indexes.py --qualifier hnb659fds $APPLICATION_IMAGE_URI $NGINX_IMAGE_URI',
+                                        ]
+                                    }
+                                }
+                            )
+                        }
+                    )
+                ),
+                'Type': 'CODEPIPELINE'
+            },
+        }
+    )
+    template.has_resource_properties(
+        'AWS::IAM::Policy',
+        {
+            'PolicyDocument': {
+                'Statement': Match.array_with(
+                    [
+                        {
+                            'Action': 'sts:AssumeRole',
+                            'Effect': 'Allow',
+                            'Resource': 'arn:aws:iam::*:role/cdk-hnb659fds-image-publishing-role-*'
+                        }
+                    ]
+                ),
+                'Version': '2012-10-17'
+            },
+        }
+    )
+
+
 def test_constructs_pipeline_initialize_dev_deployment_pipeline_construct(mocker, pipeline_config):
     from aws_cdk import Stack
     from aws_cdk.aws_secretsmanager import Secret
@@ -720,7 +924,7 @@ def test_constructs_pipeline_initialize_dev_deployment_pipeline_construct(mocker
                                 'ProjectName': {
                                     'Ref': 'DevDeploymentPipelineBuildSynthStepCdkBuildProject2CD3821E'
                                 },
-                                'EnvironmentVariables': "[{\"name\":\"_PROJECT_CONFIG_HASH\",\"type\":\"PLAINTEXT\",\"value\":\"663d3af2f62a493998c7e6c0334d84a6bd01853e7bbba5373362d5dd5455c029\"}]"
+                                'EnvironmentVariables': "[{\"name\":\"_PROJECT_CONFIG_HASH\",\"type\":\"PLAINTEXT\",\"value\":\"9445a66cc9e8eeff14e44f53958eaced0bad1b5343924d80170fad672c5f1a17\"}]"
                             },
                             'InputArtifacts': [
                                 {
@@ -991,6 +1195,70 @@ def test_constructs_pipeline_initialize_dev_deployment_pipeline_construct(mocker
     )
 
 
+def test_constructs_pipeline_dev_deployment_pipeline_load_test_step(mocker, pipeline_config):
+    from aws_cdk import Stack
+    from aws_cdk.assertions import Match
+    from aws_cdk.aws_secretsmanager import Secret
+    from aws_cdk.aws_chatbot import SlackChannelConfiguration
+    from infrastructure.constructs.pipeline import DevDeploymentPipeline
+    from infrastructure.constructs.pipeline import DevDeploymentPipelineProps
+    from infrastructure.constructs.existing import igvf_dev
+    stack = Stack(
+        env=igvf_dev.US_WEST_2
+    )
+    existing_resources = mocker.Mock()
+    existing_resources.code_star_connection.arn = 'some-arn'
+    existing_resources.docker_hub_credentials.secret = Secret(
+        stack,
+        'TestSecret',
+    )
+    existing_resources.notification.encode_dcc_chatbot = SlackChannelConfiguration(
+        stack,
+        'TestChatbot',
+        slack_channel_configuration_name='some-config-name',
+        slack_channel_id='some-channel-id',
+        slack_workspace_id='some-workspace-id',
+    )
+    pipeline_config.load_test = True
+    pipeline = DevDeploymentPipeline(
+        stack,
+        'DevDeploymentPipeline',
+        props=DevDeploymentPipelineProps(
+            github_repo='ABC/xyz',
+            existing_resources=existing_resources,
+            config=pipeline_config,
+        )
+    )
+    assert pipeline.dev_config.load_test['enabled'] is True
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        'AWS::CodeBuild::Project',
+        {
+            'Source': {
+                'BuildSpec': Match.serialized_json(
+                    Match.object_like(
+                        {
+                            'phases': {
+                                'build': {
+                                    'commands': [
+                                        'cd ./cdk',
+                                        Match.string_like_regexp(
+                                            r'^python -m commands.load_test --url https://igvf-ui-some-branch\..+ '
+                                            r'--requests 300 --concurrency 10 --max-p95-latency-ms 3000 --max-error-rate 0.01 '
+                                            r"--route /:3 --route '/search/\?type=MeasurementSet:3'"
+                                        ),
+                                    ]
+                                }
+                            }
+                        }
+                    )
+                ),
+                'Type': 'CODEPIPELINE'
+            },
+        }
+    )
+
+
 def test_constructs_pipeline_initialize_production_deployment_pipeline_construct(mocker, production_pipeline_config):
     from aws_cdk import Stack
     from aws_cdk.aws_secretsmanager import Secret
@@ -1098,7 +1366,7 @@ def test_constructs_pipeline_initialize_production_deployment_pipeline_construct
                                 'ProjectName': {
                                     'Ref': 'TestProductionDeploymentPipelineBuildSynthStepCdkBuildProjectF1FF1A53'
                                 },
-                                'EnvironmentVariables': "[{\"name\":\"_PROJECT_CONFIG_HASH\",\"type\":\"PLAINTEXT\",\"value\":\"6f0b2962bf308cc00b3858b13595b2b277034bd4ffefa3d44d6475a0f247376f\"}]"
+                                'EnvironmentVariables': "[{\"name\":\"_PROJECT_CONFIG_HASH\",\"type\":\"PLAINTEXT\",\"value\":\"5df31e525c1ead874675c48465d341bace833b2959db372e59772f6a22f6e679\"}]"
                             },
                             'InputArtifacts': [
                                 {
@@ -1536,3 +1804,4 @@ def test_constructs_pipeline_initialize_production_deployment_pipeline_construct
             ]
         }
     )
+
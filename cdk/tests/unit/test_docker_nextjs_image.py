@@ -0,0 +1,95 @@
+import pytest
+
+import shutil
+
+import subprocess
+
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
+DOCKERFILE = REPO_ROOT / 'docker' / 'nextjs' / 'Dockerfile'
+
+# Uncompressed size budget for the production Next.js image. Larger images
+# slow down Fargate task startup when scaling out.
+APPLICATION_IMAGE_SIZE_BUDGET_MIB = 500
+
+
+def docker_is_available():
+    if shutil.which('docker') is None:
+        return False
+    result = subprocess.run(
+        ['docker', 'info'],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return result.returncode == 0
+
+
+def get_stage_lines(stage):
+    lines = []
+    in_stage = False
+    for line in DOCKERFILE.read_text().splitlines():
+        if line.startswith('FROM '):
+            in_stage = line.endswith(f' AS {stage}')
+            continue
+        if in_stage and line.strip() and not line.startswith('#'):
+            lines.append(line)
+    return lines
+
+
+def test_docker_nextjs_image_production_stage_only_copies_build_output():
+    lines = get_stage_lines('production')
+    copies = [
+        line
+        for line in lines
+        if line.startswith('COPY ')
+    ]
+    assert copies
+    assert 'COPY . .' not in copies
+    assert not any(
+        'node_modules' in line
+        for line in copies
+    )
+    assert 'COPY --from=builder /igvf-ui/.next/standalone ./' in copies
+
+
+@pytest.mark.docker
+@pytest.mark.skipif(
+    not docker_is_available(),
+    reason='Docker daemon not available',
+)
+def test_docker_nextjs_image_size_within_budget():
+    tag = 'igvf-ui-nextjs-size-check'
+    subprocess.run(
+        [
+            'docker',
+            'build',
+            '--target',
+            'production',
+            '--file',
+            str(DOCKERFILE),
+            '--tag',
+            tag,
+            str(REPO_ROOT),
+        ],
+        check=True,
+    )
+    size = int(
+        subprocess.check_output(
+            [
+                'docker',
+                'image',
+                'inspect',
+                '--format',
+                '{{.Size}}',
+                tag,
+            ],
+            encoding='UTF-8',
+        ).strip()
+    )
+    assert size <= APPLICATION_IMAGE_SIZE_BUDGET_MIB * 1024 * 1024, (
+        f'Image size {size / 1024 / 1024:.0f} MiB exceeds budget of '
+        f'{APPLICATION_IMAGE_SIZE_BUDGET_MIB} MiB'
+    )
@@ -0,0 +1,71 @@
+/**
+ * Starts the Next.js standalone server in the production image. Use this instead of the generated
+ * `server.js`, which embeds the `next.config.js` values from build time. Our runtime configs read
+ * `BACKEND_URL` and friends from the environment, and the same image gets deployed to several
+ * environments, so we load `next.config.js` again here to pick up the container's environment.
+ *
+ * This mirrors the generated `server.js` for the pinned Next.js 13.4 release, and
+ * `lib/__tests__/standalone-server.test.ts` fails if that changes. Check it again when
+ * upgrading Next.js.
+ */
+const path = require("path");
+
+const dir = path.join(__dirname);
+
+process.env.NODE_ENV = "production";
+process.chdir(__dirname);
+
+// Make sure the container stops promptly when ECS sends a termination signal.
+if (!process.env.NEXT_MANUAL_SIG_HANDLE) {
+  process.on("SIGTERM", () => process.exit(0));
+  process.on("SIGINT", () => process.exit(0));
+}
+
+const currentPort = parseInt(process.env.PORT, 10) || 3000;
+const hostname = process.env.HOSTNAME || "localhost";
+
+let keepAliveTimeout = parseInt(process.env.KEEP_ALIVE_TIMEOUT, 10);
+if (
+  Number.isNaN(keepAliveTimeout) ||
+  !Number.isFinite(keepAliveTimeout) ||
+  keepAliveTimeout < 0
+) {
+  keepAliveTimeout = undefined;
+}
+
+// Start from the normalized config the build produced, and replace only the runtime configs with
+// values evaluated in this container.
+const buildConfig = require("./.next/required-server-files.json").config;
+const runtimeConfig = require("./next.config.js");
+const nextConfig = {
+  ...buildConfig,
+  serverRuntimeConfig: runtimeConfig.serverRuntimeConfig,
+  publicRuntimeConfig: runtimeConfig.publicRuntimeConfig,
+};
+
+process.env.__NEXT_PRIVATE_STANDALONE_CONFIG = JSON.stringify(nextConfig);
+
+require("next");
+const { startServer } = require("next/dist/server/lib/start-server");
+
+startServer({
+  dir,
+  isDev: false,
+  config: nextConfig,
+  hostname,
+  port: currentPort,
+  allowRetry: false,
+  keepAliveTimeout,
+  useWorkers: !!nextConfig.experimental?.appDir,
+})
+  .then(() => {
+    console.log(
+      "Listening on port",
+      currentPort,
+      "url: http://" + hostname + ":" + currentPort
+    );
+  })
+  .catch((err) => {
+    console.error(err);
+    process.exit(1);
+  });
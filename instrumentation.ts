@@ -0,0 +1,12 @@
+/**
+ * Next.js calls `register()` once when each server process starts, before it handles any
+ * requests. See `experimental.instrumentationHook` in `next.config.js`.
+ */
+export async function register(): Promise<void> {
+  // Middleware runs in the edge runtime, which can't reach Redis or keep timers.
+  if (process.env.NEXT_RUNTIME === "nodejs") {
+    // Import here so the edge runtime doesn't bundle the server cache.
+    const { watchDataProvider } = await import("./lib/server-objects");
+    watchDataProvider();
+  }
+}
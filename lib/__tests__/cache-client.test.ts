@@ -0,0 +1,302 @@
+import { EventEmitter } from "events";
+import {
+  CacheCircuitBreaker,
+  getReconnectDelay,
+  withCommandTimeouts,
+} from "../cache-client";
+
+jest.mock("../constants", () => ({
+  CACHE_URL: "redis://localhost:6379",
+}));
+jest.mock("redis", () => ({
+  createClient: jest.fn(),
+}));
+
+/**
+ * Create a fake Redis client that becomes ready when `connect()` gets called, unless
+ * `connectSucceeds` is false.
+ */
+function createFakeClient(connectSucceeds = true) {
+  const client = Object.assign(new EventEmitter(), {
+    isReady: false,
+    connect: jest.fn(() => {
+      if (connectSucceeds) {
+        client.isReady = true;
+        client.emit("ready");
+      }
+      return new Promise(() => {});
+    }),
+    get: jest.fn().mockResolvedValue("value"),
+  });
+  return client;
+}
+
+describe("CacheCircuitBreaker", () => {
+  let now: number;
+  let breaker: CacheCircuitBreaker;
+
+  beforeEach(() => {
+    now = 0;
+    breaker = new CacheCircuitBreaker(2, 1000, () => now);
+  });
+
+  it("should open after the failure threshold and stay open for the cool-down", () => {
+    breaker.recordFailure(new Error("first"));
+    expect(breaker.state).toBe("closed");
+
+    breaker.recordFailure(new Error("second"));
+    expect(breaker.state).toBe("open");
+    expect(breaker.openUntil).toBe(1000);
+    expect(breaker.consecutiveFailures).toBe(2);
+    expect(breaker.lastError).toBe("second");
+
+    now = 999;
+    expect(breaker.state).toBe("open");
+    now = 1000;
+    expect(breaker.state).toBe("half-open");
+    expect(breaker.openUntil).toBeNull();
+  });
+
+  it("should reopen a half-open circuit on the next failure", () => {
+    breaker.recordFailure(new Error("first"));
+    breaker.recordFailure(new Error("second"));
+    now = 1000;
+
+    breaker.recordFailure("third");
+    expect(breaker.state).toBe("open");
+    expect(breaker.openUntil).toBe(2000);
+    expect(breaker.lastError).toBe("third");
+  });
+
+  it("should let one probe request through a half-open circuit at a time", () => {
+    breaker = new CacheCircuitBreaker(2, 1000, () => now, 500);
+    expect(breaker.allowRequest()).toBe(true);
+    breaker.recordFailure(new Error("first"));
+    breaker.recordFailure(new Error("second"));
+    expect(breaker.allowRequest()).toBe(false);
+
+    // Only the first request after the cool-down probes the service.
+    now = 1000;
+    expect(breaker.allowRequest()).toBe(true);
+    expect(breaker.allowRequest()).toBe(false);
+    expect(breaker.allowRequest()).toBe(false);
+
+    // A probe that never reports a result frees the slot after the probe timeout.
+    now = 1500;
+    expect(breaker.allowRequest()).toBe(true);
+    expect(breaker.allowRequest()).toBe(false);
+
+    // A failed probe reopens the circuit, and the next probe waits for the cool-down.
+    breaker.recordFailure(new Error("third"));
+    expect(breaker.allowRequest()).toBe(false);
+    now = 2500;
+    expect(breaker.allowRequest()).toBe(true);
+    expect(breaker.allowRequest()).toBe(false);
+
+    // A successful probe closes the circuit for every request.
+    breaker.recordSuccess();
+    expect(breaker.allowRequest()).toBe(true);
+    expect(breaker.allowRequest()).toBe(true);
+  });
+
+  it("should close and reset the failure count on success", () => {
+    breaker.recordFailure(new Error("first"));
+    breaker.recordFailure(new Error("second"));
+    now = 1000;
+
+    breaker.recordSuccess();
+    expect(breaker.state).toBe("closed");
+    expect(breaker.consecutiveFailures).toBe(0);
+
+    breaker.recordFailure(new Error("third"));
+    expect(breaker.state).toBe("closed");
+  });
+});
+
+describe("getReconnectDelay", () => {
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it("should back off exponentially with jitter up to the maximum", () => {
+    jest.spyOn(Math, "random").mockReturnValue(1);
+    expect(getReconnectDelay(0)).toBe(100);
+    expect(getReconnectDelay(3)).toBe(800);
+    expect(getReconnectDelay(20)).toBe(10000);
+
+    jest.spyOn(Math, "random").mockReturnValue(0);
+    expect(getReconnectDelay(3)).toBe(400);
+  });
+});
+
+describe("withCommandTimeouts", () => {
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  it("should pass replies through and record success", async () => {
+    const breaker = new CacheCircuitBreaker(1, 1000);
+    breaker.recordFailure(new Error("earlier"));
+    const client = withCommandTimeouts(
+      { get: jest.fn().mockResolvedValue("value"), isOpen: true },
+      breaker
+    );
+
+    expect(await client.get("key")).toBe("value");
+    expect(client.isOpen).toBe(true);
+    expect(breaker.state).toBe("closed");
+  });
+
+  it("should fail commands that take too long and record the failure", async () => {
+    jest.useFakeTimers();
+    const breaker = new CacheCircuitBreaker(1, 1000);
+    const client = withCommandTimeouts(
+      { get: jest.fn(() => new Promise(() => {})) },
+      breaker,
+      500
+    );
+
+    const reply = client.get("key");
+    jest.advanceTimersByTime(500);
+
+    await expect(reply).rejects.toThrow("Redis get timed out after 500 ms");
+    expect(breaker.state).toBe("open");
+  });
+
+  it("should apply timeouts to transactions", async () => {
+    const breaker = new CacheCircuitBreaker(1, 1000);
+    const transaction = {
+      hSet: jest.fn(),
+      expire: jest.fn(),
+      exec: jest.fn().mockRejectedValue(new Error("exec failed")),
+    };
+    transaction.hSet.mockReturnValue(transaction);
+    transaction.expire.mockReturnValue(transaction);
+    const client = withCommandTimeouts(
+      { multi: jest.fn().mockReturnValue(transaction) },
+      breaker
+    );
+
+    await expect(
+      client.multi().hSet("key", "field", "value").expire("key", 60).exec()
+    ).rejects.toThrow("exec failed");
+    expect(transaction.hSet).toHaveBeenCalledWith("key", "field", "value");
+    expect(transaction.expire).toHaveBeenCalledWith("key", 60);
+    expect(breaker.state).toBe("open");
+  });
+});
+
+describe("getCacheClient", () => {
+  let cacheClient: typeof import("../cache-client");
+  let mockCreateClient: jest.Mock;
+
+  // Load a fresh copy of the module for each test so each test starts without a client.
+  beforeEach(() => {
+    jest.spyOn(console, "error").mockImplementation(() => {});
+    jest.isolateModules(() => {
+      mockCreateClient = require("redis").createClient;
+      cacheClient = require("../cache-client");
+    });
+  });
+
+  afterEach(() => {
+    jest.restoreAllMocks();
+  });
+
+  it("should connect once and return the same client", async () => {
+    const fakeClient = createFakeClient();
+    mockCreateClient.mockReturnValue(fakeClient);
+
+    const client = await cacheClient.getCacheClient();
+    expect(await client.get("key")).toBe("value");
+    expect(await cacheClient.getCacheClient()).toBe(client);
+    expect(mockCreateClient).toHaveBeenCalledTimes(1);
+    expect(mockCreateClient).toHaveBeenCalledWith(
+      expect.objectContaining({
+        url: "redis://localhost:6379",
+        disableOfflineQueue: true,
+      })
+    );
+    expect(cacheClient.getCacheHealth()).toEqual({
+      connected: true,
+      circuit: "closed",
+      consecutiveFailures: 0,
+      reconnectAttempts: 0,
+      openUntil: null,
+      lastError: null,
+    });
+  });
+
+  it("should skip Redis without waiting once the first connection attempt times out", async () => {
+    jest.useFakeTimers();
+    const fakeClient = createFakeClient(false);
+    mockCreateClient.mockReturnValue(fakeClient);
+
+    const firstClient = cacheClient.getCacheClient();
+    jest.advanceTimersByTime(1000);
+    expect(await firstClient).toBeNull();
+
+    // Later requests don't wait for the connection.
+    expect(await cacheClient.getCacheClient()).toBeNull();
+    expect(mockCreateClient).toHaveBeenCalledTimes(1);
+    jest.useRealTimers();
+  });
+
+  it("should skip Redis while the circuit is open and use it again once ready", async () => {
+    const fakeClient = createFakeClient();
+    mockCreateClient.mockReturnValue(fakeClient);
+    await cacheClient.getCacheClient();
+
+    fakeClient.isReady = false;
+    fakeClient.emit("error", new Error("Connection lost"));
+    fakeClient.emit("reconnecting");
+    fakeClient.emit("error", new Error("Connection refused"));
+    fakeClient.emit("reconnecting");
+    fakeClient.emit("error", new Error("Connection refused"));
+
+    expect(await cacheClient.getCacheClient()).toBeNull();
+    expect(cacheClient.getCacheHealth()).toEqual(
+      expect.objectContaining({
+        connected: false,
+        circuit: "open",
+        consecutiveFailures: 3,
+        reconnectAttempts: 2,
+        lastError: "Connection refused",
+      })
+    );
+
+    fakeClient.isReady = true;
+    fakeClient.emit("ready");
+    expect(await cacheClient.getCacheClient()).not.toBeNull();
+    expect(cacheClient.getCacheHealth().circuit).toBe("closed");
+  });
+
+  it("should let only one request probe Redis once the cool-down ends", async () => {
+    jest.useFakeTimers();
+    const fakeClient = createFakeClient();
+    mockCreateClient.mockReturnValue(fakeClient);
+    const client = await cacheClient.getCacheClient();
+
+    // Redis stays connected but fails every command, opening the circuit.
+    fakeClient.get.mockRejectedValue(new Error("Command failed"));
+    for (let i = 0; i < 3; i += 1) {
+      await expect(client.get("key")).rejects.toThrow("Command failed");
+    }
+    expect(await cacheClient.getCacheClient()).toBeNull();
+
+    // After the cool-down, the first request probes Redis and the rest skip it.
+    jest.advanceTimersByTime(30_000);
+    const probe = await cacheClient.getCacheClient();
+    expect(probe).not.toBeNull();
+    expect(await cacheClient.getCacheClient()).toBeNull();
+    expect(await cacheClient.getCacheClient()).toBeNull();
+
+    // A successful probe closes the circuit for every request.
+    fakeClient.get.mockResolvedValue("value");
+    expect(await probe.get("key")).toBe("value");
+    expect(cacheClient.getCacheHealth().circuit).toBe("closed");
+    expect(await cacheClient.getCacheClient()).not.toBeNull();
+    expect(await cacheClient.getCacheClient()).not.toBeNull();
+    jest.useRealTimers();
+  });
+});
@@ -0,0 +1,112 @@
+import {
+  configureCacheCodec,
+  decodeCacheValue,
+  encodeCacheValue,
+  registerCacheCompressor,
+  zstdCompressor,
+} from "../cache-codec";
+
+describe("Test cache value encoding", () => {
+  const largeData = {
+    items: Array.from({ length: 1000 }, (_, i) => ({
+      id: i,
+      title: `Item ${i}`,
+    })),
+  };
+
+  afterEach(() => {
+    configureCacheCodec();
+  });
+
+  it("stores values below the threshold as plain JSON", async () => {
+    const encoded = await encodeCacheValue({ id: 1 });
+
+    expect(encoded).toEqual({ value: '{"id":1}', size: 8 });
+    expect(await decodeCacheValue(encoded.value)).toEqual({
+      data: { id: 1 },
+      size: 8,
+    });
+  });
+
+  it("compresses values at or above the threshold", async () => {
+    const json = JSON.stringify(largeData);
+    const encoded = await encodeCacheValue(largeData);
+
+    expect(encoded.value.startsWith("@1:json:gzip:")).toBe(true);
+    expect(encoded.value.length).toBeLessThan(json.length / 4);
+    expect(encoded.size).toBe(Buffer.byteLength(json));
+    expect(await decodeCacheValue(encoded.value)).toEqual({
+      data: largeData,
+      size: Buffer.byteLength(json),
+    });
+  });
+
+  it("decodes entries cached before compression as plain JSON", async () => {
+    const json = JSON.stringify(largeData);
+
+    expect((await decodeCacheValue(json)).data).toEqual(largeData);
+  });
+
+  it("encodes with the configured serializer and compressor", async () => {
+    configureCacheCodec({ serializer: "v8", compressor: "", threshold: 0 });
+    const date = new Date(0);
+    const encoded = await encodeCacheValue({ date });
+
+    expect(encoded.value.startsWith("@1:v8::")).toBe(true);
+    expect((await decodeCacheValue(encoded.value)).data).toEqual({ date });
+  });
+
+  it("keeps decoding values encoded with a previous configuration", async () => {
+    const encoded = await encodeCacheValue(largeData);
+    configureCacheCodec({ serializer: "v8", compressor: "" });
+
+    expect((await decodeCacheValue(encoded.value)).data).toEqual(largeData);
+  });
+
+  it("compresses with zstd if available", async () => {
+    if (zstdCompressor) {
+      configureCacheCodec({ compressor: "zstd" });
+      const encoded = await encodeCacheValue(largeData);
+
+      expect(encoded.value.startsWith("@1:json:zstd:")).toBe(true);
+      expect((await decodeCacheValue(encoded.value)).data).toEqual(largeData);
+    } else {
+      expect(() => configureCacheCodec({ compressor: "zstd" })).toThrow(
+        "Unknown cache compressor zstd"
+      );
+    }
+  });
+
+  it("uses registered compressors", async () => {
+    registerCacheCompressor({
+      name: "reverse",
+      compress: async (payload) => Buffer.from(payload).reverse(),
+      decompress: async (payload) => Buffer.from(payload).reverse(),
+    });
+    configureCacheCodec({ compressor: "reverse", threshold: 0 });
+    const encoded = await encodeCacheValue({ id: 1 });
+
+    expect(encoded.value).toBe(
+      `@1:json:reverse:${Buffer.from("}1:\"di\"{").toString("base64")}`
+    );
+    expect((await decodeCacheValue(encoded.value)).data).toEqual({ id: 1 });
+  });
+
+  it("rejects unknown configurations and encodings", async () => {
+    expect(() => configureCacheCodec({ serializer: "cbor" })).toThrow(
+      "Unknown cache serializer cbor"
+    );
+    expect(() => configureCacheCodec({ compressor: "lz4" })).toThrow(
+      "Unknown cache compressor lz4"
+    );
+    await expect(decodeCacheValue("@2:json::e30=")).rejects.toThrow(
+      "Unsupported cache value encoding @2:json::"
+    );
+    await expect(decodeCacheValue("@1:json:lz4:e30=")).rejects.toThrow(
+      "Unsupported cache value encoding @1:json:lz4:"
+    );
+    await expect(decodeCacheValue("@json")).rejects.toThrow(
+      "Invalid cache value header @json"
+    );
+  });
+});
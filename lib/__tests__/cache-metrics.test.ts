@@ -0,0 +1,127 @@
+import {
+  Histogram,
+  countCacheEvent,
+  getCacheMetrics,
+  getKeyFamily,
+  logCacheMetrics,
+  observeCacheValue,
+  resetCacheMetrics,
+} from "../cache-metrics";
+
+describe("getKeyFamily", () => {
+  it("should group keys by the kind of data they hold", () => {
+    expect(getKeyFamily("profiles")).toBe("profiles");
+    expect(getKeyFamily("collection-titles")).toBe("collection-titles");
+    expect(getKeyFamily("indexer-state")).toBe("indexer-state");
+    expect(getKeyFamily("facet-config-1234")).toBe("facet-config");
+    expect(getKeyFamily("facet-optional-1234")).toBe("facet-optional");
+    expect(getKeyFamily("facet-MeasurementSet-1234")).toBe("facet-order");
+    expect(getKeyFamily("lab-chart-data-lab")).toBe("lab-chart-data");
+  });
+
+  it("should ignore the tag generations of tagged keys", () => {
+    expect(getKeyFamily("profiles#data-provider-version:2")).toBe("profiles");
+  });
+
+  it("should put unknown keys in the other family", () => {
+    expect(getKeyFamily("profiles-extra")).toBe("other");
+    expect(getKeyFamily("something")).toBe("other");
+  });
+});
+
+describe("Histogram", () => {
+  it("should summarize values by bucket", () => {
+    const histogram = new Histogram([10, 100]);
+    [1, 5, 20, 50, 70, 500].forEach((value) => histogram.record(value));
+
+    const summary = histogram.summarize();
+    expect(summary.count).toBe(6);
+    expect(summary.sum).toBe(646);
+    expect(summary.max).toBe(500);
+    expect(summary.p50).toBe(100);
+    expect(summary.p99).toBe(500);
+    expect(summary.buckets).toEqual([
+      { le: 10, count: 2 },
+      { le: 100, count: 3 },
+      { le: "+Inf", count: 1 },
+    ]);
+  });
+
+  it("should not report percentiles above the largest value", () => {
+    const histogram = new Histogram([10, 100]);
+    histogram.record(3);
+    expect(histogram.percentile(50)).toBe(3);
+  });
+
+  it("should report null percentiles without values", () => {
+    const summary = new Histogram([10]).summarize();
+    expect(summary.count).toBe(0);
+    expect(summary.p50).toBeNull();
+    expect(summary.max).toBeNull();
+  });
+});
+
+describe("Cache metrics", () => {
+  beforeEach(() => {
+    resetCacheMetrics();
+  });
+
+  afterEach(() => {
+    resetCacheMetrics();
+    jest.restoreAllMocks();
+    jest.useRealTimers();
+  });
+
+  it("should record counters and histograms by key family", () => {
+    countCacheEvent("facet-config-user1", "hits");
+    countCacheEvent("facet-config-user2", "hits");
+    countCacheEvent("facet-config-user2", "bytesRead", 300);
+    observeCacheValue("facet-config-user1", "lookupMs", 4);
+    countCacheEvent("profiles", "misses");
+
+    const metrics = getCacheMetrics();
+    expect(Object.keys(metrics)).toEqual(["facet-config", "profiles"]);
+    expect(metrics["facet-config"].hits).toBe(2);
+    expect(metrics["facet-config"].bytesRead).toBe(300);
+    expect(metrics["facet-config"].misses).toBe(0);
+    expect(metrics["facet-config"].lookupMs.count).toBe(1);
+    expect(metrics["facet-config"].lookupMs.p50).toBe(4);
+    expect(metrics.profiles.misses).toBe(1);
+  });
+
+  it("should log one JSON record per family", () => {
+    const log = jest.spyOn(console, "log").mockImplementation(() => {});
+    countCacheEvent("indexer-state", "hits");
+    observeCacheValue("indexer-state", "fetchMs", 20);
+
+    logCacheMetrics();
+    expect(log).toHaveBeenCalledTimes(1);
+    const record = JSON.parse(log.mock.calls[0][0]);
+    expect(record).toEqual(
+      expect.objectContaining({
+        event: "cache-metrics",
+        family: "indexer-state",
+        hits: 1,
+        fetchMs: { count: 1, sum: 20, p50: 20, p95: 20, p99: 20, max: 20 },
+      })
+    );
+  });
+
+  it("should log periodically only after recording something", () => {
+    jest.useFakeTimers();
+    const log = jest.spyOn(console, "log").mockImplementation(() => {});
+    countCacheEvent("profiles", "hits");
+
+    jest.advanceTimersByTime(60_000);
+    expect(log).toHaveBeenCalledTimes(1);
+
+    jest.advanceTimersByTime(60_000);
+    expect(log).toHaveBeenCalledTimes(1);
+  });
+
+  it("should remove all metrics on reset", () => {
+    countCacheEvent("profiles", "hits");
+    resetCacheMetrics();
+    expect(getCacheMetrics()).toEqual({});
+  });
+});
@@ -14,14 +14,20 @@ jest.mock("../cache-client");
 jest.mock("../fetch-request");
 
 import {
+  clearMemoryCache,
+  getCacheStats,
   getCachedData,
   getCachedDataFetch,
   getCachedDataWithField,
+  getManyCached,
   getObjectCached,
+  invalidateCacheTags,
+  invalidateCacheTagsOnChange,
   setCachedData,
   setCachedDataWithField,
 } from "../cache";
 import { getCacheClient } from "../cache-client";
+import { getCacheMetrics, resetCacheMetrics } from "../cache-metrics";
 import FetchRequest from "../fetch-request";
 
 // Wrap `getCacheClient` with proper typing to access Jest mock methods.
@@ -35,10 +41,35 @@ describe("Cache System", () => {
   let mockFetchRequest: any;
 
   beforeEach(() => {
-    // Create mock Redis client.
+    // Create mock Redis client. Transactions and pipelines run their queued commands through the
+    // client's own mocks, so tests can check the commands whichever way they got sent.
     mockRedisClient = {
       get: jest.fn(),
       set: jest.fn(),
+      mGet: jest.fn((keys: string[]) =>
+        Promise.all(keys.map((key) => mockRedisClient.get(key)))
+      ),
+      multi: jest.fn(() => {
+        const commands: (() => Promise<unknown>)[] = [];
+        const execCommands = async () => {
+          const replies = [];
+          for (const command of commands) {
+            replies.push(await command());
+          }
+          return replies;
+        };
+        const multi = {
+          exec: jest.fn(execCommands),
+          execAsPipeline: jest.fn(execCommands),
+        };
+        ["get", "mGet", "hGet", "hSet", "expire", "incr"].forEach((name) => {
+          multi[name] = (...args: unknown[]) => {
+            commands.push(() => mockRedisClient[name](...args));
+            return multi;
+          };
+        });
+        return multi;
+      }),
     };
 
     // Create mock FetchRequest instance.
@@ -384,6 +415,731 @@ describe("Cache System", () => {
     });
   });
 
+  describe("Memory cache tier", () => {
+    beforeEach(() => {
+      clearMemoryCache();
+    });
+
+    it("should serve repeat requests from memory without Redis", async () => {
+      const cachedData = { id: 1, name: "profiles" };
+      mockRedisClient.get.mockResolvedValue(JSON.stringify(cachedData));
+      const fetcher = jest.fn();
+
+      const result1 = await getCachedDataFetch(
+        "memory-key",
+        fetcher,
+        3600,
+        "",
+        { memoryTtl: 60 }
+      );
+      const result2 = await getCachedDataFetch(
+        "memory-key",
+        fetcher,
+        3600,
+        "",
+        { memoryTtl: 60 }
+      );
+
+      expect(result1).toEqual(cachedData);
+      // The memory tier returns the same parsed object.
+      expect(result2).toBe(result1);
+      expect(mockRedisClient.get).toHaveBeenCalledTimes(1);
+      expect(fetcher).not.toHaveBeenCalled();
+      expect(getCacheStats()).toEqual({
+        memory: { hits: 1, misses: 1 },
+        redis: { hits: 1, misses: 0 },
+      });
+    });
+
+    it("should keep fetched data in memory", async () => {
+      const fetchedData = { id: 2 };
+      mockRedisClient.get.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue(fetchedData);
+
+      await getCachedDataFetch("memory-fetch-key", fetcher, 3600, "", {
+        memoryTtl: 60,
+      });
+      const result = await getCachedDataFetch(
+        "memory-fetch-key",
+        fetcher,
+        3600,
+        "",
+        { memoryTtl: 60 }
+      );
+
+      expect(result).toEqual(fetchedData);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.get).toHaveBeenCalledTimes(1);
+      expect(getCacheStats().redis).toEqual({ hits: 0, misses: 1 });
+    });
+
+    it("should check Redis again after the memory TTL", async () => {
+      jest.useFakeTimers();
+      try {
+        mockRedisClient.get.mockResolvedValue(JSON.stringify({ id: 3 }));
+        const fetcher = jest.fn();
+
+        await getCachedDataFetch("memory-ttl-key", fetcher, 3600, "", {
+          memoryTtl: 5,
+        });
+        jest.advanceTimersByTime(5000);
+        await getCachedDataFetch("memory-ttl-key", fetcher, 3600, "", {
+          memoryTtl: 5,
+        });
+
+        expect(mockRedisClient.get).toHaveBeenCalledTimes(2);
+      } finally {
+        jest.useRealTimers();
+      }
+    });
+
+    it("should not use memory without a memory TTL", async () => {
+      mockRedisClient.get.mockResolvedValue(JSON.stringify({ id: 4 }));
+      const fetcher = jest.fn();
+
+      await getCachedDataFetch("no-memory-key", fetcher);
+      await getCachedDataFetch("no-memory-key", fetcher);
+
+      expect(mockRedisClient.get).toHaveBeenCalledTimes(2);
+      expect(getCacheStats().memory).toEqual({ hits: 0, misses: 0 });
+    });
+
+    it("should keep hash fields apart in memory", async () => {
+      mockRedisClient.hGet = jest
+        .fn()
+        .mockResolvedValueOnce(JSON.stringify({ field: "a" }))
+        .mockResolvedValueOnce(JSON.stringify({ field: "b" }));
+      const fetcher = jest.fn();
+
+      const resultA = await getCachedDataFetch(
+        "hash-memory-key",
+        fetcher,
+        3600,
+        "a",
+        { memoryTtl: 60 }
+      );
+      const resultB = await getCachedDataFetch(
+        "hash-memory-key",
+        fetcher,
+        3600,
+        "b",
+        { memoryTtl: 60 }
+      );
+
+      expect(resultA).toEqual({ field: "a" });
+      expect(resultB).toEqual({ field: "b" });
+    });
+
+    it("should pass the memory TTL through getObjectCached", async () => {
+      const responseData = { id: 5 };
+      mockRedisClient.get.mockResolvedValue(null);
+      mockFetchRequest.getObject.mockReturnValue({
+        optional: jest.fn().mockReturnValue(responseData),
+      });
+
+      await getObjectCached("cookie", "memory-object-key", "/path", 3600, {
+        memoryTtl: 60,
+      });
+      const result = await getObjectCached(
+        "cookie",
+        "memory-object-key",
+        "/path",
+        3600,
+        { memoryTtl: 60 }
+      );
+
+      expect(result).toEqual(responseData);
+      expect(mockFetchRequest.getObject).toHaveBeenCalledTimes(1);
+    });
+
+    it("should read through memory in getCachedData and forget it on set", async () => {
+      mockRedisClient.get.mockResolvedValue(JSON.stringify({ theme: "dark" }));
+
+      await getCachedData("memory-prefs", { memoryTtl: 60 });
+      const cached = await getCachedData("memory-prefs", { memoryTtl: 60 });
+      expect(cached).toEqual({ theme: "dark" });
+      expect(mockRedisClient.get).toHaveBeenCalledTimes(1);
+
+      await setCachedData("memory-prefs", { theme: "light" });
+      mockRedisClient.get.mockResolvedValue(JSON.stringify({ theme: "light" }));
+      const updated = await getCachedData("memory-prefs", { memoryTtl: 60 });
+      expect(updated).toEqual({ theme: "light" });
+      expect(mockRedisClient.get).toHaveBeenCalledTimes(2);
+    });
+  });
+
+  describe("Stale-while-revalidate", () => {
+    const NOW = 1_000_000;
+
+    beforeEach(() => {
+      clearMemoryCache();
+      jest.spyOn(Date, "now").mockReturnValue(NOW);
+      mockRedisClient.hGet = jest.fn();
+      mockRedisClient.hSet = jest.fn();
+      mockRedisClient.expire = jest.fn();
+    });
+
+    it("should store the fresh-until time and keep the entry past the TTL", async () => {
+      const fetchedData = { id: 1 };
+      mockRedisClient.get.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue(fetchedData);
+
+      const result = await getCachedDataFetch("swr-miss-key", fetcher, 60, "", {
+        staleWhileRevalidate: 300,
+      });
+
+      expect(result).toEqual(fetchedData);
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "swr-miss-key",
+        JSON.stringify({ "@freshUntil": NOW + 60000, data: fetchedData }),
+        { EX: 360 }
+      );
+    });
+
+    it("should return fresh data without fetching", async () => {
+      mockRedisClient.get.mockResolvedValue(
+        JSON.stringify({ "@freshUntil": NOW + 1, data: { id: 2 } })
+      );
+      const fetcher = jest.fn();
+
+      const result = await getCachedDataFetch(
+        "swr-fresh-key",
+        fetcher,
+        60,
+        "",
+        { staleWhileRevalidate: 300 }
+      );
+
+      expect(result).toEqual({ id: 2 });
+      expect(fetcher).not.toHaveBeenCalled();
+    });
+
+    it("should return stale data right away and refresh it in the background", async () => {
+      mockRedisClient.get.mockResolvedValue(
+        JSON.stringify({ "@freshUntil": NOW, data: { id: 3, stale: true } })
+      );
+      let resolveFetch: (value: unknown) => void;
+      const fetcher = jest.fn().mockImplementation(
+        () =>
+          new Promise((resolve) => {
+            resolveFetch = resolve;
+          })
+      );
+
+      const results = await Promise.all([
+        getCachedDataFetch("swr-stale-key", fetcher, 60, "", {
+          staleWhileRevalidate: 300,
+        }),
+        getCachedDataFetch("swr-stale-key", fetcher, 60, "", {
+          staleWhileRevalidate: 300,
+        }),
+      ]);
+
+      // Both callers get the stale data while only one refresh runs.
+      expect(results).toEqual([
+        { id: 3, stale: true },
+        { id: 3, stale: true },
+      ]);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.set).not.toHaveBeenCalled();
+
+      resolveFetch!({ id: 3, stale: false });
+      await new Promise((resolve) => setTimeout(resolve, 0));
+
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "swr-stale-key",
+        JSON.stringify({
+          "@freshUntil": NOW + 60000,
+          data: { id: 3, stale: false },
+        }),
+        { EX: 360 }
+      );
+    });
+
+    it("should keep serving stale data when the refresh fails", async () => {
+      mockRedisClient.get.mockResolvedValue(
+        JSON.stringify({ "@freshUntil": NOW - 1, data: { id: 4 } })
+      );
+      const fetcher = jest.fn().mockRejectedValue(new Error("Fetch failed"));
+
+      const result = await getCachedDataFetch(
+        "swr-error-key",
+        fetcher,
+        60,
+        "",
+        { staleWhileRevalidate: 300 }
+      );
+      await new Promise((resolve) => setTimeout(resolve, 0));
+
+      expect(result).toEqual({ id: 4 });
+      expect(console.error).toHaveBeenCalledWith(
+        "Cache fetch error for key swr-error-key:",
+        expect.any(Error)
+      );
+      expect(mockRedisClient.set).not.toHaveBeenCalled();
+    });
+
+    it("should treat entries cached without stale-while-revalidate as stale", async () => {
+      mockRedisClient.get.mockResolvedValue(JSON.stringify({ id: 5 }));
+      const fetcher = jest.fn().mockResolvedValue({ id: 5, updated: true });
+
+      const result = await getCachedDataFetch(
+        "swr-legacy-key",
+        fetcher,
+        60,
+        "",
+        { staleWhileRevalidate: 300 }
+      );
+      await new Promise((resolve) => setTimeout(resolve, 0));
+
+      expect(result).toEqual({ id: 5 });
+      expect(fetcher).toHaveBeenCalledTimes(1);
+    });
+
+    it("should extend the hash expiration by the stale period", async () => {
+      mockRedisClient.hGet.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue({ id: 6 });
+
+      await getCachedDataFetch("swr-hash-key", fetcher, 60, "field", {
+        staleWhileRevalidate: 300,
+      });
+
+      expect(mockRedisClient.expire).toHaveBeenCalledWith("swr-hash-key", 360);
+    });
+  });
+
+  describe("Distributed lock", () => {
+    beforeEach(() => {
+      clearMemoryCache();
+      mockRedisClient.exists = jest.fn();
+      mockRedisClient.eval = jest.fn();
+    });
+
+    it("should take the lock, fetch, and release the lock", async () => {
+      const fetchedData = { id: 1 };
+      mockRedisClient.get.mockResolvedValue(null);
+      mockRedisClient.set.mockResolvedValue("OK");
+      const fetcher = jest.fn().mockResolvedValue(fetchedData);
+
+      const result = await getCachedDataFetch("lock-key", fetcher, 60, "", {
+        lockTimeout: 10,
+      });
+
+      expect(result).toEqual(fetchedData);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "lock-key:lock",
+        expect.any(String),
+        { NX: true, PX: 10000 }
+      );
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "lock-key",
+        JSON.stringify(fetchedData),
+        { EX: 60 }
+      );
+
+      // Releases the lock only if it still holds the token it got set to.
+      const token = mockRedisClient.set.mock.calls[0][1];
+      expect(mockRedisClient.eval).toHaveBeenCalledWith(expect.any(String), {
+        keys: ["lock-key:lock"],
+        arguments: [token],
+      });
+    });
+
+    it("should wait for the lock holder to cache the data", async () => {
+      const cachedData = { id: 2 };
+      mockRedisClient.get
+        .mockResolvedValueOnce(null)
+        .mockResolvedValueOnce(null)
+        .mockResolvedValueOnce(JSON.stringify(cachedData));
+      mockRedisClient.set.mockResolvedValue(null);
+      mockRedisClient.exists.mockResolvedValue(1);
+      const fetcher = jest.fn();
+
+      const result = await getCachedDataFetch(
+        "locked-key",
+        fetcher,
+        60,
+        "",
+        { lockTimeout: 10 }
+      );
+
+      expect(result).toEqual(cachedData);
+      expect(fetcher).not.toHaveBeenCalled();
+      expect(mockRedisClient.exists).toHaveBeenCalledWith("locked-key:lock");
+      expect(mockRedisClient.eval).not.toHaveBeenCalled();
+    });
+
+    it("should fetch the data if the lock holder releases the lock without caching", async () => {
+      const fetchedData = { id: 3 };
+      mockRedisClient.get.mockResolvedValue(null);
+      mockRedisClient.set.mockResolvedValueOnce(null);
+      mockRedisClient.exists.mockResolvedValue(0);
+      const fetcher = jest.fn().mockResolvedValue(fetchedData);
+
+      const result = await getCachedDataFetch(
+        "released-key",
+        fetcher,
+        60,
+        "",
+        { lockTimeout: 10 }
+      );
+
+      expect(result).toEqual(fetchedData);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "released-key",
+        JSON.stringify(fetchedData),
+        { EX: 60 }
+      );
+    });
+
+    it("should fetch the data once the lock timeout passes", async () => {
+      const fetchedData = { id: 4 };
+      mockRedisClient.get.mockResolvedValue(null);
+      mockRedisClient.set.mockResolvedValueOnce(null);
+      mockRedisClient.exists.mockResolvedValue(1);
+      const fetcher = jest.fn().mockResolvedValue(fetchedData);
+
+      const result = await getCachedDataFetch(
+        "timeout-key",
+        fetcher,
+        60,
+        "",
+        { lockTimeout: 0.2 }
+      );
+
+      expect(result).toEqual(fetchedData);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+    });
+
+    it("should leave refreshing stale data to the lock holder", async () => {
+      mockRedisClient.get.mockResolvedValue(
+        JSON.stringify({ "@freshUntil": 0, data: { id: 5 } })
+      );
+      mockRedisClient.set.mockResolvedValue(null);
+      const fetcher = jest.fn();
+
+      const result = await getCachedDataFetch("stale-key", fetcher, 60, "", {
+        lockTimeout: 10,
+        staleWhileRevalidate: 300,
+      });
+      await new Promise((resolve) => setTimeout(resolve, 0));
+
+      expect(result).toEqual({ id: 5 });
+      expect(fetcher).not.toHaveBeenCalled();
+      expect(mockRedisClient.exists).not.toHaveBeenCalled();
+    });
+  });
+
+  describe("getManyCached", () => {
+    beforeEach(() => {
+      clearMemoryCache();
+      mockRedisClient.hGet = jest.fn();
+      mockRedisClient.hSet = jest.fn();
+      mockRedisClient.expire = jest.fn();
+    });
+
+    it("should read all items in one round trip and fetch only the misses", async () => {
+      mockRedisClient.get.mockImplementation((key: string) =>
+        Promise.resolve(key === "hit-key" ? JSON.stringify({ id: 1 }) : null)
+      );
+      mockRedisClient.hGet.mockResolvedValue(JSON.stringify({ id: 3 }));
+      const hitFetcher = jest.fn();
+      const missFetcher = jest.fn().mockResolvedValue({ id: 2 });
+      const fieldFetcher = jest.fn();
+
+      const results = await getManyCached([
+        { key: "hit-key", fetcher: hitFetcher },
+        { key: "miss-key", fetcher: missFetcher, ttl: 60 },
+        { key: "hash-key", field: "field", fetcher: fieldFetcher },
+      ]);
+
+      expect(results).toEqual([{ id: 1 }, { id: 2 }, { id: 3 }]);
+      expect(mockRedisClient.multi).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.mGet).toHaveBeenCalledWith([
+        "hit-key",
+        "miss-key",
+      ]);
+      expect(mockRedisClient.hGet).toHaveBeenCalledWith("hash-key", "field");
+      expect(hitFetcher).not.toHaveBeenCalled();
+      expect(fieldFetcher).not.toHaveBeenCalled();
+      expect(missFetcher).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "miss-key",
+        JSON.stringify({ id: 2 }),
+        { EX: 60 }
+      );
+      expect(getCacheStats().redis).toEqual({ hits: 2, misses: 1 });
+    });
+
+    it("should fetch a key requested twice in a batch only once", async () => {
+      mockRedisClient.get.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue({ id: 4 });
+
+      const results = await getManyCached([
+        { key: "same-key", fetcher },
+        { key: "same-key", fetcher },
+      ]);
+
+      expect(results).toEqual([{ id: 4 }, { id: 4 }]);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+    });
+
+    it("should skip Redis for items in the memory tier", async () => {
+      mockRedisClient.get.mockResolvedValue(JSON.stringify({ id: 5 }));
+      const options = { memoryTtl: 60 };
+      await getCachedDataFetch("memory-key", jest.fn(), 3600, "", options);
+      mockRedisClient.multi.mockClear();
+
+      const results = await getManyCached([
+        { key: "memory-key", fetcher: jest.fn(), options },
+      ]);
+
+      expect(results).toEqual([{ id: 5 }]);
+      expect(mockRedisClient.multi).not.toHaveBeenCalled();
+    });
+
+    it("should fetch everything if the batch read fails", async () => {
+      mockRedisClient.mGet.mockRejectedValue(new Error("Redis failed"));
+      const fetcher = jest.fn().mockResolvedValue({ id: 6 });
+
+      const results = await getManyCached([{ key: "failed-key", fetcher }]);
+
+      expect(results).toEqual([{ id: 6 }]);
+      expect(console.error).toHaveBeenCalledWith(
+        "Cache batch retrieval error:",
+        expect.any(Error)
+      );
+    });
+
+    it("should fetch directly when Redis is unavailable", async () => {
+      mockGetCacheClient.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue({ id: 7 });
+
+      const results = await getManyCached([{ key: "no-redis-key", fetcher }]);
+
+      expect(results).toEqual([{ id: 7 }]);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+    });
+
+    it("should write hash fields and their expiration in one transaction", async () => {
+      mockRedisClient.hGet.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue({ id: 8 });
+
+      await getManyCached([{ key: "hash-key", field: "field", fetcher }]);
+
+      const transaction = mockRedisClient.multi.mock.results[1].value;
+      expect(transaction.exec).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.hSet).toHaveBeenCalledWith(
+        "hash-key",
+        "field",
+        JSON.stringify({ id: 8 })
+      );
+      expect(mockRedisClient.expire).toHaveBeenCalledWith("hash-key", 3600);
+    });
+  });
+
+  describe("Metrics", () => {
+    beforeEach(() => {
+      resetCacheMetrics();
+    });
+
+    afterEach(() => {
+      resetCacheMetrics();
+    });
+
+    it("should record misses, fetches, and written bytes by key family", async () => {
+      mockRedisClient.get.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue({ id: 1 });
+
+      await getCachedDataFetch("facet-config-user1", fetcher);
+
+      const metrics = getCacheMetrics()["facet-config"];
+      expect(metrics.misses).toBe(1);
+      expect(metrics.fetches).toBe(1);
+      expect(metrics.fetchErrors).toBe(0);
+      expect(metrics.bytesWritten).toBe(JSON.stringify({ id: 1 }).length);
+      expect(metrics.lookupMs.count).toBe(1);
+      expect(metrics.fetchMs.count).toBe(1);
+    });
+
+    it("should record hits, memory hits, and read bytes", async () => {
+      const cachedValue = JSON.stringify({ id: 1 });
+      mockRedisClient.get.mockResolvedValue(cachedValue);
+
+      await getCachedDataFetch("profiles", jest.fn(), 60, "", {
+        memoryTtl: 60,
+      });
+      await getCachedDataFetch("profiles", jest.fn(), 60, "", {
+        memoryTtl: 60,
+      });
+
+      const metrics = getCacheMetrics().profiles;
+      expect(metrics.hits).toBe(1);
+      expect(metrics.memoryHits).toBe(1);
+      expect(metrics.bytesRead).toBe(cachedValue.length);
+      expect(metrics.valueBytes.count).toBe(1);
+    });
+
+    it("should record requests waiting for the same fetch as coalesced", async () => {
+      mockRedisClient.get.mockResolvedValue(null);
+      let resolveFetch: (value: unknown) => void;
+      const fetcher = jest.fn(
+        () =>
+          new Promise((resolve) => {
+            resolveFetch = resolve;
+          })
+      );
+
+      const first = getCachedDataFetch("indexer-state", fetcher);
+      await new Promise((resolve) => setTimeout(resolve, 1));
+      const second = getCachedDataFetch("indexer-state", fetcher);
+      resolveFetch({ isIndexing: false });
+      await Promise.all([first, second]);
+
+      const metrics = getCacheMetrics()["indexer-state"];
+      expect(fetcher).toHaveBeenCalledTimes(1);
+      expect(metrics.coalesced).toBe(1);
+      expect(metrics.coalescedWaitMs.count).toBe(1);
+    });
+
+    it("should record fetch errors and Redis errors", async () => {
+      mockRedisClient.get.mockRejectedValue(new Error("Redis down"));
+
+      await getCachedDataFetch("versions", jest.fn().mockResolvedValue(null));
+
+      const metrics = getCacheMetrics().versions;
+      expect(metrics.errors).toBe(1);
+      expect(metrics.fetchErrors).toBe(1);
+    });
+
+    it("should record hash field lookups", async () => {
+      mockRedisClient.hGet = jest.fn().mockResolvedValue(null);
+
+      await getCachedDataWithField("facet-optional-user1", "Gene");
+
+      expect(getCacheMetrics()["facet-optional"].misses).toBe(1);
+    });
+  });
+
+  describe("Cache tags", () => {
+    let store: Map<string, string>;
+
+    beforeEach(() => {
+      clearMemoryCache();
+
+      // Keep values in a map so writes show up in later reads.
+      store = new Map();
+      mockRedisClient.get.mockImplementation(
+        async (key: string) => store.get(key) ?? null
+      );
+      mockRedisClient.set.mockImplementation(
+        async (key: string, value: string) => {
+          store.set(key, value);
+          return "OK";
+        }
+      );
+      mockRedisClient.incr = jest.fn(async (key: string) => {
+        const generation = Number(store.get(key) || 0) + 1;
+        store.set(key, String(generation));
+        return generation;
+      });
+      mockRedisClient.getSet = jest.fn(async (key: string, value: string) => {
+        const previousValue = store.get(key) ?? null;
+        store.set(key, value);
+        return previousValue;
+      });
+    });
+
+    it("should cache tagged data under a key with the tag generations", async () => {
+      const fetcher = jest.fn().mockResolvedValue({ id: 1 });
+
+      await getCachedDataFetch("profiles", fetcher, 60, "", {
+        tags: ["schema", "search"],
+      });
+
+      expect(mockRedisClient.mGet).toHaveBeenCalledWith([
+        "cache-tag:schema",
+        "cache-tag:search",
+      ]);
+      expect(mockRedisClient.set).toHaveBeenCalledWith(
+        "profiles#schema:0,search:0",
+        JSON.stringify({ id: 1 }),
+        { EX: 60 }
+      );
+    });
+
+    it("should fetch tagged data again after invalidating a tag", async () => {
+      const fetcher = jest
+        .fn()
+        .mockResolvedValueOnce({ version: 1 })
+        .mockResolvedValueOnce({ version: 2 });
+      const options = { memoryTtl: 60, tags: ["schema"] };
+
+      await getCachedDataFetch("profiles", fetcher, 60, "", options);
+      expect(
+        await getCachedDataFetch("profiles", fetcher, 60, "", options)
+      ).toEqual({ version: 1 });
+
+      await invalidateCacheTags(["schema"]);
+      expect(
+        await getCachedDataFetch("profiles", fetcher, 60, "", options)
+      ).toEqual({ version: 2 });
+      expect(fetcher).toHaveBeenCalledTimes(2);
+      expect(store.has("profiles#schema:1")).toBe(true);
+    });
+
+    it("should reuse tag generations read within the last few seconds", async () => {
+      const options = { tags: ["schema"] };
+      const fetcher = jest.fn().mockResolvedValue({ id: 1 });
+      await getCachedDataFetch("profiles", fetcher, 60, "", options);
+      await getCachedDataFetch("collection-titles", fetcher, 60, "", options);
+
+      expect(mockRedisClient.mGet).toHaveBeenCalledTimes(1);
+    });
+
+    it("should apply tags to getManyCached items", async () => {
+      store.set("cache-tag:schema", "4");
+      store.set("profiles#schema:4", JSON.stringify({ id: 1 }));
+
+      const [profiles] = await getManyCached<[unknown]>([
+        { key: "profiles", fetcher: jest.fn(), options: { tags: ["schema"] } },
+      ]);
+
+      expect(profiles).toEqual({ id: 1 });
+    });
+
+    it("should only invalidate tags when a source value changes", async () => {
+      expect(
+        await invalidateCacheTagsOnChange("versions", "1.0", ["schema"])
+      ).toBe(false);
+      expect(
+        await invalidateCacheTagsOnChange("versions", "1.0", ["schema"])
+      ).toBe(false);
+      expect(
+        await invalidateCacheTagsOnChange("versions", "1.1", ["schema"])
+      ).toBe(true);
+
+      expect(mockRedisClient.incr).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.incr).toHaveBeenCalledWith("cache-tag:schema");
+    });
+
+    it("should keep using the last tag generations when Redis is unavailable", async () => {
+      await invalidateCacheTags(["schema"]);
+      mockGetCacheClient.mockResolvedValue(null);
+      const fetcher = jest.fn().mockResolvedValue({ id: 1 });
+
+      await invalidateCacheTags(["schema"]);
+      expect(
+        await getCachedDataFetch("profiles", fetcher, 60, "", {
+          tags: ["schema"],
+        })
+      ).toEqual({ id: 1 });
+      expect(mockRedisClient.incr).toHaveBeenCalledTimes(1);
+    });
+  });
+
   describe("getObjectCached", () => {
     it("should fetch and cache data using FetchRequest", async () => {
       const responseData = { id: 1, name: "api-data" };
@@ -720,15 +1476,24 @@ describe("Cache System", () => {
       expect(fetcher).toHaveBeenCalledTimes(1);
     });
 
-    it("should propagate Redis get errors", async () => {
+    it("should fetch directly when Redis get fails", async () => {
       // Mock Redis.get to return a rejected promise
       mockRedisClient.get.mockRejectedValue(new Error("Redis get failed"));
       const fetchedData = { fallback: true };
       const fetcher = jest.fn().mockResolvedValue(fetchedData);
 
-      await expect(
-        getCachedDataFetch("redis-get-error-test-key", fetcher)
-      ).rejects.toThrow("Redis get failed");
+      const result = await getCachedDataFetch(
+        "redis-get-error-test-key",
+        fetcher
+      );
+
+      expect(result).toEqual(fetchedData);
+      expect(fetcher).toHaveBeenCalledTimes(1);
+      expect(mockRedisClient.set).not.toHaveBeenCalled();
+      expect(console.error).toHaveBeenCalledWith(
+        "Cache retrieval error for key redis-get-error-test-key:",
+        expect.any(Error)
+      );
     });
 
     it("should handle Redis set errors during caching", async () => {
@@ -778,12 +1543,22 @@ describe("Cache System", () => {
 
       const result = await getCachedDataFetch("large-data-key", fetcher);
 
+      // Large values get stored compressed.
       expect(result).toEqual(largeData);
       expect(mockRedisClient.set).toHaveBeenCalledWith(
         "large-data-key",
-        JSON.stringify(largeData),
+        expect.stringMatching(/^@1:json:gzip:/),
         { EX: 3600 }
       );
+      const storedValue = mockRedisClient.set.mock.calls[0][1];
+      expect(storedValue.length).toBeLessThan(
+        JSON.stringify(largeData).length / 4
+      );
+
+      // The compressed value decodes to the same data.
+      mockRedisClient.get.mockResolvedValue(storedValue);
+      const cachedResult = await getCachedData("large-data-key");
+      expect(cachedResult).toEqual(largeData);
     });
   });
 
@@ -31,16 +31,29 @@ jest.mock("node:http", () => ({
   })),
 }));
 
+// POST searches stay off like in the default runtime config, except in tests that turn them on.
+let mockBulkSearchPostEnabled = false;
+jest.mock("../constants", () => ({
+  ...jest.requireActual("../constants"),
+  get BULK_SEARCH_POST_ENABLED() {
+    return mockBulkSearchPostEnabled;
+  },
+}));
+
 import _ from "lodash";
 import pako from "pako";
 import FetchRequest, {
   HTTP_STATUS_CODE,
+  createConcurrencyLimiter,
   isErrorObject,
   isHttpMethod,
   logRequest,
 } from "../fetch-request";
 import { DataProviderObject } from "../../globals";
-import type { ErrorObject } from "../fetch-request";
+import type {
+  ErrorObject,
+  MultipleObjectsTiming,
+} from "../fetch-request";
 
 declare const global: { window?: Window };
 
@@ -930,6 +943,138 @@ describe("PATCH fetch requests", () => {
   });
 });
 
+describe("Test createConcurrencyLimiter()", () => {
+  it("runs at most the limit of tasks at once in submission order", async () => {
+    const limit = createConcurrencyLimiter(2);
+    const started: number[] = [];
+    let active = 0;
+    let maxActive = 0;
+
+    const results = await Promise.all(
+      [1, 2, 3, 4, 5].map((n) =>
+        limit(async () => {
+          started.push(n);
+          active += 1;
+          maxActive = Math.max(maxActive, active);
+          await new Promise((resolve) => setTimeout(resolve, 5));
+          active -= 1;
+          return n * 10;
+        })
+      )
+    );
+
+    expect(results).toEqual([10, 20, 30, 40, 50]);
+    expect(started).toEqual([1, 2, 3, 4, 5]);
+    expect(maxActive).toBe(2);
+  });
+
+  it("frees a slot when a task fails", async () => {
+    const limit = createConcurrencyLimiter(1);
+    const failed = limit(() => Promise.reject(new Error("failed")));
+    const succeeded = limit(() => Promise.resolve("done"));
+
+    await expect(failed).rejects.toThrow("failed");
+    await expect(succeeded).resolves.toBe("done");
+  });
+});
+
+describe("Test getMultipleObjects() concurrency", () => {
+  let active: number;
+  let maxActive: number;
+
+  beforeEach(() => {
+    active = 0;
+    maxActive = 0;
+    window.fetch = jest.fn().mockImplementation(async (url: string) => {
+      active += 1;
+      maxActive = Math.max(maxActive, active);
+      await new Promise((resolve) => setTimeout(resolve, 1));
+      active -= 1;
+      const ok = !url.includes("unknown");
+      return {
+        ok,
+        json: () =>
+          Promise.resolve(
+            ok ? { "@id": url } : { "@type": ["HTTPNotFound", "Error"] }
+          ),
+      };
+    });
+  });
+
+  it("limits the requests in flight and keeps the results in order", async () => {
+    const paths = Array.from({ length: 25 }, (_, i) => `/labs/lab-${i}/`);
+    const request = new FetchRequest({ session: { _csrft_: "mocktoken" } });
+
+    const results = await request.getMultipleObjects<DataProviderObject>(
+      paths,
+      { concurrency: 3 }
+    );
+
+    expect(maxActive).toBe(3);
+    expect(results.map((result) => result.unwrap()["@id"])).toEqual(paths);
+  });
+
+  it("limits the requests in flight to the connection pool size by default", async () => {
+    const paths = Array.from({ length: 25 }, (_, i) => `/labs/lab-${i}/`);
+    const request = new FetchRequest({ session: { _csrft_: "mocktoken" } });
+
+    await request.getMultipleObjects(paths);
+
+    expect(maxActive).toBe(10);
+  });
+
+  it("requests repeated and cached paths once and retries failed ones", async () => {
+    const request = new FetchRequest({ session: { _csrft_: "mocktoken" } });
+    const cache = new Map();
+
+    const results = await request.getMultipleObjects<DataProviderObject>(
+      ["/labs/lab-1/", "/labs/unknown/", "/labs/lab-1/"],
+      { cache }
+    );
+    expect(results).toHaveLength(3);
+    expect(results[2].unwrap()).toEqual(results[0].unwrap());
+    expect(window.fetch).toHaveBeenCalledTimes(2);
+    expect([...cache.keys()]).toEqual(["/labs/lab-1/"]);
+
+    await request.getMultipleObjects(["/labs/lab-1/", "/labs/unknown/"], {
+      cache,
+    });
+    expect(window.fetch).toHaveBeenCalledTimes(3);
+  });
+
+  it("reports the timing of each request", async () => {
+    const request = new FetchRequest({ session: { _csrft_: "mocktoken" } });
+    const cache = new Map();
+    await request.getMultipleObjects(["/labs/lab-1/"], { cache });
+    let timing: MultipleObjectsTiming;
+
+    await request.getMultipleObjects(["/labs/lab-1/", "/labs/unknown/"], {
+      cache,
+      concurrency: 1,
+      onTiming: (requestTiming) => {
+        timing = requestTiming;
+      },
+    });
+
+    expect(timing.concurrency).toBe(1);
+    expect(timing.totalMs).toBeGreaterThanOrEqual(0);
+    expect(timing.requests).toEqual([
+      {
+        path: "/labs/lab-1/",
+        durationMs: 0,
+        queuedMs: 0,
+        ok: true,
+        cached: true,
+      },
+      expect.objectContaining({
+        path: "/labs/unknown/",
+        ok: false,
+        cached: false,
+      }),
+    ]);
+  });
+});
+
 describe("Test getMultipleObjectsBulk()", () => {
   it("retrieves a small number of items from the server correctly", async () => {
     const mockData = {
@@ -1044,6 +1189,7 @@ describe("Test getMultipleObjectsBulk()", () => {
     const labItems = await request.getMultipleObjectsBulk(paths, ["name"]);
     expect(labItems.isOk()).toBeTruthy();
     expect(labItems.unwrap()).toHaveLength(100);
+    expect(requestNumber).toBe(2);
   });
 
   it("retrieves no items from an empty array", async () => {
@@ -1781,6 +1927,203 @@ describe("Test getMultipleObjectsBySearch()", () => {
   });
 });
 
+describe("Test bulk searches too long for a URL", () => {
+  const paths = Array.from(
+    { length: 2500 },
+    (_, i) => `/files/IGVFFI${String(i).padStart(4, "0")}AAAA/`
+  );
+  const values = Array.from({ length: 300 }, (_, i) => `term value ${i}`);
+
+  /**
+   * Mock data provider that answers GET searches from their query strings and POST searches from
+   * their JSON bodies, optionally rejecting POST searches with the given status code.
+   */
+  function mockDataProvider(postStatus = HTTP_STATUS_CODE.OK) {
+    return jest.fn().mockImplementation((url: string, options) => {
+      if (options.method === "POST") {
+        const body = JSON.parse(options.body);
+        return Promise.resolve({
+          ok: postStatus === HTTP_STATUS_CODE.OK,
+          status: postStatus,
+          json: () =>
+            Promise.resolve({
+              "@graph": (body["@id"] || body.term_name).map((id: string) => ({
+                "@id": id,
+              })),
+            }),
+        });
+      }
+      const query = new URLSearchParams(url.split("?")[1]);
+      const ids = query.has("@id")
+        ? query.getAll("@id")
+        : query.getAll("term_name");
+      return Promise.resolve({
+        ok: true,
+        status: HTTP_STATUS_CODE.OK,
+        json: () =>
+          Promise.resolve({ "@graph": ids.map((id) => ({ "@id": id })) }),
+      });
+    });
+  }
+
+  // Start each test a day after the last one so that earlier rejected POST searches have expired.
+  let now = Date.now();
+  beforeEach(() => {
+    mockBulkSearchPostEnabled = true;
+    now += 24 * 60 * 60 * 1000;
+    jest.spyOn(Date, "now").mockReturnValue(now);
+  });
+
+  afterEach(() => {
+    mockBulkSearchPostEnabled = false;
+    jest.restoreAllMocks();
+  });
+
+  it("sends only GET searches unless POST searches are enabled", async () => {
+    mockBulkSearchPostEnabled = false;
+    window.fetch = mockDataProvider();
+
+    const request = new FetchRequest();
+    const files = await request.getMultipleObjectsBulk<{ "@id": string }>(
+      paths,
+      ["accession"]
+    );
+    expect(files.unwrap()).toHaveLength(2500);
+    const terms = await request.getMultipleObjectsBySearch<{ "@id": string }>(
+      "AssayTerm",
+      ["term_name"],
+      { property: "term_name", values }
+    );
+    expect(terms.unwrap()).toHaveLength(300);
+
+    (window.fetch as jest.Mock).mock.calls.forEach(([, options]) => {
+      expect(options.method).toBe("GET");
+    });
+  });
+
+  it("sends paths in POST request bodies of up to 1000 paths", async () => {
+    window.fetch = mockDataProvider();
+
+    const request = new FetchRequest();
+    const files = await request.getMultipleObjectsBulk<{ "@id": string }>(
+      paths,
+      ["accession"],
+      ["File"]
+    );
+    expect(files.isOk()).toBeTruthy();
+    expect(files.unwrap().map((file) => file["@id"])).toEqual(paths);
+
+    const fetchMock = window.fetch as jest.Mock;
+    expect(fetchMock).toHaveBeenCalledTimes(3);
+    const [url, options] = fetchMock.mock.calls[0];
+    expect(url).toContain("/search-quick/");
+    expect(url).not.toContain("?");
+    expect(options.method).toBe("POST");
+    expect(JSON.parse(options.body)).toEqual({
+      type: ["File"],
+      field: ["accession"],
+      "@id": paths.slice(0, 1000),
+      limit: 1000,
+    });
+    expect(JSON.parse(fetchMock.mock.calls[2][1].body).limit).toBe(500);
+  });
+
+  it("falls back to grouped GET requests when a POST search fails", async () => {
+    window.fetch = mockDataProvider(HTTP_STATUS_CODE.INTERNAL_SERVER_ERROR);
+
+    const request = new FetchRequest();
+    const files = await request.getMultipleObjectsBulk<{ "@id": string }>(
+      paths,
+      ["accession"]
+    );
+    expect(files.isOk()).toBeTruthy();
+    expect(files.unwrap().map((file) => file["@id"])).toEqual(paths);
+
+    const calls = (window.fetch as jest.Mock).mock.calls;
+    const getCalls = calls.filter(([, options]) => options.method === "GET");
+    expect(calls.length - getCalls.length).toBe(3);
+    expect(getCalls.length).toBeGreaterThan(3);
+    getCalls.forEach(([url]) => {
+      const path = url.slice(url.indexOf("/search-quick/"));
+      expect(path.length).toBeLessThanOrEqual(4000);
+    });
+  });
+
+  it.each([
+    HTTP_STATUS_CODE.BAD_REQUEST,
+    HTTP_STATUS_CODE.METHOD_NOT_ALLOWED,
+    HTTP_STATUS_CODE.NOT_IMPLEMENTED,
+  ])("skips POST searches after a %d response", async (status) => {
+    window.fetch = mockDataProvider(status);
+
+    const request = new FetchRequest();
+    await request.getMultipleObjectsBulk(paths, ["accession"]);
+    const postCount = () =>
+      (window.fetch as jest.Mock).mock.calls.filter(
+        ([, options]) => options.method === "POST"
+      ).length;
+    const rejectedPostCount = postCount();
+    expect(rejectedPostCount).toBeGreaterThan(0);
+
+    // Once rejected, the next requests go straight to GET searches.
+    const files = await request.getMultipleObjectsBulk(paths, ["accession"]);
+    expect(files.unwrap()).toHaveLength(2500);
+    expect(postCount()).toBe(rejectedPostCount);
+  });
+
+  it("sends a property search too long for a URL as a POST request", async () => {
+    window.fetch = mockDataProvider();
+
+    const request = new FetchRequest();
+    const terms = await request.getMultipleObjectsBySearch<{ "@id": string }>(
+      "AssayTerm",
+      ["term_name"],
+      { property: "term_name", values }
+    );
+    expect(terms.unwrap()).toHaveLength(300);
+
+    const fetchMock = window.fetch as jest.Mock;
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(JSON.parse(fetchMock.mock.calls[0][1].body)).toEqual({
+      type: ["AssayTerm"],
+      field: ["term_name"],
+      term_name: values,
+    });
+  });
+
+  it("splits the values of a property search among GET requests when POST fails", async () => {
+    window.fetch = mockDataProvider(HTTP_STATUS_CODE.NOT_FOUND);
+
+    const request = new FetchRequest();
+    const terms = await request.getMultipleObjectsBySearch<{ "@id": string }>(
+      "AssayTerm",
+      ["term_name"],
+      { property: "term_name", values }
+    );
+    expect(terms.unwrap().map((term) => term["@id"])).toEqual(values);
+
+    const getCalls = (window.fetch as jest.Mock).mock.calls.filter(
+      ([, options]) => options.method === "GET"
+    );
+    expect(getCalls.length).toBeGreaterThan(1);
+    getCalls.forEach(([url]) => {
+      const path = url.slice(url.indexOf("/search-quick/"));
+      expect(path.length).toBeLessThanOrEqual(4000);
+    });
+  });
+
+  it("throws error when a query string too long for a URL can't use POST", async () => {
+    window.fetch = mockDataProvider(HTTP_STATUS_CODE.METHOD_NOT_ALLOWED);
+
+    const request = new FetchRequest();
+    await expect(
+      request.getMultipleObjectsBySearch("AssayTerm", ["term_name"], {
+        query: `term_name=${"a".repeat(4000)}`,
+      })
+    ).rejects.toThrow("Search query URI exceeds maximum length");
+  });
+});
+
 describe("logRequest", () => {
   let consoleSpy: jest.SpyInstance;
 
@@ -0,0 +1,84 @@
+import { MemoryCache } from "../memory-cache";
+
+describe("MemoryCache", () => {
+  let now: number;
+  let cache: MemoryCache;
+
+  beforeEach(() => {
+    now = 0;
+    cache = new MemoryCache(3, 100, () => now);
+  });
+
+  it("should return cached values until they expire", () => {
+    const value = { id: 1 };
+    cache.set("key", value, 10, 5);
+
+    now = 4999;
+    expect(cache.get("key")).toBe(value);
+
+    now = 5000;
+    expect(cache.get("key")).toBeUndefined();
+    expect(cache.size).toBe(0);
+    expect(cache.bytes).toBe(0);
+  });
+
+  it("should count hits and misses", () => {
+    cache.set("key", "value", 10, 5);
+    cache.get("key");
+    cache.get("key");
+    cache.get("missing");
+
+    expect(cache.getStats()).toEqual({ hits: 2, misses: 1 });
+
+    cache.clear();
+    expect(cache.getStats()).toEqual({ hits: 0, misses: 0 });
+  });
+
+  it("should evict the least recently used entry when full", () => {
+    cache.set("a", "a", 10, 60);
+    cache.set("b", "b", 10, 60);
+    cache.set("c", "c", 10, 60);
+
+    // Reading "a" makes "b" the least recently used entry.
+    cache.get("a");
+    cache.set("d", "d", 10, 60);
+
+    expect(cache.get("b")).toBeUndefined();
+    expect(cache.get("a")).toBe("a");
+    expect(cache.get("c")).toBe("c");
+    expect(cache.get("d")).toBe("d");
+    expect(cache.size).toBe(3);
+  });
+
+  it("should evict entries to stay within the byte limit", () => {
+    cache.set("a", "a", 40, 60);
+    cache.set("b", "b", 40, 60);
+    cache.set("c", "c", 40, 60);
+
+    expect(cache.get("a")).toBeUndefined();
+    expect(cache.size).toBe(2);
+    expect(cache.bytes).toBe(80);
+  });
+
+  it("should not cache values larger than the cache or with no TTL", () => {
+    cache.set("big", "big", 101, 60);
+    cache.set("no-ttl", "no-ttl", 10, 0);
+
+    expect(cache.get("big")).toBeUndefined();
+    expect(cache.get("no-ttl")).toBeUndefined();
+    expect(cache.size).toBe(0);
+  });
+
+  it("should replace and delete entries", () => {
+    cache.set("key", "old", 30, 60);
+    cache.set("key", "new", 20, 60);
+
+    expect(cache.get("key")).toBe("new");
+    expect(cache.bytes).toBe(20);
+
+    cache.delete("key");
+    cache.delete("missing");
+    expect(cache.get("key")).toBeUndefined();
+    expect(cache.bytes).toBe(0);
+  });
+});
@@ -0,0 +1,82 @@
+jest.mock("../cache");
+jest.mock("../constants", () => ({
+  UI_VERSION: "1.0.0",
+}));
+jest.mock("../fetch-request");
+
+import { getCachedDataFetch, invalidateCacheTagsOnChange } from "../cache";
+import {
+  DATA_PROVIDER_VERSION_TAG,
+  INDEXED_DATA_TAG,
+  checkDataProvider,
+} from "../server-objects";
+
+const mockGetCachedDataFetch = getCachedDataFetch as jest.MockedFunction<
+  typeof getCachedDataFetch
+>;
+const mockInvalidateCacheTagsOnChange =
+  invalidateCacheTagsOnChange as jest.MockedFunction<
+    typeof invalidateCacheTagsOnChange
+  >;
+
+/**
+ * Make the cache return the given indexer state and versions info.
+ */
+function mockCachedData(indexerState: unknown, versionsInfo: unknown) {
+  mockGetCachedDataFetch.mockImplementation(async (key: string) => {
+    if (key === "indexer-state") {
+      return indexerState;
+    }
+    return key === "versions" ? versionsInfo : null;
+  });
+}
+
+describe("checkDataProvider", () => {
+  it("should report the indexer state and data provider version", async () => {
+    mockCachedData(
+      { isIndexing: true, indexingCount: 20 },
+      { uiVersion: "1.0.0", serverVersion: "v100.0.0" }
+    );
+
+    await checkDataProvider();
+
+    expect(mockGetCachedDataFetch).toHaveBeenCalledWith(
+      "indexer-state",
+      expect.any(Function),
+      60
+    );
+    expect(mockInvalidateCacheTagsOnChange).toHaveBeenCalledWith(
+      "indexer-state",
+      "indexing",
+      []
+    );
+    expect(mockInvalidateCacheTagsOnChange).toHaveBeenCalledWith(
+      "versions",
+      "v100.0.0",
+      [DATA_PROVIDER_VERSION_TAG, INDEXED_DATA_TAG]
+    );
+  });
+
+  it("should invalidate indexed data only once indexing finishes", async () => {
+    mockCachedData(
+      { isIndexing: false, indexingCount: 0 },
+      { uiVersion: "1.0.0", serverVersion: "v100.0.0" }
+    );
+
+    await checkDataProvider();
+
+    expect(mockInvalidateCacheTagsOnChange).toHaveBeenCalledWith(
+      "indexer-state",
+      "idle",
+      [INDEXED_DATA_TAG]
+    );
+  });
+
+  it("should skip unavailable or unknown values", async () => {
+    mockCachedData(null, { uiVersion: "1.0.0", serverVersion: "unknown" });
+
+    await checkDataProvider();
+
+    expect(mockInvalidateCacheTagsOnChange).not.toHaveBeenCalled();
+  });
+});
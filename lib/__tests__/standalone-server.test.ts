@@ -0,0 +1,66 @@
+/**
+ * @jest-environment node
+ */
+
+// `docker/nextjs/start.js` starts the production server through the private Next.js
+// `startServer()` API the same way the generated standalone `server.js` does. These tests compare
+// it against the `server.js` template in the installed Next.js so an upgrade that changes that API
+// fails here instead of in a deployed container. Jest ignores the `docker` directory, so these
+// live with the other tests.
+
+// node_modules
+import { readFileSync } from "fs";
+import path from "path";
+
+/**
+ * Get the names of the options passed in the first `startServer({ ... })` call in some source.
+ *
+ * @param source - JavaScript source calling `startServer()`
+ * @returns Sorted option names
+ */
+function getStartServerOptions(source: string): string[] {
+  const call = source.match(/startServer\(\{([^}]*)\}\)/);
+  if (!call) {
+    throw new Error("No startServer() call found");
+  }
+  return call[1]
+    .split(",")
+    .map((option) => option.split(":")[0].trim())
+    .filter((option) => option)
+    .sort();
+}
+
+describe("Test the production server start script", () => {
+  const startScript = readFileSync(
+    path.join(__dirname, "../../docker/nextjs/start.js"),
+    "utf8"
+  );
+
+  // Next.js writes the standalone `server.js` from a template in its build utilities.
+  const serverTemplate = readFileSync(
+    require.resolve("next/dist/build/utils"),
+    "utf8"
+  );
+
+  it("requires the start-server module the generated server.js requires", () => {
+    expect(serverTemplate).toMatch(
+      /require\(["']next\/dist\/server\/lib\/start-server["']\)/
+    );
+    const startServerSource = readFileSync(
+      require.resolve("next/dist/server/lib/start-server"),
+      "utf8"
+    );
+    expect(startServerSource).toMatch(/function startServer\(/);
+  });
+
+  it("sets the standalone config variable the generated server.js sets", () => {
+    expect(serverTemplate).toContain("__NEXT_PRIVATE_STANDALONE_CONFIG");
+    expect(startScript).toContain("__NEXT_PRIVATE_STANDALONE_CONFIG");
+  });
+
+  it("passes the same startServer() options as the generated server.js", () => {
+    expect(getStartServerOptions(startScript)).toEqual(
+      getStartServerOptions(serverTemplate)
+    );
+  });
+});
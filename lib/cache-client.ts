@@ -1,33 +1,375 @@
-/* istanbul ignore file */
-
 // node_modules
 import { createClient, type RedisClientType } from "redis";
 // lib
 import { CACHE_URL } from "./constants";
 
 /**
- * Redis client singleton.
+ * Milliseconds to wait for the first connection to Redis before requests go on without the cache.
+ * Later requests never wait for a connection; they skip the cache while the client reconnects in
+ * the background.
+ */
+const CONNECT_TIMEOUT = 1000;
+
+/**
+ * Milliseconds a Redis command can take before it fails and counts against the circuit breaker.
+ */
+const COMMAND_TIMEOUT = 500;
+
+/**
+ * First and maximum delay in milliseconds between attempts to reconnect to Redis. The delay
+ * doubles after each failed attempt.
+ */
+const RECONNECT_BASE_DELAY = 100;
+const RECONNECT_MAX_DELAY = 10_000;
+
+/**
+ * Number of consecutive connection or command failures that open the circuit breaker.
+ */
+const CIRCUIT_FAILURE_THRESHOLD = 3;
+
+/**
+ * Milliseconds the circuit breaker stays open, skipping Redis entirely, before letting requests
+ * try Redis again.
+ */
+const CIRCUIT_COOL_DOWN = 30_000;
+
+/**
+ * Milliseconds a half-open circuit waits for its probe request to report a result before letting
+ * another request probe Redis, in case the probe never sent a command.
+ */
+const CIRCUIT_PROBE_TIMEOUT = 2 * COMMAND_TIMEOUT;
+
+/**
+ * State of the circuit breaker protecting Redis.
+ * - `closed`: Requests use Redis
+ * - `open`: Requests skip Redis until the cool-down period ends
+ * - `half-open`: Cool-down ended; one probe request uses Redis while the others skip it, and the
+ *   probe's result closes or reopens the circuit
+ */
+export type CircuitState = "closed" | "open" | "half-open";
+
+/**
+ * Health of the Redis connection, for monitoring.
+ *
+ * @property connected - True if the client has a connection to Redis ready for commands
+ * @property circuit - State of the circuit breaker
+ * @property consecutiveFailures - Connection and command failures since the last success
+ * @property reconnectAttempts - Attempts to reconnect since the connection was last ready
+ * @property openUntil - Time in milliseconds when the open circuit lets requests try Redis again;
+ *   null unless open
+ * @property lastError - Message of the most recent failure; null if none yet
+ */
+export type CacheHealth = {
+  connected: boolean;
+  circuit: CircuitState;
+  consecutiveFailures: number;
+  reconnectAttempts: number;
+  openUntil: number | null;
+  lastError: string | null;
+};
+
+/**
+ * Counts consecutive failures and opens after too many, so that callers stop waiting on a service
+ * that's down. After a cool-down period it lets a single probe request through while the others
+ * keep skipping the service, then closes on the probe's success, or reopens on its failure. That
+ * way a service still down after the cool-down costs one timeout instead of one per concurrent
+ * request. Exported for Jest testing.
+ */
+export class CacheCircuitBreaker {
+  readonly failureThreshold: number;
+  readonly coolDown: number;
+  readonly probeTimeout: number;
+  private readonly now: () => number;
+  private failures = 0;
+  private openedAt: number | null = null;
+  private probeStartedAt: number | null = null;
+  private lastErrorMessage: string | null = null;
+
+  /**
+   * @param [failureThreshold] - Consecutive failures that open the circuit
+   * @param [coolDown] - Milliseconds the circuit stays open
+   * @param [now] - Returns the current time in milliseconds; replace for testing
+   * @param [probeTimeout] - Milliseconds before a half-open circuit lets another request probe
+   */
+  constructor(
+    failureThreshold: number = CIRCUIT_FAILURE_THRESHOLD,
+    coolDown: number = CIRCUIT_COOL_DOWN,
+    now: () => number = () => Date.now(),
+    probeTimeout: number = CIRCUIT_PROBE_TIMEOUT
+  ) {
+    this.failureThreshold = failureThreshold;
+    this.coolDown = coolDown;
+    this.now = now;
+    this.probeTimeout = probeTimeout;
+  }
+
+  /**
+   * Current state of the circuit.
+   */
+  get state(): CircuitState {
+    if (this.openedAt === null) {
+      return "closed";
+    }
+    return this.now() < this.openedAt + this.coolDown ? "open" : "half-open";
+  }
+
+  /**
+   * Consecutive failures since the last success.
+   */
+  get consecutiveFailures(): number {
+    return this.failures;
+  }
+
+  /**
+   * Time in milliseconds when the open circuit turns half-open; null unless open.
+   */
+  get openUntil(): number | null {
+    return this.state === "open" ? this.openedAt + this.coolDown : null;
+  }
+
+  /**
+   * Message of the most recent failure; null if none yet.
+   */
+  get lastError(): string | null {
+    return this.lastErrorMessage;
+  }
+
+  /**
+   * Check whether a request can use the service now. A closed circuit lets every request through
+   * and an open one none. A half-open circuit lets the first request through as its probe, and
+   * turns away the rest until the probe records a result, or until `probeTimeout` milliseconds
+   * pass without one.
+   *
+   * @returns True if the request can use the service
+   */
+  allowRequest(): boolean {
+    const state = this.state;
+    if (state !== "half-open") {
+      return state === "closed";
+    }
+    const now = this.now();
+    if (
+      this.probeStartedAt !== null &&
+      now < this.probeStartedAt + this.probeTimeout
+    ) {
+      return false;
+    }
+    this.probeStartedAt = now;
+    return true;
+  }
+
+  /**
+   * Record a success, closing the circuit.
+   */
+  recordSuccess(): void {
+    this.failures = 0;
+    this.openedAt = null;
+    this.probeStartedAt = null;
+  }
+
+  /**
+   * Record a failure. Opens the circuit once failures reach the threshold, and reopens a
+   * half-open circuit right away.
+   *
+   * @param error - Error that caused the failure
+   */
+  recordFailure(error: unknown): void {
+    this.lastErrorMessage =
+      error instanceof Error ? error.message : String(error);
+    this.failures += 1;
+    this.probeStartedAt = null;
+    if (this.failures >= this.failureThreshold || this.openedAt !== null) {
+      this.openedAt = this.now();
+    }
+  }
+}
+
+/**
+ * Get the delay before the next attempt to reconnect to Redis: exponential backoff with jitter so
+ * that all the server processes don't reconnect at once. Exported for Jest testing.
+ *
+ * @param retries - Number of reconnect attempts so far
+ * @returns Milliseconds to wait before the next attempt
+ */
+export function getReconnectDelay(retries: number): number {
+  const delay = Math.min(
+    RECONNECT_BASE_DELAY * 2 ** retries,
+    RECONNECT_MAX_DELAY
+  );
+  return Math.round(delay / 2 + (Math.random() * delay) / 2);
+}
+
+/**
+ * Wrap the Redis client so that every command that returns a promise fails after
+ * `COMMAND_TIMEOUT` milliseconds, and reports its success or failure to the circuit breaker.
+ * Transactions and pipelines from `multi()` get the same treatment for their `exec()`. Exported
+ * for Jest testing.
+ *
+ * @param client - Redis client or transaction to wrap
+ * @param breaker - Circuit breaker to report to
+ * @param [timeout] - Milliseconds before commands fail
+ * @returns Wrapped client
+ */
+export function withCommandTimeouts<T extends object>(
+  client: T,
+  breaker: CacheCircuitBreaker,
+  timeout: number = COMMAND_TIMEOUT
+): T {
+  const wrapped = new Proxy(client, {
+    get(target, property) {
+      const value = Reflect.get(target, property, target);
+      if (typeof value !== "function") {
+        return value;
+      }
+
+      return (...args: unknown[]) => {
+        const result = value.apply(target, args);
+
+        // Chained commands of transactions return the transaction itself.
+        if (result === target) {
+          return wrapped;
+        }
+        if (property === "multi") {
+          return withCommandTimeouts(result, breaker, timeout);
+        }
+        if (typeof result?.then !== "function") {
+          return result;
+        }
+
+        let timer: ReturnType<typeof setTimeout>;
+        const timeoutPromise = new Promise<never>((_, reject) => {
+          timer = setTimeout(() => {
+            const command = String(property);
+            reject(new Error(`Redis ${command} timed out after ${timeout} ms`));
+          }, timeout);
+        });
+        return Promise.race([result, timeoutPromise]).then(
+          (reply) => {
+            clearTimeout(timer);
+            breaker.recordSuccess();
+            return reply;
+          },
+          (error) => {
+            clearTimeout(timer);
+            breaker.recordFailure(error);
+            throw error;
+          }
+        );
+      };
+    },
+  });
+  return wrapped;
+}
+
+/**
+ * Circuit breaker for all Redis use in this process.
+ */
+const breaker = new CacheCircuitBreaker();
+
+/**
+ * Redis client singleton, and the same client with command timeouts that callers get.
  */
 let redisClient: RedisClientType | null = null;
+let guardedClient: RedisClientType | null = null;
+
+/**
+ * Time in milliseconds until which requests wait for the first connection to Redis, and the
+ * promise of that connection.
+ */
+let firstConnectDeadline = 0;
+let firstConnect: Promise<unknown> | null = null;
 
 /**
- * Try to get the cache client, or create it if it doesn't exist. Return null if something bad
- * happens. Exported for Jest testing, but not expected to be called from outside this module.
+ * Reconnect attempts since the connection was last ready.
+ */
+let reconnectAttempts = 0;
+
+/**
+ * Create the Redis client and start connecting in the background. The client reconnects by itself
+ * with exponential backoff whenever it loses its connection, and fails commands right away instead
+ * of queuing them while disconnected.
+ */
+function startClient(): void {
+  redisClient = createClient({
+    url: CACHE_URL,
+    disableOfflineQueue: true,
+    socket: {
+      connectTimeout: CONNECT_TIMEOUT,
+      reconnectStrategy: (retries) => getReconnectDelay(retries),
+    },
+  }) as RedisClientType;
+  guardedClient = withCommandTimeouts(redisClient, breaker);
+
+  redisClient.on("error", (err) => {
+    console.error("Redis client error", err);
+    breaker.recordFailure(err);
+  });
+  redisClient.on("reconnecting", () => {
+    reconnectAttempts += 1;
+  });
+  redisClient.on("ready", () => {
+    reconnectAttempts = 0;
+    breaker.recordSuccess();
+  });
+
+  firstConnectDeadline = Date.now() + CONNECT_TIMEOUT;
+  firstConnect = redisClient.connect().catch((error) => {
+    console.error("Redis connection failed:", error);
+    breaker.recordFailure(error);
+  });
+}
+
+/**
+ * Get the cache client, creating it on the first call. Returns null without waiting whenever
+ * Redis can't take commands: while the circuit breaker is open, while a half-open circuit waits
+ * on another request's probe, or while the client reconnects.
+ * Only requests during the first connection attempt wait for it, for up to `CONNECT_TIMEOUT`
+ * milliseconds. Exported for Jest testing, but not expected to be called from outside
+ * `lib/cache.ts`.
  *
  * @returns Redis client or null
  */
 export async function getCacheClient(): Promise<RedisClientType | null> {
+  if (!breaker.allowRequest()) {
+    return null;
+  }
   if (redisClient === null) {
     try {
-      redisClient = createClient({ url: CACHE_URL });
-      redisClient.on("error", (err) =>
-        console.error("Redis client error", err)
-      );
-      await redisClient.connect();
+      startClient();
     } catch (error) {
       console.error("Redis connection failed:", error);
+      breaker.recordFailure(error);
       redisClient = null;
+      return null;
     }
   }
-  return redisClient;
+
+  const wait = firstConnectDeadline - Date.now();
+  if (!redisClient.isReady && wait > 0) {
+    let timer: ReturnType<typeof setTimeout>;
+    await Promise.race([
+      firstConnect,
+      new Promise((resolve) => {
+        timer = setTimeout(resolve, wait);
+      }),
+    ]);
+    clearTimeout(timer);
+  }
+  return redisClient.isReady ? guardedClient : null;
+}
+
+/**
+ * Get the health of the Redis connection, e.g. for a monitoring endpoint.
+ *
+ * @returns Connection and circuit breaker state
+ */
+export function getCacheHealth(): CacheHealth {
+  return {
+    connected: Boolean(redisClient?.isReady),
+    circuit: breaker.state,
+    consecutiveFailures: breaker.consecutiveFailures,
+    reconnectAttempts,
+    openUntil: breaker.openUntil,
+    lastError: breaker.lastError,
+  };
 }
@@ -0,0 +1,273 @@
+/**
+ * Encodes values for the Redis cache. Small values get stored as plain JSON, exactly as before this
+ * module existed. Values whose serialized form reaches a size threshold get compressed and stored
+ * as base64 after a header naming the encoding version, serializer, and compressor:
+ *
+ *   @1:json:gzip:H4sIAAAAAAAAA6tWKkktLlGyUlAqS8wpTgUAx1SsjhIAAAA=
+ *
+ * JSON can't start with "@", so values without a header always decode as plain JSON. That lets
+ * entries cached before compression, or below the threshold, decode the same way as new ones.
+ *
+ * Serializers and compressors are pluggable through `registerCacheSerializer()` and
+ * `registerCacheCompressor()`, and `configureCacheCodec()` picks which ones new values use.
+ * Entries keep decoding with the serializer and compressor named in their header, so changing the
+ * configuration doesn't invalidate the cache.
+ *
+ * Use this code only on the Next.js server. Documentation in lib/docs/cache.md.
+ */
+
+// node_modules
+import { promisify } from "util";
+import * as v8 from "v8";
+import * as zlib from "zlib";
+
+/**
+ * Version of the header format. Bump this if the header or payload layout changes, and keep
+ * decoding the older versions.
+ */
+export const CACHE_CODEC_VERSION = 1;
+
+/**
+ * Default size of the serialized value in bytes at which values get compressed. Smaller values
+ * don't compress enough to pay for the CPU time and the base64 overhead.
+ */
+export const DEFAULT_COMPRESSION_THRESHOLD = 16 * 1024;
+
+/**
+ * Matches the header of an encoded value, capturing the version, serializer, and compressor.
+ */
+const HEADER_REGEX = /^@(\d+):([a-z0-9]+):([a-z0-9]*):/;
+
+/**
+ * Converts cached data to bytes and back.
+ *
+ * @property name - Name of the serializer in the header; lowercase letters and digits
+ * @property serialize - Converts data to bytes
+ * @property deserialize - Converts bytes from `serialize()` back to data
+ */
+export type CacheSerializer = {
+  name: string;
+  serialize: (data: unknown) => Buffer;
+  deserialize: (payload: Buffer) => unknown;
+};
+
+/**
+ * Compresses serialized data and decompresses it again.
+ *
+ * @property name - Name of the compressor in the header; lowercase letters and digits
+ * @property compress - Compresses bytes
+ * @property decompress - Decompresses bytes from `compress()`
+ */
+export type CacheCompressor = {
+  name: string;
+  compress: (payload: Buffer) => Promise<Buffer>;
+  decompress: (payload: Buffer) => Promise<Buffer>;
+};
+
+/**
+ * Selects how new values get encoded.
+ *
+ * @property [serializer] - Name of a registered serializer. Values get stored as plain JSON below
+ *   the threshold only with the "json" serializer
+ * @property [compressor] - Name of a registered compressor; empty to never compress
+ * @property [threshold] - Serialized size in bytes at which values get compressed
+ */
+export type CacheCodecOptions = {
+  serializer?: string;
+  compressor?: string;
+  threshold?: number;
+};
+
+/**
+ * Value to store in Redis along with the size of its serialized data.
+ *
+ * @property value - String to store in Redis
+ * @property size - Size of the serialized data in bytes, before compression
+ */
+export type EncodedCacheValue = {
+  value: string;
+  size: number;
+};
+
+/**
+ * Data decoded from a Redis value along with the size of its serialized form.
+ *
+ * @property data - Decoded data
+ * @property size - Size of the serialized data in bytes, after decompression
+ */
+export type DecodedCacheValue<T = unknown> = {
+  data: T;
+  size: number;
+};
+
+/**
+ * Serializes data as UTF-8 JSON text.
+ */
+export const jsonSerializer: CacheSerializer = {
+  name: "json",
+  serialize: (data) => Buffer.from(JSON.stringify(data)),
+  deserialize: (payload) => JSON.parse(payload.toString()),
+};
+
+/**
+ * Serializes data with V8's structured-clone format. It's more compact than JSON for numbers and
+ * repeated strings, and it keeps `Date`, `Map`, and `Set` values. Every server process has to run
+ * a Node.js version that reads the format of the others, so switch to or from it only between
+ * deploys of the same Node.js major version.
+ */
+export const v8Serializer: CacheSerializer = {
+  name: "v8",
+  serialize: (data) => v8.serialize(data),
+  deserialize: (payload) => v8.deserialize(payload),
+};
+
+/**
+ * Compresses with gzip. zlib runs it on the libuv thread pool so it doesn't block the event loop.
+ */
+export const gzipCompressor: CacheCompressor = {
+  name: "gzip",
+  compress: promisify(zlib.gzip),
+  decompress: promisify(zlib.gunzip),
+};
+
+/**
+ * Compresses with Zstandard, which compresses about as well as gzip in less time. Only available
+ * in Node.js versions whose zlib includes it; null otherwise.
+ */
+export const zstdCompressor: CacheCompressor | null =
+  "zstdCompress" in zlib && "zstdDecompress" in zlib
+    ? {
+        name: "zstd",
+        compress: promisify(zlib.zstdCompress),
+        decompress: promisify(zlib.zstdDecompress),
+      }
+    : null;
+
+/**
+ * Registered serializers and compressors by name.
+ */
+const serializers = new Map<string, CacheSerializer>([
+  [jsonSerializer.name, jsonSerializer],
+  [v8Serializer.name, v8Serializer],
+]);
+const compressors = new Map<string, CacheCompressor>(
+  [gzipCompressor, zstdCompressor]
+    .filter(Boolean)
+    .map((compressor): [string, CacheCompressor] => [
+      compressor.name,
+      compressor,
+    ])
+);
+
+/**
+ * Default encoding of new values.
+ */
+const DEFAULT_CACHE_CODEC_OPTIONS: Required<CacheCodecOptions> = {
+  serializer: jsonSerializer.name,
+  compressor: gzipCompressor.name,
+  threshold: DEFAULT_COMPRESSION_THRESHOLD,
+};
+
+/**
+ * Encoding of new values, from `configureCacheCodec()`.
+ */
+let codecOptions: Required<CacheCodecOptions> = {
+  ...DEFAULT_CACHE_CODEC_OPTIONS,
+};
+
+/**
+ * Add a serializer that `configureCacheCodec()` can select and that decodes values with its name
+ * in their header.
+ *
+ * @param serializer - Serializer to add
+ */
+export function registerCacheSerializer(serializer: CacheSerializer): void {
+  serializers.set(serializer.name, serializer);
+}
+
+/**
+ * Add a compressor that `configureCacheCodec()` can select and that decodes values with its name
+ * in their header.
+ *
+ * @param compressor - Compressor to add
+ */
+export function registerCacheCompressor(compressor: CacheCompressor): void {
+  compressors.set(compressor.name, compressor);
+}
+
+/**
+ * Select how new values get encoded. Options you don't pass return to their defaults, so calling
+ * this without options restores the default encoding.
+ *
+ * @param [options] - Serializer, compressor, and compression threshold to use
+ */
+export function configureCacheCodec(options: CacheCodecOptions = {}): void {
+  const nextOptions = { ...DEFAULT_CACHE_CODEC_OPTIONS, ...options };
+  if (!serializers.has(nextOptions.serializer)) {
+    throw new Error(`Unknown cache serializer ${nextOptions.serializer}`);
+  }
+  if (nextOptions.compressor && !compressors.has(nextOptions.compressor)) {
+    throw new Error(`Unknown cache compressor ${nextOptions.compressor}`);
+  }
+  codecOptions = nextOptions;
+}
+
+/**
+ * Encode data to store in Redis with the configured serializer and compressor.
+ *
+ * @param data - Data to encode
+ * @returns String to store in Redis and the size of the serialized data
+ */
+export async function encodeCacheValue(
+  data: unknown
+): Promise<EncodedCacheValue> {
+  const serializer = serializers.get(codecOptions.serializer);
+  const payload = serializer.serialize(data);
+  const compressor =
+    payload.length >= codecOptions.threshold
+      ? compressors.get(codecOptions.compressor)
+      : undefined;
+
+  // Keep plain JSON readable by every version of this module.
+  if (!compressor && serializer === jsonSerializer) {
+    return { value: payload.toString(), size: payload.length };
+  }
+
+  const body = compressor ? await compressor.compress(payload) : payload;
+  const names = `${serializer.name}:${compressor ? compressor.name : ""}`;
+  const header = `@${CACHE_CODEC_VERSION}:${names}:`;
+  return { value: header + body.toString("base64"), size: payload.length };
+}
+
+/**
+ * Decode a value from Redis, whether stored as plain JSON or with a header.
+ *
+ * @param value - String from Redis
+ * @returns Decoded data and the size of its serialized form
+ */
+export async function decodeCacheValue<T = unknown>(
+  value: string
+): Promise<DecodedCacheValue<T>> {
+  if (!value.startsWith("@")) {
+    return { data: JSON.parse(value), size: Buffer.byteLength(value) };
+  }
+
+  const match = value.match(HEADER_REGEX);
+  if (!match) {
+    throw new Error(`Invalid cache value header ${value.slice(0, 32)}`);
+  }
+  const [header, version, serializerName, compressorName] = match;
+  const serializer = serializers.get(serializerName);
+  const compressor = compressorName ? compressors.get(compressorName) : null;
+  if (
+    Number(version) > CACHE_CODEC_VERSION ||
+    !serializer ||
+    compressor === undefined
+  ) {
+    throw new Error(`Unsupported cache value encoding ${header}`);
+  }
+
+  const body = Buffer.from(value.slice(header.length), "base64");
+  const payload = compressor ? await compressor.decompress(body) : body;
+  return { data: serializer.deserialize(payload) as T, size: payload.length };
+}
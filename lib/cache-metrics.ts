@@ -0,0 +1,353 @@
+/**
+ * Counters and histograms showing how well the cache in `lib/cache.ts` works, grouped by key
+ * family — the kind of data a key holds, like "profiles" or "facet-config", without the user UUIDs
+ * or page numbers that make keys unique. `pages/api/cache-metrics.ts` returns them, and each
+ * server process also logs them as one JSON record per family every minute it handles cached
+ * requests, so CloudWatch Logs Insights can aggregate them across tasks.
+ *
+ * All counts accumulate from the start of the server process.
+ *
+ * Use this code only on the Next.js server. Documentation in lib/docs/cache.md.
+ */
+
+/**
+ * Families of cache keys, and the keys belonging to each. Keys not matching any of these fall into
+ * the "other" family. The facet order keys have the object type in place of a fixed word, so they
+ * match last, after the other facet keys.
+ */
+const KEY_FAMILIES: [string, RegExp][] = [
+  ["profiles", /^profiles$/],
+  ["collection-titles", /^collection-titles$/],
+  ["collection-names", /^collection-names$/],
+  ["indexer-state", /^indexer-state$/],
+  ["versions", /^versions$/],
+  ["release-data", /^release-data$/],
+  ["home-page-statistics", /^home-page-statistics$/],
+  ["lab-chart-data", /^lab-chart-data-/],
+  ["facet-config", /^facet-config-/],
+  ["facet-optional", /^facet-optional-/],
+  ["facet-order", /^facet-/],
+];
+
+/**
+ * Family for keys that don't match any in `KEY_FAMILIES`.
+ */
+const OTHER_KEY_FAMILY = "other";
+
+/**
+ * Upper bounds of the histogram buckets for durations in milliseconds, and for sizes in bytes.
+ * Values above the last bound fall into an extra overflow bucket.
+ */
+const DURATION_BUCKETS = [
+  1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+];
+const SIZE_BUCKETS = [
+  256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216,
+];
+
+/**
+ * Milliseconds between the structured log records of the metrics.
+ */
+const LOG_INTERVAL = 60_000;
+
+/**
+ * Events counted for each key family.
+ * - `memoryHits`: Found in this process's memory tier
+ * - `hits`: Found in Redis
+ * - `staleHits`: Found stale in Redis with stale-while-revalidate, and returned while refreshing
+ * - `misses`: Not found in Redis
+ * - `coalesced`: Waited for another request or server process fetching the same data
+ * - `fetches`: Called the fetcher function
+ * - `fetchErrors`: Fetcher function returned null or threw
+ * - `errors`: Redis commands failed
+ * - `bytesRead`: Bytes of cached values read from Redis
+ * - `bytesWritten`: Bytes of values written to Redis
+ */
+export type CacheCounterName =
+  | "memoryHits"
+  | "hits"
+  | "staleHits"
+  | "misses"
+  | "coalesced"
+  | "fetches"
+  | "fetchErrors"
+  | "errors"
+  | "bytesRead"
+  | "bytesWritten";
+
+/**
+ * Distributions measured for each key family.
+ * - `lookupMs`: Milliseconds to read from Redis
+ * - `fetchMs`: Milliseconds the fetcher function took
+ * - `coalescedWaitMs`: Milliseconds spent waiting for another request fetching the same data
+ * - `valueBytes`: Bytes of each value read from or written to Redis
+ */
+export type CacheHistogramName =
+  | "lookupMs"
+  | "fetchMs"
+  | "coalescedWaitMs"
+  | "valueBytes";
+
+/**
+ * Summary of a histogram.
+ *
+ * @property count - Number of values recorded
+ * @property sum - Sum of the values
+ * @property p50 - Upper bound of the bucket holding the median; null if no values
+ * @property p95 - Upper bound of the bucket holding the 95th percentile; null if no values
+ * @property p99 - Upper bound of the bucket holding the 99th percentile; null if no values
+ * @property max - Largest value recorded; null if no values
+ * @property buckets - Count of values at or below each bucket bound, not cumulative; the last
+ *   count covers values above every bound
+ */
+export type HistogramSummary = {
+  count: number;
+  sum: number;
+  p50: number | null;
+  p95: number | null;
+  p99: number | null;
+  max: number | null;
+  buckets: { le: number | "+Inf"; count: number }[];
+};
+
+/**
+ * Metrics for one key family.
+ */
+export type CacheFamilyMetrics = Record<CacheCounterName, number> &
+  Record<CacheHistogramName, HistogramSummary>;
+
+/**
+ * Counts values falling into fixed buckets, which keeps memory use constant no matter how many
+ * values get recorded. Percentiles come out as the upper bound of the bucket holding them.
+ */
+export class Histogram {
+  readonly bounds: number[];
+  private readonly counts: number[];
+  private count = 0;
+  private sum = 0;
+  private max: number | null = null;
+
+  /**
+   * @param bounds - Upper bounds of the buckets in ascending order
+   */
+  constructor(bounds: number[]) {
+    this.bounds = bounds;
+    this.counts = new Array(bounds.length + 1).fill(0);
+  }
+
+  /**
+   * Add a value to the histogram.
+   *
+   * @param value - Value to add
+   */
+  record(value: number): void {
+    const index = this.bounds.findIndex((bound) => value <= bound);
+    this.counts[index === -1 ? this.bounds.length : index] += 1;
+    this.count += 1;
+    this.sum += value;
+    this.max = this.max === null ? value : Math.max(this.max, value);
+  }
+
+  /**
+   * Get the upper bound of the bucket holding a percentile of the values. Values in the overflow
+   * bucket report the largest value recorded.
+   *
+   * @param percent - Percentile to get, from 0 to 100
+   * @returns Upper bound of the bucket; null if no values
+   */
+  percentile(percent: number): number | null {
+    if (this.count === 0) {
+      return null;
+    }
+    const rank = Math.max(Math.ceil((percent / 100) * this.count), 1);
+    let seen = 0;
+    for (let i = 0; i < this.bounds.length; i += 1) {
+      seen += this.counts[i];
+      if (seen >= rank) {
+        return Math.min(this.bounds[i], this.max);
+      }
+    }
+    return this.max;
+  }
+
+  /**
+   * Summarize the values recorded so far.
+   */
+  summarize(): HistogramSummary {
+    return {
+      count: this.count,
+      sum: this.sum,
+      p50: this.percentile(50),
+      p95: this.percentile(95),
+      p99: this.percentile(99),
+      max: this.max,
+      buckets: this.counts.map((count, i) => ({
+        le: i < this.bounds.length ? this.bounds[i] : "+Inf",
+        count,
+      })),
+    };
+  }
+}
+
+/**
+ * Counters and histograms for one key family.
+ */
+type FamilyRecorder = {
+  counters: Record<CacheCounterName, number>;
+  histograms: Record<CacheHistogramName, Histogram>;
+};
+
+/**
+ * Metrics for each key family that has recorded anything.
+ */
+const families = new Map<string, FamilyRecorder>();
+
+/**
+ * Timer that logs the metrics, and whether anything got recorded since the last log.
+ */
+let logTimer: ReturnType<typeof setInterval> | null = null;
+let recordedSinceLog = false;
+
+/**
+ * Get the family a cache key belongs to. Keys of tagged data count in the family of the key
+ * without their tag generations.
+ *
+ * @param key - Redis key
+ * @returns Name of the key family
+ */
+export function getKeyFamily(key: string): string {
+  const dataKey = key.split("#")[0];
+  const match = KEY_FAMILIES.find(([, pattern]) => pattern.test(dataKey));
+  return match ? match[0] : OTHER_KEY_FAMILY;
+}
+
+/**
+ * Get the metrics recorder for the family of a key, creating it if needed. Also starts the timer
+ * that logs the metrics, without keeping the process alive for it.
+ *
+ * @param key - Redis key
+ * @returns Recorder for the key's family
+ */
+function getFamilyRecorder(key: string): FamilyRecorder {
+  const family = getKeyFamily(key);
+  let recorder = families.get(family);
+  if (!recorder) {
+    recorder = {
+      counters: {
+        memoryHits: 0,
+        hits: 0,
+        staleHits: 0,
+        misses: 0,
+        coalesced: 0,
+        fetches: 0,
+        fetchErrors: 0,
+        errors: 0,
+        bytesRead: 0,
+        bytesWritten: 0,
+      },
+      histograms: {
+        lookupMs: new Histogram(DURATION_BUCKETS),
+        fetchMs: new Histogram(DURATION_BUCKETS),
+        coalescedWaitMs: new Histogram(DURATION_BUCKETS),
+        valueBytes: new Histogram(SIZE_BUCKETS),
+      },
+    };
+    families.set(family, recorder);
+  }
+
+  recordedSinceLog = true;
+  if (!logTimer) {
+    logTimer = setInterval(() => {
+      if (recordedSinceLog) {
+        logCacheMetrics();
+      }
+    }, LOG_INTERVAL);
+    logTimer.unref?.();
+  }
+  return recorder;
+}
+
+/**
+ * Add to a counter for the family of a key.
+ *
+ * @param key - Redis key the event happened for
+ * @param name - Counter to add to
+ * @param [amount] - Amount to add
+ */
+export function countCacheEvent(
+  key: string,
+  name: CacheCounterName,
+  amount = 1
+): void {
+  getFamilyRecorder(key).counters[name] += amount;
+}
+
+/**
+ * Record a value in a histogram for the family of a key.
+ *
+ * @param key - Redis key the value belongs to
+ * @param name - Histogram to record the value in
+ * @param value - Milliseconds or bytes to record
+ */
+export function observeCacheValue(
+  key: string,
+  name: CacheHistogramName,
+  value: number
+): void {
+  getFamilyRecorder(key).histograms[name].record(value);
+}
+
+/**
+ * Get the metrics of every key family that has recorded anything.
+ *
+ * @returns Metrics keyed by family name
+ */
+export function getCacheMetrics(): Record<string, CacheFamilyMetrics> {
+  const metrics: Record<string, CacheFamilyMetrics> = {};
+  for (const [family, { counters, histograms }] of families) {
+    metrics[family] = {
+      ...counters,
+      lookupMs: histograms.lookupMs.summarize(),
+      fetchMs: histograms.fetchMs.summarize(),
+      coalescedWaitMs: histograms.coalescedWaitMs.summarize(),
+      valueBytes: histograms.valueBytes.summarize(),
+    };
+  }
+  return metrics;
+}
+
+/**
+ * Log the metrics as one JSON record per key family. The histograms only include their summary
+ * values to keep the records short.
+ */
+export function logCacheMetrics(): void {
+  recordedSinceLog = false;
+  for (const [family, metrics] of Object.entries(getCacheMetrics())) {
+    const record: Record<string, unknown> = {
+      event: "cache-metrics",
+      family,
+    };
+    for (const [name, value] of Object.entries(metrics)) {
+      if (typeof value === "number") {
+        record[name] = value;
+      } else {
+        const { count, sum, p50, p95, p99, max } = value;
+        record[name] = { count, sum, p50, p95, p99, max };
+      }
+    }
+    console.log(JSON.stringify(record));
+  }
+}
+
+/**
+ * Remove all metrics and stop logging them until something gets recorded again. Mostly useful for
+ * tests.
+ */
+export function resetCacheMetrics(): void {
+  families.clear();
+  recordedSinceLog = false;
+  if (logTimer) {
+    clearInterval(logTimer);
+    logTimer = null;
+  }
+}
@@ -10,15 +10,122 @@
  * Use this code only on the Next.js server. Documentation in lib/docs/cache.md.
  */
 
+// node_modules
+import { randomUUID } from "crypto";
+import type { RedisClientType } from "redis";
 // lib
+import { decodeCacheValue, encodeCacheValue } from "./cache-codec";
 import { getCacheClient } from "./cache-client";
+import { countCacheEvent, observeCacheValue } from "./cache-metrics";
 import FetchRequest from "./fetch-request";
+import { MemoryCache, type CacheTierStats } from "./memory-cache";
 
 /**
  * Default TTL time for cache entries in seconds.
  */
 const DEFAULT_CACHE_TTL = 3600; // 1 hour
 
+/**
+ * In-process tier in front of Redis. Only keys cached with a `memoryTtl` option use it.
+ */
+const memoryCache = new MemoryCache();
+
+/**
+ * Hit and miss counts for Redis lookups since the process started or `clearMemoryCache()` got
+ * called.
+ */
+let redisStats: CacheTierStats = { hits: 0, misses: 0 };
+
+/**
+ * Property of a stale-while-revalidate entry holding the time in milliseconds when its data
+ * becomes stale. The `@` keeps it from colliding with properties of the cached data.
+ */
+const FRESH_UNTIL_PROPERTY = "@freshUntil";
+
+/**
+ * Milliseconds between checks of Redis while another server process holds the lock to fetch the
+ * same data.
+ */
+const LOCK_POLL_INTERVAL = 50;
+
+/**
+ * Deletes a lock only if it still holds our token, so that a process whose lock expired doesn't
+ * release the lock another process took after it.
+ */
+const RELEASE_LOCK_SCRIPT = `
+if redis.call("get", KEYS[1]) == ARGV[1] then
+  return redis.call("del", KEYS[1])
+end
+return 0
+`;
+
+/**
+ * Prefix of the Redis keys holding the generation of each cache tag, and of the keys holding the
+ * last value `invalidateCacheTagsOnChange()` saw from each source.
+ */
+const TAG_GENERATION_KEY_PREFIX = "cache-tag:";
+const TAG_SOURCE_KEY_PREFIX = "cache-tag-source:";
+
+/**
+ * Separates the key of tagged data from the tag generations appended to it. Our keys don't
+ * contain this character otherwise.
+ */
+const TAGGED_KEY_SEPARATOR = "#";
+
+/**
+ * Seconds each server process keeps using the tag generations it read from Redis before reading
+ * them again. This bounds how long other processes keep using data after a tag gets invalidated.
+ */
+const TAG_GENERATION_REFRESH = 5;
+
+/**
+ * Options for the cache functions.
+ *
+ * @property [memoryTtl] - Seconds to keep the parsed data in this process's memory cache before
+ *   checking Redis again. Limited to the Redis TTL. Zero or missing skips the memory cache, which
+ *   suits data that changes from other processes, like user preferences
+ * @property [staleWhileRevalidate] - Seconds past the TTL during which `getCachedDataFetch()`
+ *   returns the stale data right away and refreshes it in the background. The data expires from
+ *   Redis after the TTL plus this, so this bounds how stale the data can get. Zero or missing
+ *   fetches the data while the caller waits once the TTL passes
+ * @property [lockTimeout] - Seconds a server process can hold a Redis lock while it fetches the
+ *   data after a cache miss. Other processes wait up to this long for it to cache the data, then
+ *   fetch it themselves. Zero or missing lets every process fetch its own copy
+ * @property [tags] - Tags of the data. `invalidateCacheTags()` with any of these tags makes all
+ *   server processes stop using the cached data and fetch it again, so data that rarely changes
+ *   can use long TTLs. Only `getCachedDataFetch()`, `getObjectCached()`, and `getManyCached()`
+ *   use this option
+ */
+export type CacheOptions = {
+  memoryTtl?: number;
+  staleWhileRevalidate?: number;
+  lockTimeout?: number;
+  tags?: string[];
+};
+
+/**
+ * How stale-while-revalidate entries get stored in Redis: the cached data along with the time it
+ * becomes stale.
+ *
+ * @property [FRESH_UNTIL_PROPERTY] - Time in milliseconds when the data becomes stale
+ * @property data - Cached data
+ */
+type StaleWhileRevalidateEntry<T = unknown> = {
+  [FRESH_UNTIL_PROPERTY]: number;
+  data: T;
+};
+
+/**
+ * Hit and miss counts for each cache tier.
+ *
+ * @property memory - Counts for the in-process memory cache
+ * @property redis - Counts for Redis
+ */
+export type CacheStats = {
+  memory: CacheTierStats;
+  redis: CacheTierStats;
+};
+
 /**
  * Tracks active request promises to prevent duplicating requests, thereby preventing the
  * thundering-herd problem. When a promise resolves with fetched data, it gets removed from this
@@ -26,6 +133,15 @@ const DEFAULT_CACHE_TTL = 3600; // 1 hour
  */
 const activeRequests = new Map<string, Promise<unknown>>();
 
+/**
+ * Generation of each cache tag this process has read from Redis, and the time in milliseconds
+ * when it needs reading again.
+ */
+const tagGenerations = new Map<
+  string,
+  { generation: number; refreshAt: number }
+>();
+
 /**
  * Callback to fetch data when it's not in the cache. The function should return the data, or null
  * if something went wrong. If this function uses the `FetchRequest` class, it should create a new
@@ -35,60 +151,454 @@ const activeRequests = new Map<string, Promise<unknown>>();
 export type CacheFetcher<T = unknown> = () => Promise<T | null>;
 
 /**
- * Get data from cache or fetch it using the provided fetcher function. Cache the fetched data.
+ * One item of a `getManyCached()` batch, with the same meanings as the matching parameters of
+ * `getCachedDataFetch()`.
+ *
+ * @property key - Key identifying the data in the cache
+ * @property fetcher - Function to call to fetch the data if it's not in the cache
+ * @property [ttl] - Time to live for the cached data in seconds. Default is one hour
+ * @property [field] - Redis hash field name within the hash identified by the key
+ * @property [options] - Options, e.g. to also cache the data in this process's memory
+ */
+export type CacheRequest<T = unknown> = {
+  key: string;
+  fetcher: CacheFetcher<T>;
+  ttl?: number;
+  field?: string;
+  options?: CacheOptions;
+};
+
+/**
+ * Get the memory cache key for a Redis key and optional hash field. Our Redis keys don't contain
+ * NUL characters, so hash fields can't collide with other keys.
+ *
+ * @param key - Redis key
+ * @param [field] - Redis hash field name
+ * @returns Key for the memory cache
+ */
+function getMemoryCacheKey(key: string, field = ""): string {
+  return field ? `${key}\u0000${field}` : key;
+}
+
+/**
+ * Add parsed data to the memory cache if the options ask for it.
+ *
+ * @param memoryKey - Key from `getMemoryCacheKey()`
+ * @param data - Parsed data to cache
+ * @param size - Size of the serialized data in bytes
+ * @param ttl - Redis TTL for the data in seconds
+ * @param options - Options passed to the cache function
+ */
+function setMemoryCachedData(
+  memoryKey: string,
+  data: unknown,
+  size: number,
+  ttl: number,
+  options: CacheOptions
+): void {
+  const memoryTtl = Math.min(options.memoryTtl || 0, ttl);
+  if (memoryTtl > 0) {
+    memoryCache.set(memoryKey, data, size, memoryTtl);
+  }
+}
+
+/**
+ * Get the data and the time it becomes stale from a parsed stale-while-revalidate entry. Entries
+ * cached without stale-while-revalidate count as already stale so they get refreshed in the new
+ * format.
+ *
+ * @param entry - Parsed entry from Redis
+ * @returns Cached data and the time in milliseconds when it becomes stale
+ */
+function unwrapStaleWhileRevalidateEntry<T>(entry: unknown): {
+  data: T;
+  freshUntil: number;
+} {
+  if (
+    entry &&
+    typeof entry === "object" &&
+    typeof (entry as Record<string, unknown>)[FRESH_UNTIL_PROPERTY] ===
+      "number" &&
+    "data" in entry
+  ) {
+    const swrEntry = entry as StaleWhileRevalidateEntry<T>;
+    return {
+      data: swrEntry.data,
+      freshUntil: swrEntry[FRESH_UNTIL_PROPERTY],
+    };
+  }
+  return { data: entry as T, freshUntil: 0 };
+}
+
+/**
+ * Get the Redis key of the lock that lets one server process at a time fetch the data for a key
+ * and optional hash field.
+ *
+ * @param key - Redis key of the data
+ * @param [field] - Redis hash field name of the data
+ * @returns Redis key of the lock
+ */
+function getLockKey(key: string, field = ""): string {
+  return field ? `${key}:${field}:lock` : `${key}:lock`;
+}
+
+/**
+ * Get the current generation of cache tags. Generations read from Redis within the last
+ * `TAG_GENERATION_REFRESH` seconds come from this process's memory; the rest get read in one
+ * round trip. Tags never invalidated have generation 0. Without Redis, tags keep the generation
+ * this process last read.
+ *
+ * @param tags - Tags to get the generations of
+ * @returns Generation of each tag in the same order as `tags`
+ */
+async function getTagGenerations(tags: string[]): Promise<number[]> {
+  const now = Date.now();
+  const expiredTags = tags.filter(
+    (tag) => !(tagGenerations.get(tag)?.refreshAt > now)
+  );
+  if (expiredTags.length > 0) {
+    const redisClient = await getCacheClient();
+    if (redisClient) {
+      try {
+        const generations = await redisClient.mGet(
+          expiredTags.map((tag) => TAG_GENERATION_KEY_PREFIX + tag)
+        );
+        expiredTags.forEach((tag, i) => {
+          tagGenerations.set(tag, {
+            generation: Number(generations[i]) || 0,
+            refreshAt: now + TAG_GENERATION_REFRESH * 1000,
+          });
+        });
+      } catch (error) {
+        console.error("Cache tag retrieval error:", error);
+      }
+    }
+  }
+  return tags.map((tag) => tagGenerations.get(tag)?.generation ?? 0);
+}
+
+/**
+ * Get the key that tagged data gets cached under: the key followed by the current generation of
+ * each of its tags, e.g. `profiles#data-provider-version:3`. Invalidating a tag changes the key,
+ * so the old data stops getting used and expires from Redis with its TTL.
  *
  * @param key - Key identifying the data in the cache
- * @param fetcher - Function to call to fetch the data if it's not in the cache
- * @param [ttl] - Time to live for the cached data in seconds. Default is one hour
- * @param [field] - Optional Redis hash field name. If provided, the data is stored and retrieved
- *                  from the specified field within a Redis hash identified by the key
- * @returns Promise that resolves to the cached or fetched data; null if something went wrong
+ * @param [tags] - Tags of the data
+ * @returns Key to cache the data under; `key` itself without tags
  */
-export async function getCachedDataFetch<T = unknown>(
+async function getTaggedKey(key: string, tags?: string[]): Promise<string> {
+  if (!(tags?.length > 0)) {
+    return key;
+  }
+  const generations = await getTagGenerations(tags);
+  const suffix = tags.map((tag, i) => `${tag}:${generations[i]}`).join(",");
+  return `${key}${TAGGED_KEY_SEPARATOR}${suffix}`;
+}
+
+/**
+ * Wait for another server process holding the lock for some data to cache it. Stops waiting once
+ * the lock gets released or expires, or after `lockTimeout` seconds.
+ *
+ * @param redisClient - Connected Redis client
+ * @param key - Redis key of the data
+ * @param field - Redis hash field name of the data; empty for a plain key
+ * @param lockTimeout - Maximum seconds to wait
+ * @returns JSON of the cached data; null if the lock holder didn't cache it in time
+ */
+async function waitForLockedData(
+  redisClient: RedisClientType,
   key: string,
-  fetcher: CacheFetcher<T>,
-  ttl: number = DEFAULT_CACHE_TTL,
-  field: string = ""
+  field: string,
+  lockTimeout: number
+): Promise<string | null> {
+  const lockKey = getLockKey(key, field);
+  const deadline = Date.now() + lockTimeout * 1000;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, LOCK_POLL_INTERVAL));
+
+    // The lock holder caches the data before releasing the lock, so check the lock first to
+    // avoid missing data cached between the two checks.
+    const isLocked = (await redisClient.exists(lockKey)) > 0;
+    const cachedData = field
+      ? await redisClient.hGet(key, field)
+      : await redisClient.get(key);
+    if (cachedData && typeof cachedData === "string") {
+      return cachedData;
+    }
+    if (!isLocked) {
+      return null;
+    }
+  }
+  return null;
+}
+
+/**
+ * Read the value of a key or hash field from Redis, recording how long it took in the metrics of
+ * the key's family.
+ *
+ * @param redisClient - Connected Redis client
+ * @param key - Redis key of the data
+ * @param field - Redis hash field name of the data; empty for a plain key
+ * @returns Value from Redis; null if not cached
+ */
+async function readCachedValue(
+  redisClient: RedisClientType,
+  key: string,
+  field: string
+): Promise<unknown> {
+  const start = performance.now();
+  try {
+    return field
+      ? await redisClient.hGet(key, field)
+      : await redisClient.get(key);
+  } catch (error) {
+    countCacheEvent(key, "errors");
+    throw error;
+  } finally {
+    observeCacheValue(key, "lookupMs", performance.now() - start);
+  }
+}
+
+/**
+ * Record the size of a value read from or written to Redis in the metrics of the key's family.
+ *
+ * @param key - Redis key of the value
+ * @param counter - Whether the value got read or written
+ * @param value - Value as stored in Redis
+ */
+function recordValueBytes(
+  key: string,
+  counter: "bytesRead" | "bytesWritten",
+  value: string
+): void {
+  const bytes = Buffer.byteLength(value);
+  countCacheEvent(key, counter, bytes);
+  observeCacheValue(key, "valueBytes", bytes);
+}
+
+/**
+ * Wait for the request of this process already fetching the data for a key, recording the wait
+ * in the metrics of the key's family.
+ *
+ * @param key - Key identifying the data in the cache
+ * @returns Promise that resolves to the data the other request fetched
+ */
+async function waitForActiveRequest<T>(key: string): Promise<T | null> {
+  const start = performance.now();
+  const data = await activeRequests.get(key);
+  countCacheEvent(key, "coalesced");
+  observeCacheValue(key, "coalescedWaitMs", performance.now() - start);
+  return data as T;
+}
+
+/**
+ * Call a fetcher function, recording the call, its duration, and whether it failed in the metrics
+ * of the key's family.
+ *
+ * @param key - Key identifying the data in the cache
+ * @param fetcher - Function to call to fetch the data
+ * @returns Promise that resolves to the fetched data; null if something went wrong
+ */
+async function callFetcher<T>(
+  key: string,
+  fetcher: CacheFetcher<T>
 ): Promise<T | null> {
-  // Check for an active request promise for the same key. If found, wait for that request's
-  // fetcher function and return its cached result. This deduplicates requests for the same key
-  // that arrive while the first request processes but before caching completes.
-  if (activeRequests.has(key)) {
-    return (await activeRequests.get(key)) as T;
+  const start = performance.now();
+  countCacheEvent(key, "fetches");
+  try {
+    const data = await fetcher();
+    if (data === null) {
+      countCacheEvent(key, "fetchErrors");
+    }
+    return data;
+  } catch (error) {
+    countCacheEvent(key, "fetchErrors");
+    throw error;
+  } finally {
+    observeCacheValue(key, "fetchMs", performance.now() - start);
   }
+}
 
-  // Get a reference to the Redis client. If Redis fails to load, just fetch the data directly.
-  // Don't bother tracking this request because we can't cache it.
-  const redisClient = await getCacheClient();
-  if (!redisClient) {
-    return await fetcher();
+/**
+ * Get the hit and miss counts for the memory and Redis tiers of the cache.
+ *
+ * @returns Hit and miss counts for each tier
+ */
+export function getCacheStats(): CacheStats {
+  return {
+    memory: memoryCache.getStats(),
+    redis: { ...redisStats },
+  };
+}
+
+/**
+ * Remove everything from this process's memory cache and reset the hit and miss counts. Redis
+ * doesn't change. Mostly useful for tests.
+ */
+export function clearMemoryCache(): void {
+  memoryCache.clear();
+  tagGenerations.clear();
+  redisStats = { hits: 0, misses: 0 };
+}
+
+/**
+ * Fetch data for a cache key while Redis is unavailable. Only the memory tier caches it.
+ *
+ * @param fetcher - Function to call to fetch the data
+ * @param key - Key identifying the data in the cache
+ * @param field - Redis hash field name; empty for a plain key
+ * @param ttl - Time to live for the data in seconds
+ * @param options - Options passed to the cache function
+ * @returns Promise that resolves to the fetched data; null if something went wrong
+ */
+async function fetchUncached<T>(
+  fetcher: CacheFetcher<T>,
+  key: string,
+  field: string,
+  ttl: number,
+  options: CacheOptions
+): Promise<T | null> {
+  const data = await callFetcher(key, fetcher);
+  if (data !== null) {
+    const size = Buffer.byteLength(JSON.stringify(data));
+    const memoryKey = getMemoryCacheKey(key, field);
+    setMemoryCachedData(memoryKey, data, size, ttl, options);
   }
+  return data;
+}
 
-  // Retrieve the data corresponding to the key from Redis if cached.
-  const cachedData = field
-    ? await redisClient.hGet(key, field)
-    : await redisClient.get(key);
+/**
+ * Return the data for a cache key given the value already read from Redis, fetching and caching
+ * the data if Redis didn't have it or, with stale-while-revalidate, refreshing it if stale.
+ * `getCachedDataFetch()` reads the value for one key and `getManyCached()` for several at once.
+ *
+ * @param redisClient - Connected Redis client
+ * @param cachedData - Value read from Redis for the key and field; null if not cached
+ * @param key - Key identifying the data in the cache
+ * @param fetcher - Function to call to fetch the data if it's not in the cache
+ * @param ttl - Time to live for the cached data in seconds
+ * @param field - Redis hash field name; empty for a plain key
+ * @param options - Options passed to the cache function
+ * @returns Promise that resolves to the cached or fetched data; null if something went wrong
+ */
+async function resolveCachedData<T>(
+  redisClient: RedisClientType,
+  cachedData: unknown,
+  key: string,
+  fetcher: CacheFetcher<T>,
+  ttl: number,
+  field: string,
+  options: CacheOptions
+): Promise<T | null> {
+  const memoryKey = getMemoryCacheKey(key, field);
+  const staleWhileRevalidate = options.staleWhileRevalidate > 0;
+  let staleData: T | undefined;
   if (cachedData && typeof cachedData === "string") {
     try {
-      return JSON.parse(cachedData);
+      const { data: parsedData, size } = await decodeCacheValue(cachedData);
+      redisStats.hits += 1;
+      recordValueBytes(key, "bytesRead", cachedData);
+      if (!staleWhileRevalidate) {
+        countCacheEvent(key, "hits");
+        setMemoryCachedData(memoryKey, parsedData, size, ttl, options);
+        return parsedData as T;
+      }
+
+      // Don't keep the data in memory past the time it becomes stale, or the memory tier would
+      // hide it from the background refresh.
+      const { data, freshUntil } =
+        unwrapStaleWhileRevalidateEntry<T>(parsedData);
+      const freshSeconds = (freshUntil - Date.now()) / 1000;
+      if (freshSeconds > 0) {
+        countCacheEvent(key, "hits");
+        setMemoryCachedData(memoryKey, data, size, freshSeconds, options);
+        return data;
+      }
+      countCacheEvent(key, "staleHits");
+      staleData = data;
     } catch {
       // Could not parse cached data, maybe because of corruption. Fall through to fetch it again.
     }
   }
+  if (staleData === undefined) {
+    redisStats.misses += 1;
+    countCacheEvent(key, "misses");
+    if (activeRequests.has(key)) {
+      return await waitForActiveRequest<T>(key);
+    }
+  }
 
   // Calls the provided fetcher function and caches the result. Also tracks the promise in the
   // `activeRequests` map so other requests for the same key can wait for the fetcher function to
   // complete to return its data.
+  //
+  // With a lock timeout, only the server process that takes the Redis lock calls the fetcher
+  // function. The others wait for it to cache the data, or, for stale data, leave the refresh to
+  // it. If it doesn't cache the data in time, they call the fetcher function themselves.
   async function fetchAndCache(): Promise<T | null> {
+    const lockKey = getLockKey(key, field);
+    let lockToken = "";
     try {
-      const data = await fetcher();
+      if (options.lockTimeout > 0) {
+        const token = randomUUID();
+        const lockResult = await redisClient.set(lockKey, token, {
+          NX: true,
+          PX: options.lockTimeout * 1000,
+        });
+        if (lockResult === "OK") {
+          lockToken = token;
+        } else if (staleData !== undefined) {
+          return staleData;
+        } else {
+          const waitStart = performance.now();
+          const lockedData = await waitForLockedData(
+            redisClient,
+            key,
+            field,
+            options.lockTimeout
+          );
+          countCacheEvent(key, "coalesced");
+          observeCacheValue(
+            key,
+            "coalescedWaitMs",
+            performance.now() - waitStart
+          );
+          if (lockedData !== null) {
+            recordValueBytes(key, "bytesRead", lockedData);
+            const { data: parsedData, size } =
+              await decodeCacheValue(lockedData);
+            const data: T = staleWhileRevalidate
+              ? unwrapStaleWhileRevalidateEntry<T>(parsedData).data
+              : (parsedData as T);
+            setMemoryCachedData(memoryKey, data, size, ttl, options);
+            return data;
+          }
+        }
+      }
+
+      const data = await callFetcher(key, fetcher);
       if (data !== null && redisClient) {
+        // Stale-while-revalidate entries stay in Redis past their TTL so they can be served
+        // while they get refreshed.
+        const { value, size } = await encodeCacheValue(
+          staleWhileRevalidate
+            ? { [FRESH_UNTIL_PROPERTY]: Date.now() + ttl * 1000, data }
+            : data
+        );
+        const redisTtl = staleWhileRevalidate
+          ? ttl + options.staleWhileRevalidate
+          : ttl;
         if (field) {
-          await redisClient.hSet(key, field, JSON.stringify(data));
-          await redisClient.expire(key, ttl);
+          await redisClient
+            .multi()
+            .hSet(key, field, value)
+            .expire(key, redisTtl)
+            .exec();
         } else {
-          await redisClient.set(key, JSON.stringify(data), { EX: ttl });
+          await redisClient.set(key, value, { EX: redisTtl });
         }
+        recordValueBytes(key, "bytesWritten", value);
+        setMemoryCachedData(memoryKey, data, size, ttl, options);
       }
       return data;
     } catch (error) {
@@ -97,12 +607,31 @@ export async function getCachedDataFetch<T = unknown>(
     } finally {
       // We don't need to track this request anymore because it completed, successfully or not.
       activeRequests.delete(key);
+      if (lockToken) {
+        try {
+          await redisClient.eval(RELEASE_LOCK_SCRIPT, {
+            keys: [lockKey],
+            arguments: [lockToken],
+          });
+        } catch (error) {
+          console.error(`Cache lock release error for key ${key}:`, error);
+        }
+      }
     }
   }
 
   // Core of the fetch-and-cache process. `fetchAndCache()` immediately returns a promise that we
   // track in the `activeRequests` map, preventing other requests for the same key from arriving
   // between the initiation of the request and the adding of its key to `activeRequests`.
+  // Stale data gets returned right away while it gets refreshed in the background, unless
+  // another request already started refreshing it.
+  if (staleData !== undefined) {
+    if (!activeRequests.has(key)) {
+      activeRequests.set(key, fetchAndCache());
+    }
+    return staleData;
+  }
+
   const fetchPromise = fetchAndCache();
   activeRequests.set(key, fetchPromise);
 
@@ -112,6 +641,205 @@ export async function getCachedDataFetch<T = unknown>(
   return await fetchPromise;
 }
 
+/**
+ * Get data from cache or fetch it using the provided fetcher function. Cache the fetched data.
+ *
+ * @param key - Key identifying the data in the cache
+ * @param fetcher - Function to call to fetch the data if it's not in the cache
+ * @param [ttl] - Time to live for the cached data in seconds. Default is one hour
+ * @param [field] - Optional Redis hash field name. If provided, the data is stored and retrieved
+ *                  from the specified field within a Redis hash identified by the key
+ * @param [options] - Options, e.g. to also cache the data in this process's memory
+ * @returns Promise that resolves to the cached or fetched data; null if something went wrong
+ */
+export async function getCachedDataFetch<T = unknown>(
+  key: string,
+  fetcher: CacheFetcher<T>,
+  ttl: number = DEFAULT_CACHE_TTL,
+  field: string = "",
+  options: CacheOptions = {}
+): Promise<T | null> {
+  // Tagged data gets cached under a key that changes whenever one of its tags gets invalidated.
+  key = await getTaggedKey(key, options.tags);
+
+  // Parsed data in this process's memory saves both the Redis round trip and the JSON parsing.
+  const memoryKey = getMemoryCacheKey(key, field);
+  if (options.memoryTtl > 0) {
+    const memoryData = memoryCache.get<T>(memoryKey);
+    if (memoryData !== undefined) {
+      countCacheEvent(key, "memoryHits");
+      return memoryData;
+    }
+  }
+
+  // Check for an active request promise for the same key. If found, wait for that request's
+  // fetcher function and return its cached result. This deduplicates requests for the same key
+  // that arrive while the first request processes but before caching completes. With
+  // stale-while-revalidate, the active request might be a background refresh, so check Redis for
+  // stale data first.
+  const staleWhileRevalidate = options.staleWhileRevalidate > 0;
+  if (!staleWhileRevalidate && activeRequests.has(key)) {
+    return await waitForActiveRequest<T>(key);
+  }
+
+  // Get a reference to the Redis client. If Redis fails to load, just fetch the data directly.
+  // Don't bother tracking this request because we can't cache it.
+  const redisClient = await getCacheClient();
+  if (!redisClient) {
+    return await fetchUncached(fetcher, key, field, ttl, options);
+  }
+
+  // Retrieve the data corresponding to the key from Redis if cached. If Redis fails or times out,
+  // fetch the data directly; the cache client's circuit breaker keeps later requests from
+  // waiting on Redis while it's down.
+  let cachedData: unknown;
+  try {
+    cachedData = await readCachedValue(redisClient, key, field);
+  } catch (error) {
+    console.error(`Cache retrieval error for key ${key}:`, error);
+    return await fetchUncached(fetcher, key, field, ttl, options);
+  }
+  return await resolveCachedData(
+    redisClient,
+    cachedData,
+    key,
+    fetcher,
+    ttl,
+    field,
+    options
+  );
+}
+
+/**
+ * Get several items from the cache at once, fetching only the ones not cached. Redis gets read in
+ * a single round trip: one `MGET` for the plain keys pipelined with an `HGET` for each hash field.
+ * Each item then behaves as if requested with `getCachedDataFetch()`, so the misses' fetchers run
+ * in parallel, and the memory tier, stale-while-revalidate, and lock options all apply.
+ *
+ * @param requests - Items to get, each with its own key, fetcher, and options
+ * @returns Promise that resolves to the data for each item in the same order as `requests`; null
+ *   for items where something went wrong
+ */
+export async function getManyCached<T extends unknown[]>(requests: {
+  [K in keyof T]: CacheRequest<T[K]>;
+}): Promise<{ [K in keyof T]: T[K] | null }> {
+  const items = await Promise.all(
+    (requests as CacheRequest[]).map(async (item) => ({
+      ...item,
+      key: await getTaggedKey(item.key, item.options?.tags),
+    }))
+  );
+  const results: unknown[] = new Array(items.length).fill(null);
+
+  // Items in the memory tier or already being fetched by this process don't need Redis.
+  const waiting: Promise<void>[] = [];
+  const pending: number[] = [];
+  items.forEach((item, index) => {
+    const options = item.options || {};
+    if (options.memoryTtl > 0) {
+      const memoryKey = getMemoryCacheKey(item.key, item.field);
+      const memoryData = memoryCache.get(memoryKey);
+      if (memoryData !== undefined) {
+        countCacheEvent(item.key, "memoryHits");
+        results[index] = memoryData;
+        return;
+      }
+    }
+    if (!(options.staleWhileRevalidate > 0) && activeRequests.has(item.key)) {
+      waiting.push(
+        waitForActiveRequest(item.key).then((data) => {
+          results[index] = data;
+        })
+      );
+      return;
+    }
+    pending.push(index);
+  });
+
+  const redisClient = pending.length > 0 ? await getCacheClient() : null;
+  if (pending.length > 0 && !redisClient) {
+    waiting.push(
+      ...pending.map(async (index) => {
+        const { key, fetcher, ttl, field, options } = items[index];
+        results[index] = await fetchUncached(
+          fetcher,
+          key,
+          field || "",
+          ttl ?? DEFAULT_CACHE_TTL,
+          options || {}
+        );
+      })
+    );
+  } else if (pending.length > 0) {
+    const keyIndexes = pending.filter((index) => !items[index].field);
+    const fieldIndexes = pending.filter((index) => items[index].field);
+    const cachedValues = new Map<number, unknown>();
+    const lookupStart = performance.now();
+    try {
+      const pipeline = redisClient.multi();
+      if (keyIndexes.length > 0) {
+        pipeline.mGet(keyIndexes.map((index) => items[index].key));
+      }
+      fieldIndexes.forEach((index) => {
+        pipeline.hGet(items[index].key, items[index].field);
+      });
+      const replies = (await pipeline.execAsPipeline()) as unknown[];
+
+      const keyValues =
+        keyIndexes.length > 0 ? (replies.shift() as unknown[]) : [];
+      keyIndexes.forEach((index, i) => cachedValues.set(index, keyValues[i]));
+      fieldIndexes.forEach((index, i) => cachedValues.set(index, replies[i]));
+    } catch (error) {
+      // Treat everything as a miss so the fetchers still provide the data.
+      console.error("Cache batch retrieval error:", error);
+      pending.forEach((index) => countCacheEvent(items[index].key, "errors"));
+    }
+
+    // Every item shares the time of the single round trip.
+    const lookupMs = performance.now() - lookupStart;
+    pending.forEach((index) => {
+      observeCacheValue(items[index].key, "lookupMs", lookupMs);
+    });
+
+    waiting.push(
+      ...pending.map(async (index) => {
+        const { key, fetcher, ttl, field, options } = items[index];
+        results[index] = await resolveCachedData(
+          redisClient,
+          cachedValues.get(index) ?? null,
+          key,
+          fetcher,
+          ttl ?? DEFAULT_CACHE_TTL,
+          field || "",
+          options || {}
+        );
+      })
+    );
+  }
+
+  await Promise.all(waiting);
+  return results as { [K in keyof T]: T[K] | null };
+}
+
+/**
+ * Create a cache fetcher that gets an object from the data provider with `FetchRequest.getObject()`.
+ * Use it for `getManyCached()` items; `getObjectCached()` uses it for single objects.
+ *
+ * @param cookie - Cookie to use for the request to the data provider
+ * @param path - Path to pass to `FetchRequest.getObject()`
+ * @returns Fetcher that resolves to the object; null if something went wrong
+ */
+export function getObjectFetcher<T = unknown>(
+  cookie: string,
+  path: string
+): CacheFetcher<T> {
+  return async () => {
+    const request = new FetchRequest({ cookie: cookie || undefined });
+    const data = (await request.getObject(path)).optional();
+    return data as T;
+  };
+}
+
 /**
  * Convenience function for API endpoint caching. Use this for caching data fetched from the data
  * provider API's `getObject()` method.
@@ -120,22 +848,22 @@ export async function getCachedDataFetch<T = unknown>(
  * @param key - Key identifying the data in the cache
  * @param path - Path to pass to `FetchRequest.getObject()`
  * @param [ttl] - Time to live for the cached data in seconds. Default is one hour
+ * @param [options] - Options, e.g. to also cache the object in this process's memory
  * @returns Promise that resolves to the cached or fetched data; null if something went wrong
  */
 export async function getObjectCached<T = unknown>(
   cookie: string,
   key: string,
   path: string,
-  ttl?: number
+  ttl?: number,
+  options?: CacheOptions
 ): Promise<T | null> {
   return await getCachedDataFetch<T>(
     key,
-    async () => {
-      const request = new FetchRequest({ cookie: cookie || undefined });
-      const data = (await request.getObject(path)).optional();
-      return data as T;
-    },
-    ttl
+    getObjectFetcher<T>(cookie, path),
+    ttl,
+    "",
+    options
   );
 }
 
@@ -145,18 +873,36 @@ export async function getObjectCached<T = unknown>(
  * unavailable.
  *
  * @param key - Key identifying the data in the cache
+ * @param [options] - Options, e.g. to also cache the data in this process's memory
  * @returns Promise that resolves to the cached data, or null if not found or error occurred
  */
 export async function getCachedData<T = unknown>(
-  key: string
+  key: string,
+  options: CacheOptions = {}
 ): Promise<T | null> {
+  if (options.memoryTtl > 0) {
+    const memoryData = memoryCache.get<T>(key);
+    if (memoryData !== undefined) {
+      countCacheEvent(key, "memoryHits");
+      return memoryData;
+    }
+  }
+
   const redisClient = await getCacheClient();
   if (redisClient) {
     try {
-      const cachedData = await redisClient.get(key);
-      return cachedData && typeof cachedData === "string"
-        ? (JSON.parse(cachedData) as T)
-        : null;
+      const cachedData = await readCachedValue(redisClient, key, "");
+      if (!cachedData || typeof cachedData !== "string") {
+        redisStats.misses += 1;
+        countCacheEvent(key, "misses");
+        return null;
+      }
+      const { data, size } = await decodeCacheValue<T>(cachedData);
+      redisStats.hits += 1;
+      countCacheEvent(key, "hits");
+      recordValueBytes(key, "bytesRead", cachedData);
+      setMemoryCachedData(key, data, size, options.memoryTtl, options);
+      return data;
     } catch (error) {
       console.error(`Cache retrieval error for key ${key}:`, error);
       return null;
@@ -179,9 +925,13 @@ export async function setCachedData(
   data: unknown,
   ttl: number = DEFAULT_CACHE_TTL
 ): Promise<void> {
+  // Don't let this process keep serving the old data from memory.
+  memoryCache.delete(key);
   const redisClient = await getCacheClient();
   if (redisClient) {
-    await redisClient.set(key, JSON.stringify(data), { EX: ttl });
+    const { value } = await encodeCacheValue(data);
+    await redisClient.set(key, value, { EX: ttl });
+    recordValueBytes(key, "bytesWritten", value);
   }
 }
 
@@ -200,10 +950,17 @@ export async function getCachedDataWithField<T = unknown>(
   const redisClient = await getCacheClient();
   if (redisClient) {
     try {
-      const cachedData = await redisClient.hGet(key, field);
-      return cachedData && typeof cachedData === "string"
-        ? (JSON.parse(cachedData) as T)
-        : null;
+      const cachedData = await readCachedValue(redisClient, key, field);
+      if (!cachedData || typeof cachedData !== "string") {
+        redisStats.misses += 1;
+        countCacheEvent(key, "misses");
+        return null;
+      }
+      const { data } = await decodeCacheValue<T>(cachedData);
+      redisStats.hits += 1;
+      countCacheEvent(key, "hits");
+      recordValueBytes(key, "bytesRead", cachedData);
+      return data;
     } catch (error) {
       console.error(
         `Cache hash retrieval error for key ${key}, field ${field}:`,
@@ -230,11 +987,17 @@ export async function setCachedDataWithField(
   data: unknown,
   ttl: number = DEFAULT_CACHE_TTL
 ): Promise<void> {
+  memoryCache.delete(getMemoryCacheKey(key, field));
   const redisClient = await getCacheClient();
   if (redisClient) {
     try {
-      await redisClient.hSet(key, field, JSON.stringify(data));
-      await redisClient.expire(key, ttl);
+      const { value } = await encodeCacheValue(data);
+      await redisClient
+        .multi()
+        .hSet(key, field, value)
+        .expire(key, ttl)
+        .exec();
+      recordValueBytes(key, "bytesWritten", value);
     } catch (error) {
       console.error(
         `Cache hash set error for key ${key}, field ${field}:`,
@@ -243,3 +1006,66 @@ export async function setCachedDataWithField(
     }
   }
 }
+
+/**
+ * Invalidate cache tags for all server processes. Data cached with any of these tags stops getting
+ * used, so the next request for it fetches it again. This process stops using the data right
+ * away, and other processes within `TAG_GENERATION_REFRESH` seconds.
+ *
+ * @param tags - Tags to invalidate
+ * @returns Promise that resolves when the tags have been invalidated
+ */
+export async function invalidateCacheTags(tags: string[]): Promise<void> {
+  const redisClient = await getCacheClient();
+  if (redisClient && tags.length > 0) {
+    try {
+      const transaction = redisClient.multi();
+      tags.forEach((tag) => {
+        transaction.incr(TAG_GENERATION_KEY_PREFIX + tag);
+      });
+      const generations = (await transaction.exec()) as unknown[];
+      const refreshAt = Date.now() + TAG_GENERATION_REFRESH * 1000;
+      tags.forEach((tag, i) => {
+        tagGenerations.set(tag, {
+          generation: Number(generations[i]),
+          refreshAt,
+        });
+      });
+    } catch (error) {
+      console.error(`Cache tag invalidation error for ${tags}:`, error);
+    }
+  }
+}
+
+/**
+ * Invalidate cache tags when a value from some source changes, e.g. the data provider's version.
+ * Every server process can report the value it sees; only the first one to report a new value
+ * invalidates the tags. The first value reported for a source only gets recorded.
+ *
+ * @param source - Name of the source of the value
+ * @param value - Current value from the source
+ * @param tags - Tags to invalidate when the value changes
+ * @returns Promise that resolves to true if the value changed and the tags got invalidated
+ */
+export async function invalidateCacheTagsOnChange(
+  source: string,
+  value: string,
+  tags: string[]
+): Promise<boolean> {
+  const redisClient = await getCacheClient();
+  if (redisClient) {
+    try {
+      const previousValue = await redisClient.getSet(
+        TAG_SOURCE_KEY_PREFIX + source,
+        value
+      );
+      if (previousValue !== null && previousValue !== value) {
+        await invalidateCacheTags(tags);
+        return true;
+      }
+    } catch (error) {
+      console.error(`Cache tag source error for ${source}:`, error);
+    }
+  }
+  return false;
+}
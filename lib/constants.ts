@@ -28,6 +28,15 @@ export const CACHE_URL = serverRuntimeConfig.CACHE_URL as string;
  */
 export const UI_VERSION = publicRuntimeConfig.UI_VERSION as string;
 
+/**
+ * True if the data provider accepts searches as POST requests with JSON bodies, letting
+ * `FetchRequest` send searches too long for a URL in one request. Set the `BULK_SEARCH_POST`
+ * environment variable to `true` to enable these.
+ */
+export const BULK_SEARCH_POST_ENABLED = Boolean(
+  publicRuntimeConfig.BULK_SEARCH_POST_ENABLED
+);
+
 /**
  * Auth0
  */
@@ -38,7 +38,13 @@ import { ok, err, Result, Ok } from "./result";
 // node_modules
 import pako from "pako";
 // lib
-import { API_URL, SERVER_URL, BACKEND_URL, MAX_URL_LENGTH } from "./constants";
+import {
+  API_URL,
+  SERVER_URL,
+  BACKEND_URL,
+  BULK_SEARCH_POST_ENABLED,
+  MAX_URL_LENGTH,
+} from "./constants";
 
 /**
  * Node.js HTTP/HTTPS Agent classes for persistent connections.
@@ -127,6 +133,55 @@ export interface ErrorObject {
   title: string;
 }
 
+/**
+ * Timing of one object request from `getMultipleObjects()`.
+ *
+ * @property path - Path of the requested object
+ * @property durationMs - Milliseconds from sending the request until the object got parsed,
+ *   excluding any time waiting for a free request slot; 0 for objects from the cache
+ * @property queuedMs - Milliseconds the request waited for a free request slot
+ * @property ok - True if the request succeeded
+ * @property cached - True if the object came from the `cache` option instead of a new request
+ */
+export interface ObjectRequestTiming {
+  path: string;
+  durationMs: number;
+  queuedMs: number;
+  ok: boolean;
+  cached: boolean;
+}
+
+/**
+ * Timing of a whole `getMultipleObjects()` call.
+ *
+ * @property totalMs - Milliseconds until all the objects arrived
+ * @property concurrency - Maximum number of requests in flight at once
+ * @property requests - Timing of each distinct path, in the order the paths first appear
+ */
+export interface MultipleObjectsTiming {
+  totalMs: number;
+  concurrency: number;
+  requests: ObjectRequestTiming[];
+}
+
+/**
+ * Options for `getMultipleObjects()`.
+ *
+ * @property filterErrors - True to filter errored requests from the returned array
+ * @property concurrency - Maximum number of requests in flight at once; `MAX_SOCKETS` by default
+ *   to match the connection pool
+ * @property cache - Requests already made for each path, shared between calls, e.g. for the
+ *   duration of one page render. Paths in it don't get requested again, and new requests get
+ *   added to it. Failed requests get removed so that later calls retry them
+ * @property onTiming - Called with the timing of the requests once all of them complete
+ */
+export interface MultipleObjectsOptions<T> {
+  filterErrors?: boolean;
+  concurrency?: number;
+  cache?: Map<string, Promise<Result<T, ErrorObject>>>;
+  onTiming?: (timing: MultipleObjectsTiming) => void;
+}
+
 /**
  * fetch() methods that allow a `body` in the options object.
  */
@@ -211,6 +266,33 @@ Object.freeze(NETWORK_ERROR_RESPONSE);
  */
 const MAX_PATH_QUERY_LENGTH_ESTIMATE = 50;
 
+/**
+ * Maximum number of paths to send in the body of each bulk search POST request, keeping each
+ * search and its response a manageable size.
+ */
+const MAX_BULK_SEARCH_POST_PATHS = 1000;
+
+/**
+ * Milliseconds to send only GET searches after the data provider rejects a POST search, before
+ * trying POST searches again.
+ */
+const BULK_SEARCH_POST_RETRY_INTERVAL = 10 * 60 * 1000;
+
+/**
+ * Determine whether the status code of a failed POST search means the data provider rejected the
+ * request itself, e.g. because it doesn't accept POST searches or their CSRF token, rather than
+ * failing for a while. Sending the same POST searches again would fail the same way.
+ *
+ * @param status - Status code of the failed POST search response
+ * @returns True if the data provider rejected the POST search
+ */
+function isBulkSearchPostRejected(status: number): boolean {
+  return (
+    (status >= 400 && status < 500) ||
+    status === HTTP_STATUS_CODE.NOT_IMPLEMENTED
+  );
+}
+
 /**
  * Maximum number of bytes to read from a gzipped text file. This must have a value enough for
  * successful decompression.
@@ -238,6 +320,34 @@ const MAX_FREE_SOCKETS = 5;
  */
 const SOCKET_TIMEOUT = 60000; // 60 seconds
 
+/**
+ * Create a function that runs async tasks with at most `limit` of them running at once. Tasks
+ * beyond the limit wait their turn in the order they got submitted.
+ *
+ * @param limit - Maximum number of tasks to run at once
+ * @returns Function that runs a task once a slot frees up and resolves to its result
+ */
+export function createConcurrencyLimiter(
+  limit: number
+): <R>(task: () => Promise<R>) => Promise<R> {
+  const maxActive = Math.max(1, Math.floor(limit));
+  const waiting: Array<() => void> = [];
+  let active = 0;
+
+  return async <R>(task: () => Promise<R>): Promise<R> => {
+    if (active >= maxActive) {
+      await new Promise<void>((resolve) => waiting.push(resolve));
+    }
+    active += 1;
+    try {
+      return await task();
+    } finally {
+      active -= 1;
+      waiting.shift()?.();
+    }
+  };
+}
+
 /**
  * Log request details with connection type indicator
  */
@@ -302,6 +412,10 @@ export default class FetchRequest {
     InstanceType<typeof import("http").Agent> | undefined;
   private static connectionPoolInitialized = false;
 
+  // Time before which searches too long for a URL skip POST requests because the data provider
+  // rejected one.
+  private static bulkSearchPostRetryTime = 0;
+
   /**
    * Determine whether the response object indicates an error of any kind occurred, whether an
    * error detected by the server, or a network error. Objects without an `@type` property return
@@ -666,37 +780,177 @@ export default class FetchRequest {
   /**
    * Request a number of objects with the given paths, returning each path's resource in an array
    * in the same order as their paths in the given array. Any paths that result in an error
-   * get placed that array entry.
+   * get placed that array entry. At most `options.concurrency` requests run at once so that pages
+   * needing hundreds of objects queue them here instead of flooding the connection pool and the
+   * data provider. Repeated paths only get requested once.
    *
    * @param paths - Array of paths to requested resources
    * @param options - Options for these requests
-   * @param options.filterErrors - True to filter errored requests from the returned array
    * @returns Array of requested objects
    */
   public async getMultipleObjects<T>(
     paths: string[],
-    options = { filterErrors: false }
+    options: MultipleObjectsOptions<T> = {}
   ): Promise<Array<Result<T, ErrorObject>>> {
     logRequest(
       "getMultipleObjects",
       `[${paths.join(", ")}]`,
       this.usingPersistentConnections
     );
-    const results: Array<Result<T, ErrorObject>> =
-      paths.length > 0
-        ? await Promise.all(paths.map(async (path) => this.getObject<T>(path)))
-        : [];
+    const startTime = performance.now();
+    const concurrency = Math.max(1, options.concurrency || MAX_SOCKETS);
+    const requests =
+      options.cache || new Map<string, Promise<Result<T, ErrorObject>>>();
+    const timings = new Map<string, ObjectRequestTiming>();
+
+    // Request each distinct path not already requested, queuing the requests beyond the
+    // concurrency limit.
+    const limit = createConcurrencyLimiter(concurrency);
+    const distinctPaths = [...new Set(paths)];
+    distinctPaths.forEach((path) => {
+      if (requests.has(path)) {
+        return;
+      }
+      const queuedTime = performance.now();
+      const request = limit(async () => {
+        const requestTime = performance.now();
+        const result = await this.getObject<T>(path);
+        timings.set(path, {
+          path,
+          durationMs: performance.now() - requestTime,
+          queuedMs: requestTime - queuedTime,
+          ok: result.isOk(),
+          cached: false,
+        });
+        if (options.cache && result.isErr()) {
+          options.cache.delete(path);
+        }
+        return result;
+      });
+      requests.set(path, request);
+    });
+
+    const results = await Promise.all(paths.map((path) => requests.get(path)));
+
+    if (options.onTiming) {
+      options.onTiming({
+        totalMs: performance.now() - startTime,
+        concurrency,
+        requests: distinctPaths.map(
+          (path) =>
+            timings.get(path) || {
+              path,
+              durationMs: 0,
+              queuedMs: 0,
+              ok: results[paths.indexOf(path)].isOk(),
+              cached: true,
+            }
+        ),
+      });
+    }
 
     return options.filterErrors
       ? results.filter((result) => result.isOk())
       : results;
   }
 
+  /**
+   * Request a search of the data provider's `/search-quick/` endpoint with a GET request.
+   *
+   * @param query - Query string of the search, without the leading "?"
+   * @returns Objects the search found, or an error object if the request fails
+   */
+  private async getSearch<T>(query: string): Promise<Result<T[], ErrorObject>> {
+    const response = await this.getObject(`/search-quick/?${query}`);
+    return response.map((data) => (data["@graph"] || []) as T[]);
+  }
+
+  /**
+   * Request a search of the data provider's `/search-quick/` endpoint with a POST request, sending
+   * the search's query-string parameters as a JSON object in the request body instead of in the
+   * URL. This lets one request carry a search too long for a URL. Once the data provider rejects a
+   * POST search with a 4xx or 501 status, `isBulkSearchPostAvailable` stays false for
+   * `BULK_SEARCH_POST_RETRY_INTERVAL` milliseconds so that callers send GET searches instead of
+   * paying for a failed request each time.
+   *
+   * @param query - Query-string parameters of the search, each mapped to its values
+   * @returns Objects the search found, or an error object if the request fails
+   */
+  private async postSearch<T>(
+    query: Record<string, Array<string> | number>
+  ): Promise<Result<T[], ErrorObject>> {
+    const url = this.pathUrl("/search-quick/");
+    const options = this.buildOptionsWithAgent(url, "POST", {
+      accept: PAYLOAD_FORMAT.JSON,
+      contentType: PAYLOAD_FORMAT.JSON,
+      payload: query,
+    });
+    try {
+      logRequest("postSearch", url, this.usingPersistentConnections);
+      const response = await fetch(url, options);
+      if (!response.ok) {
+        if (isBulkSearchPostRejected(response.status)) {
+          FetchRequest.bulkSearchPostRetryTime =
+            Date.now() + BULK_SEARCH_POST_RETRY_INTERVAL;
+        }
+        const error = {
+          code: response.status,
+          ...(await response.json().catch(() => ({}))),
+          isError: true,
+        } as ErrorObject;
+        return err(error);
+      }
+      const results = (await response.json()) as SearchResults;
+      return ok((results["@graph"] || []) as T[]);
+    } catch (error) {
+      console.log("NETWORK ERROR: ", error);
+      return err(NETWORK_ERROR_RESPONSE);
+    }
+  }
+
+  /**
+   * Determine whether to try POST searches. They stay off unless `BULK_SEARCH_POST_ENABLED` says
+   * the data provider accepts them, and stop for a while after the data provider rejects one.
+   * @returns {boolean} True to try sending searches as POST requests
+   */
+  private static get isBulkSearchPostAvailable(): boolean {
+    return (
+      BULK_SEARCH_POST_ENABLED &&
+      Date.now() >= FetchRequest.bulkSearchPostRetryTime
+    );
+  }
+
+  /**
+   * Run searches with at most `MAX_SOCKETS` requests in flight at once, and combine the objects
+   * they find in the order of the searches.
+   *
+   * @param searches - Functions that each request one search
+   * @returns Objects all the searches found, or the error of the first failed search
+   */
+  private async runSearches<T>(
+    searches: Array<() => Promise<Result<T[], ErrorObject>>>
+  ): Promise<Result<T[], ErrorObject>> {
+    const limit = createConcurrencyLimiter(MAX_SOCKETS);
+    const results = await Promise.all(searches.map((search) => limit(search)));
+
+    const firstError = results.find((r) => r.isErr());
+    if (firstError !== undefined) {
+      // If we found an error, then bail, and we know it's not undefined
+      return firstError;
+    }
+
+    // We know that all the Results in the results list are Ok so we can safely turn them all into
+    // Array<T>. Return the the flattened list wrapped in an Ok
+    return ok(Ok.all(results).flat());
+  }
+
   /**
    * Same as the `getMultipleObjects()` method, but instead of requesting each individual object in
    * parallel, it instead requests a `/search`, passing in the `@id` of every requested object, as
-   * well as the fields needed for each object. This can cause a query string too long to fit in a
-   * URL, so break the paths into groups of paths, each group mapping to an individual request.
+   * well as the fields needed for each object. Paths that fit in one URL take one GET request.
+   * With `BULK_SEARCH_POST_ENABLED`, more paths than that go in the bodies of POST requests of up
+   * to `MAX_BULK_SEARCH_POST_PATHS` paths each. Without POST searches, or if any of them fails,
+   * this breaks the paths into groups that fit in a URL, each group mapping to an individual GET
    * request. Unlike `getMultipleObjects()`, this method never returns an array that could contain
    * entries for failed requests. It instead either returns an array of successfully requested
    * objects, or a single error value.
@@ -732,37 +986,51 @@ export default class FetchRequest {
     // limits.
     const pathGroups = this.pathsIntoPathGroups(paths, fieldQuery.length);
 
+    // Paths needing more than one URL go in the bodies of POST requests instead, each holding many
+    // times the paths of a URL.
+    if (pathGroups.length > 1 && FetchRequest.isBulkSearchPostAvailable) {
+      const postCount = Math.ceil(paths.length / MAX_BULK_SEARCH_POST_PATHS);
+      const postResults = await this.runSearches(
+        Array.from({ length: postCount }, (_, i) => {
+          const postPaths = paths.slice(
+            i * MAX_BULK_SEARCH_POST_PATHS,
+            (i + 1) * MAX_BULK_SEARCH_POST_PATHS
+          );
+          return () =>
+            this.postSearch<T>({
+              ...(types.length > 0 && { type: types }),
+              ...(fields.length > 0 && { field: fields }),
+              "@id": postPaths,
+              limit: postPaths.length,
+            });
+        })
+      );
+      if (postResults.isOk()) {
+        return postResults;
+      }
+    }
+
     // If the type is given, add it to the query string.
     const typeQuery =
       types.length > 0 ? types.map((type) => `type=${type}&`).join("") : "";
 
     // For each group of paths, request the objects as search results. Send these requests in
-    // parallel.
-    const results = await Promise.all(
-      pathGroups.map(async (group) => {
+    // parallel, up to the size of the connection pool.
+    return this.runSearches(
+      pathGroups.map((group) => {
         const pathQuery = group.map((path) => `@id=${path}`).join("&");
         const query = `${fieldQuery ? `${fieldQuery}&` : ""}${pathQuery}`;
-        const response = await this.getObject(
-          `/search-quick/?${typeQuery}${query}&limit=${group.length}`
-        );
-        return response.map((g) => g["@graph"] as T[]);
+        return () =>
+          this.getSearch<T>(`${typeQuery}${query}&limit=${group.length}`);
       })
     );
-
-    const firstError = results.find((r) => r.isErr());
-    if (firstError !== undefined) {
-      // If we found an error, then bail, and we know it's not undefined
-      return firstError;
-    }
-
-    // We know that all the Results in the results list are Ok so we can safely turn them all into
-    // Array<T>. Return the the flattened list wrapped in an Ok
-    return ok(Ok.all(results).flat());
   }
 
   /**
    * Request multiple objects by searching for them by a query string or by a property and
-   * values for that property.
+   * values for that property. With `BULK_SEARCH_POST_ENABLED`, searches too long for a URL go in
+   * the body of a POST request. Without it, or if the data provider doesn't accept that, the values
+   * get split among as many GET requests as needed.
    * @param type Database object type to search (e.g. MeasurementSet)
    * @param fields Fields to retrieve for each object
    * @param options Search options, comprising:
@@ -808,11 +1076,10 @@ export default class FetchRequest {
     }
 
     // Either use the given query string or build one from the property/values.
-    const searchQuery =
-      query ||
-      values
-        .map((value) => `${property}=${encodeURIComponent(value)}`)
-        .join("&");
+    const valueQueries = values.map(
+      (value) => `${property}=${encodeURIComponent(value)}`
+    );
+    const searchQuery = query || valueQueries.join("&");
 
     // Include the fields to retrieve in the search query.
     const searchFields =
@@ -821,17 +1088,56 @@ export default class FetchRequest {
         : "";
 
     // Build the query string using the search elements as well as the object fields, if any.
-    const queryParts = [`type=${type}`, searchFields, searchQuery]
-      .filter(Boolean)
-      .join("&");
-    const finalUri = `/search-quick/?${queryParts}`;
-    if (finalUri.length > MAX_URL_LENGTH) {
-      throw new Error("Search query URI exceeds maximum length");
-    }
+    const baseQuery = [`type=${type}`, searchFields].filter(Boolean).join("&");
+    const queryParts = `${baseQuery}&${searchQuery}`;
+    const fitsInUrl = (searchQueryParts: string) =>
+      `/search-quick/?${searchQueryParts}`.length <= MAX_URL_LENGTH;
 
     // Make the request to the search endpoint and extract the searched objects from the response.
-    const response = await this.getObject(finalUri);
-    return response.map((data) => (data["@graph"] || []) as Array<T>);
+    if (fitsInUrl(queryParts)) {
+      return this.getSearch<T>(queryParts);
+    }
+
+    // Send a search too long for a URL as the body of a POST request.
+    if (FetchRequest.isBulkSearchPostAvailable) {
+      const searchParams: Record<string, string[]> = {};
+      new URLSearchParams(queryParts).forEach((value, key) => {
+        searchParams[key] = [...(searchParams[key] || []), value];
+      });
+      const postResults = await this.postSearch<T>(searchParams);
+      if (postResults.isOk()) {
+        return postResults;
+      }
+    }
+
+    // Without POST searches, split the values into groups that each fit in a URL. Query strings
+    // can't get split without changing their meaning, and neither can a single value too long for
+    // a URL.
+    const valueGroups = valueQueries.reduce(
+      (groups: string[], valueQuery: string) => {
+        const lastGroup = groups[groups.length - 1];
+        if (
+          lastGroup !== undefined &&
+          fitsInUrl(`${baseQuery}&${lastGroup}&${valueQuery}`)
+        ) {
+          groups[groups.length - 1] = `${lastGroup}&${valueQuery}`;
+          return groups;
+        }
+        return [...groups, valueQuery];
+      },
+      []
+    );
+    if (
+      query ||
+      !valueGroups.every((group) => fitsInUrl(`${baseQuery}&${group}`))
+    ) {
+      throw new Error("Search query URI exceeds maximum length");
+    }
+    return this.runSearches(
+      valueGroups.map(
+        (group) => () => this.getSearch<T>(`${baseQuery}&${group}`)
+      )
+    );
   }
 
   /**
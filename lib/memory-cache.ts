@@ -0,0 +1,168 @@
+/**
+ * In-process least-recently-used cache that holds parsed objects for a short time. `lib/cache.ts`
+ * checks this cache before Redis so that frequently requested large objects, like the profiles,
+ * don't need a Redis round trip and a `JSON.parse()` on every server-side render.
+ *
+ * Each Next.js server process has its own memory cache, so entries can differ between processes
+ * for up to their TTL. Keep TTLs short, and treat objects from this cache as read-only because
+ * every caller shares the same instance.
+ *
+ * Use this code only on the Next.js server.
+ */
+
+/**
+ * Default maximum number of entries a memory cache holds before it evicts the least recently
+ * used ones.
+ */
+export const DEFAULT_MEMORY_CACHE_MAX_ENTRIES = 500;
+
+/**
+ * Default maximum total size of the entries in a memory cache, in bytes of their JSON
+ * representation.
+ */
+export const DEFAULT_MEMORY_CACHE_MAX_BYTES = 64 * 1024 * 1024;
+
+/**
+ * Entry in the memory cache.
+ *
+ * @property value - Parsed object
+ * @property size - Size of the object's JSON representation in bytes
+ * @property expiresAt - Timestamp in milliseconds when the entry expires
+ */
+type MemoryCacheEntry = {
+  value: unknown;
+  size: number;
+  expiresAt: number;
+};
+
+/**
+ * Hit and miss counts for a cache tier.
+ *
+ * @property hits - Number of lookups that found an unexpired entry
+ * @property misses - Number of lookups that didn't
+ */
+export type CacheTierStats = {
+  hits: number;
+  misses: number;
+};
+
+/**
+ * Bounded LRU cache. A `Map` keeps its keys in insertion order, so moving an entry to the end on
+ * every read leaves the least recently used entry at the start.
+ */
+export class MemoryCache {
+  readonly maxEntries: number;
+  readonly maxBytes: number;
+  private readonly now: () => number;
+  private readonly entries = new Map<string, MemoryCacheEntry>();
+  private totalBytes = 0;
+  private stats: CacheTierStats = { hits: 0, misses: 0 };
+
+  /**
+   * @param [maxEntries] - Maximum number of entries to hold
+   * @param [maxBytes] - Maximum total size of the entries in bytes
+   * @param [now] - Returns the current time in milliseconds; replace for testing
+   */
+  constructor(
+    maxEntries: number = DEFAULT_MEMORY_CACHE_MAX_ENTRIES,
+    maxBytes: number = DEFAULT_MEMORY_CACHE_MAX_BYTES,
+    now: () => number = () => Date.now()
+  ) {
+    this.maxEntries = maxEntries;
+    this.maxBytes = maxBytes;
+    this.now = now;
+  }
+
+  /**
+   * Get the unexpired value for a key and mark it as recently used.
+   *
+   * @param key - Key identifying the entry
+   * @returns Cached value; undefined if not cached or expired
+   */
+  get<T = unknown>(key: string): T | undefined {
+    const entry = this.entries.get(key);
+    if (entry && entry.expiresAt > this.now()) {
+      this.entries.delete(key);
+      this.entries.set(key, entry);
+      this.stats.hits += 1;
+      return entry.value as T;
+    }
+
+    if (entry) {
+      this.delete(key);
+    }
+    this.stats.misses += 1;
+    return undefined;
+  }
+
+  /**
+   * Add or replace the value for a key, then evict the least recently used entries until the
+   * cache fits within its limits. Values larger than the whole cache don't get cached.
+   *
+   * @param key - Key identifying the entry
+   * @param value - Parsed object to cache
+   * @param size - Size of the object's JSON representation in bytes
+   * @param ttl - Time to live in seconds
+   */
+  set(key: string, value: unknown, size: number, ttl: number): void {
+    this.delete(key);
+    if (ttl <= 0 || size > this.maxBytes) {
+      return;
+    }
+
+    this.entries.set(key, { value, size, expiresAt: this.now() + ttl * 1000 });
+    this.totalBytes += size;
+    for (const oldestKey of this.entries.keys()) {
+      if (
+        this.entries.size <= this.maxEntries &&
+        this.totalBytes <= this.maxBytes
+      ) {
+        break;
+      }
+      this.delete(oldestKey);
+    }
+  }
+
+  /**
+   * Remove the entry for a key if it exists.
+   *
+   * @param key - Key identifying the entry
+   */
+  delete(key: string): void {
+    const entry = this.entries.get(key);
+    if (entry) {
+      this.totalBytes -= entry.size;
+      this.entries.delete(key);
+    }
+  }
+
+  /**
+   * Remove all entries and reset the hit and miss counts.
+   */
+  clear(): void {
+    this.entries.clear();
+    this.totalBytes = 0;
+    this.stats = { hits: 0, misses: 0 };
+  }
+
+  /**
+   * Number of entries in the cache, including expired ones not yet evicted.
+   */
+  get size(): number {
+    return this.entries.size;
+  }
+
+  /**
+   * Total size of the entries in the cache in bytes.
+   */
+  get bytes(): number {
+    return this.totalBytes;
+  }
+
+  /**
+   * Copy of the hit and miss counts since the cache was created or cleared.
+   */
+  getStats(): CacheTierStats {
+    return { ...this.stats };
+  }
+}
@@ -1,11 +1,31 @@
 /**
- * Code to manage the profiles object. Only call this code from the NextJS server.
+ * Code to manage the profiles object and the other objects from the data provider that most
+ * server-side renders need, along with the indexer state and versions that decide when their
+ * cached copies get invalidated. Only call this code from the NextJS server.
  */
 
 // lib
-import { getObjectCached } from "./cache";
+import {
+  getCachedDataFetch,
+  getManyCached,
+  getObjectCached,
+  getObjectFetcher,
+  invalidateCacheTagsOnChange,
+  type CacheOptions,
+} from "./cache";
+import { UI_VERSION } from "./constants";
+import FetchRequest, {
+  HTTP_STATUS_CODE,
+  type ErrorObject,
+} from "./fetch-request";
+import { type VersionsInfo } from "./site-versions";
 // root
-import type { CollectionTitles, Profiles } from "../globals";
+import type {
+  ApiObject,
+  CollectionTitles,
+  DataProviderObject,
+  Profiles,
+} from "../globals";
 
 /**
  * Server cache key for the profiles object.
@@ -22,6 +42,141 @@ const COLLECTION_TITLES_KEY = "collection-titles";
  */
 const COLLECTION_NAMES_KEY = "collection-names";
 
+/**
+ * Server cache key for the indexer-state object.
+ */
+const INDEXER_STATE_KEY = "indexer-state";
+
+/**
+ * Time-to-live for the indexer-state cache in seconds. Short because the indexer state can
+ * change frequently, but balance against making too many requests to the data provider.
+ */
+const INDEXER_STATE_TTL = 60; // 1 minute
+
+/**
+ * Server cache key for the versions object.
+ */
+const VERSIONS_KEY = "versions";
+
+/**
+ * Time-to-live for the versions cache in seconds. A new data provider version invalidates the
+ * server objects, so this bounds how long they can outlive a data provider release.
+ */
+const VERSIONS_TTL = 5 * 60; // 5 minutes
+
+/**
+ * Unknown version string used when a version cannot be determined.
+ */
+const UNKNOWN_VERSION = "unknown";
+
+/**
+ * Cache tag of data that only changes with a new data provider release, like the schemas.
+ */
+export const DATA_PROVIDER_VERSION_TAG = "data-provider-version";
+
+/**
+ * Cache tag of data derived from indexed objects, like search results, which can change whenever
+ * the indexer runs.
+ */
+export const INDEXED_DATA_TAG = "indexed-data";
+
+/**
+ * Milliseconds between checks of the indexer state and data provider version to invalidate the
+ * cache tags above. Matches the indexer-state TTL so each check can see a new state.
+ */
+const DATA_PROVIDER_WATCH_INTERVAL = INDEXER_STATE_TTL * 1000;
+
+/**
+ * Time-to-live for the server objects in seconds. They only change with a new data provider
+ * release, which invalidates them through `DATA_PROVIDER_VERSION_TAG`, so they can stay cached
+ * much longer than the default hour.
+ */
+const SERVER_OBJECT_TTL = 24 * 60 * 60; // 1 day
+
+/**
+ * Number of seconds each server process keeps these objects parsed in memory before checking
+ * Redis again. Nearly every server-side render needs them, and the profiles object is large enough
+ * that parsing it on every request costs noticeable time.
+ */
+const SERVER_OBJECT_MEMORY_TTL = 60;
+
+/**
+ * Number of seconds after these objects expire in Redis that we keep serving them while one
+ * request refreshes them in the background, so that no render waits on the data provider for them
+ * after they expire.
+ */
+const SERVER_OBJECT_STALE_WHILE_REVALIDATE = 600;
+
+/**
+ * Number of seconds one server process can hold the lock to fetch these objects after they drop
+ * out of Redis, e.g. after a deploy. Processes that don't get the lock wait for it to cache them
+ * instead of sending their own requests to the data provider.
+ */
+const SERVER_OBJECT_LOCK_TIMEOUT = 10;
+
+/**
+ * Cache options for all the server objects.
+ */
+const SERVER_OBJECT_CACHE_OPTIONS: CacheOptions = {
+  memoryTtl: SERVER_OBJECT_MEMORY_TTL,
+  staleWhileRevalidate: SERVER_OBJECT_STALE_WHILE_REVALIDATE,
+  lockTimeout: SERVER_OBJECT_LOCK_TIMEOUT,
+  tags: [DATA_PROVIDER_VERSION_TAG],
+};
+
+/**
+ * Reflects the data returned by the data provider's /indexer-info endpoint.
+ */
+type IndexerInfo = {
+  deduplication_dead_letter_queue: {
+    ApproximateNumberOfMessages: number;
+    ApproximateNumberOfMessagesNotVisible: number;
+    ApproximateNumberOfMessagesDelayed: number;
+  };
+  deduplication_queue: {
+    ApproximateNumberOfMessages: number;
+    ApproximateNumberOfMessagesNotVisible: number;
+    ApproximateNumberOfMessagesDelayed: number;
+  };
+  has_indexing_errors: boolean;
+  invalidation_dead_letter_queue: {
+    ApproximateNumberOfMessages: number;
+    ApproximateNumberOfMessagesNotVisible: number;
+    ApproximateNumberOfMessagesDelayed: number;
+  };
+  invalidation_queue: {
+    ApproximateNumberOfMessages: number;
+    ApproximateNumberOfMessagesDelayed: number;
+    ApproximateNumberOfMessagesNotVisible: number;
+  };
+  is_indexing: boolean;
+  transaction_dead_letter_queue: {
+    ApproximateNumberOfMessages: number;
+    ApproximateNumberOfMessagesNotVisible: number;
+    ApproximateNumberOfMessagesDelayed: number;
+  };
+  transaction_queue: {
+    ApproximateNumberOfMessages: number;
+    ApproximateNumberOfMessagesDelayed: number;
+    ApproximateNumberOfMessagesNotVisible: number;
+  };
+};
+
+/**
+ * The simplified indexer state that the UI displays.
+ */
+export type IndexerState = {
+  // True if the data provider is currently indexing.
+  isIndexing: boolean;
+  // The number of transactions remaining in the indexer's invalidation queue.
+  indexingCount: number;
+};
+
+/**
+ * Timer of the data provider watcher; null until `watchDataProvider()` starts it.
+ */
+let dataProviderWatchTimer: ReturnType<typeof setInterval> | null = null;
+
 /**
  * Retrieve the profiles object either from the server cache or by fetching it from the data
  * provider. Profiles from the data provider get cached. Only call this function from code running
@@ -31,7 +186,13 @@ const COLLECTION_NAMES_KEY = "collection-names";
  * @returns Promise that resolves to the profiles object; null if something went wrong
  */
 export async function retrieveProfiles(cookie = ""): Promise<Profiles | null> {
-  return await getObjectCached<Profiles>(cookie, PROFILES_KEY, "/profiles/");
+  return await getObjectCached<Profiles>(
+    cookie,
+    PROFILES_KEY,
+    "/profiles/",
+    SERVER_OBJECT_TTL,
+    SERVER_OBJECT_CACHE_OPTIONS
+  );
 }
 
 /**
@@ -48,7 +209,9 @@ export async function retrieveCollectionTitles(
   return await getObjectCached<CollectionTitles>(
     cookie,
     COLLECTION_TITLES_KEY,
-    "/collection-titles/"
+    "/collection-titles/",
+    SERVER_OBJECT_TTL,
+    SERVER_OBJECT_CACHE_OPTIONS
   );
 }
 
@@ -66,6 +229,233 @@ export async function retrieveCollectionNames(
   return await getObjectCached<Record<string, string>>(
     cookie,
     COLLECTION_NAMES_KEY,
-    "/collection-names/"
+    "/collection-names/",
+    SERVER_OBJECT_TTL,
+    SERVER_OBJECT_CACHE_OPTIONS
   );
 }
+
+/**
+ * Retrieve the profiles, collection-titles, and collection-names objects together. Reads all three
+ * from the server cache in one round trip, and fetches the ones not cached from the data provider
+ * in parallel. Use this instead of the individual functions when a page needs more than one of
+ * them. Only call this function from code running on the NextJS server.
+ *
+ * @param [cookie] - Cookie to use for the requests to the data provider
+ * @returns Promise that resolves to the three objects; each null if something went wrong
+ */
+export async function retrieveServerObjects(cookie = ""): Promise<{
+  profiles: Profiles | null;
+  collectionTitles: CollectionTitles | null;
+  collectionNames: Record<string, string> | null;
+}> {
+  const [profiles, collectionTitles, collectionNames] = await getManyCached<
+    [Profiles, CollectionTitles, Record<string, string>]
+  >([
+    {
+      key: PROFILES_KEY,
+      fetcher: getObjectFetcher<Profiles>(cookie, "/profiles/"),
+      ttl: SERVER_OBJECT_TTL,
+      options: SERVER_OBJECT_CACHE_OPTIONS,
+    },
+    {
+      key: COLLECTION_TITLES_KEY,
+      fetcher: getObjectFetcher<CollectionTitles>(
+        cookie,
+        "/collection-titles/"
+      ),
+      ttl: SERVER_OBJECT_TTL,
+      options: SERVER_OBJECT_CACHE_OPTIONS,
+    },
+    {
+      key: COLLECTION_NAMES_KEY,
+      fetcher: getObjectFetcher<Record<string, string>>(
+        cookie,
+        "/collection-names/"
+      ),
+      ttl: SERVER_OBJECT_TTL,
+      options: SERVER_OBJECT_CACHE_OPTIONS,
+    },
+  ]);
+  return { profiles, collectionTitles, collectionNames };
+}
+
+/**
+ * Fetches the indexer-info data from the data provider and converts it to the simplified
+ * IndexerState format used to display the indexer's status on the UI. Adding a trailing slash to
+ * `/indexer-info` causes a 404.
+ *
+ * @param cookie - Cookie to use for the request to the data provider
+ * @returns Promise that resolves to the indexer state or null if not found
+ */
+async function fetchIndexerInfoData(
+  cookie?: string
+): Promise<IndexerState | null> {
+  const request = new FetchRequest({ cookie });
+
+  try {
+    const response = (await request.getObject("/indexer-info")).union();
+    if (response.isError) {
+      const error = response as ErrorObject;
+      if (error.code === HTTP_STATUS_CODE.NOT_FOUND) {
+        console.warn(
+          "Indexer info endpoint not found - might be normal during deployment"
+        );
+      } else if (error.code >= HTTP_STATUS_CODE.INTERNAL_SERVER_ERROR) {
+        console.error(
+          "Data provider server error for indexer info:",
+          error.description
+        );
+      } else {
+        console.error("Client error fetching indexer info:", error.description);
+      }
+      return null;
+    }
+
+    // Build the IndexerState object from the valid IndexerInfo response.
+    const indexerInfo = response as IndexerInfo;
+    return {
+      isIndexing: indexerInfo.is_indexing,
+      indexingCount: indexerInfo.invalidation_queue.ApproximateNumberOfMessages,
+    };
+  } catch (err) {
+    console.error("Network or parsing error fetching indexer info:", err);
+    return null;
+  }
+}
+
+/**
+ * Retrieve the indexer state either from the server cache or by fetching it from the data
+ * provider. Only call this function from code running on the NextJS server.
+ *
+ * @param [cookie] - Cookie to use for the request to the data provider
+ * @returns Promise that resolves to the indexer state; null if something went wrong
+ */
+export async function retrieveIndexerState(
+  cookie?: string
+): Promise<IndexerState | null> {
+  return await getCachedDataFetch<IndexerState>(
+    INDEXER_STATE_KEY,
+    async () => fetchIndexerInfoData(cookie),
+    INDEXER_STATE_TTL
+  );
+}
+
+/**
+ * Type guard to check if a DataProviderObject is an ApiObject.
+ *
+ * @param obj - Object to check
+ * @returns True if the object is an ApiObject
+ */
+function isApiObject(obj: DataProviderObject): obj is ApiObject {
+  return "app_version" in obj && typeof obj.app_version === "string";
+}
+
+/**
+ * Fetches the version data for the UI and data provider (server). `uiVersion` could return
+ * `unknown` if the UI_VERSION environment variable is not set -- a highly unlikely scenario.
+ * `serverVersion` will return `unknown` if the data provider root endpoint fails or does not
+ * provide an app_version.
+ *
+ * @param cookie - Cookie to use for the request to the data provider
+ * @returns Promise that resolves to the versions info
+ */
+async function fetchVersionsInfoData(cookie?: string): Promise<VersionsInfo> {
+  let uiVersion = UNKNOWN_VERSION;
+  let serverVersion = UNKNOWN_VERSION;
+  const request = new FetchRequest({ cookie });
+  const response = (await request.getObject("/")).optional();
+
+  // Retrieve the server version from the data provider root endpoint.
+  if (response && isApiObject(response)) {
+    // TypeScript now knows response is ApiObject with app_version property
+    serverVersion = response.app_version;
+  } else if (response) {
+    console.warn("API root response missing expected ApiObject properties");
+  } else {
+    console.error("API root endpoint request failed");
+  }
+
+  // Retrieve the UI version from an environment variable. This should always be set during
+  // build time, but handle the case where it isn't just in case.
+  if (UI_VERSION) {
+    uiVersion = UI_VERSION;
+  } else {
+    console.warn("UI_VERSION environment variable is not set");
+  }
+
+  return {
+    uiVersion,
+    serverVersion,
+  };
+}
+
+/**
+ * Retrieve the UI and data provider versions either from the server cache or by fetching them
+ * from the data provider. Only call this function from code running on the NextJS server.
+ *
+ * @param [cookie] - Cookie to use for the request to the data provider
+ * @returns Promise that resolves to the versions info; null if something went wrong
+ */
+export async function retrieveVersionsInfo(
+  cookie?: string
+): Promise<VersionsInfo | null> {
+  return await getCachedDataFetch<VersionsInfo>(
+    VERSIONS_KEY,
+    async () => fetchVersionsInfoData(cookie),
+    VERSIONS_TTL
+  );
+}
+
+/**
+ * Check the indexer state and data provider version, and invalidate the cache tags of the data
+ * they affect when they change: `INDEXED_DATA_TAG` when the indexer finishes indexing, and both
+ * tags when the data provider version changes. Uses the same cached indexer state and versions as
+ * their API endpoints, so checks from all the server processes together make at most one request
+ * to the data provider per TTL. Exported for Jest testing.
+ *
+ * @returns Promise that resolves when the check completes
+ */
+export async function checkDataProvider(): Promise<void> {
+  const [indexerState, versionsInfo] = await Promise.all([
+    retrieveIndexerState(),
+    retrieveVersionsInfo(),
+  ]);
+
+  if (indexerState) {
+    // Record every change of the indexer state, but only invalidate once indexing finishes. Data
+    // cached while indexing stays in use until then.
+    await invalidateCacheTagsOnChange(
+      INDEXER_STATE_KEY,
+      indexerState.isIndexing ? "indexing" : "idle",
+      indexerState.isIndexing ? [] : [INDEXED_DATA_TAG]
+    );
+  }
+  if (versionsInfo && versionsInfo.serverVersion !== UNKNOWN_VERSION) {
+    await invalidateCacheTagsOnChange(
+      VERSIONS_KEY,
+      versionsInfo.serverVersion,
+      [DATA_PROVIDER_VERSION_TAG, INDEXED_DATA_TAG]
+    );
+  }
+}
+
+/**
+ * Start checking the data provider in the background with `checkDataProvider()` every
+ * `DATA_PROVIDER_WATCH_INTERVAL` milliseconds, if not already started. `instrumentation.ts` calls
+ * this once when each server process starts, so data cached with `DATA_PROVIDER_VERSION_TAG` or
+ * `INDEXED_DATA_TAG` gets invalidated without the pages using it starting the watcher. The timer
+ * doesn't keep the server process alive.
+ */
+export function watchDataProvider(): void {
+  if (!dataProviderWatchTimer) {
+    const check = () => {
+      checkDataProvider().catch((error) => {
+        console.error("Data provider watch error:", error);
+      });
+    };
+    dataProviderWatchTimer = setInterval(check, DATA_PROVIDER_WATCH_INTERVAL);
+    dataProviderWatchTimer.unref?.();
+    check();
+  }
+}
@@ -4,8 +4,14 @@
 const UI_VERSION = "8.107.0";
 
 module.exports = {
+  // Production Docker image runs the traced standalone server; see docker/nextjs/start.js.
+  output: "standalone",
   trailingSlash: true,
   reactStrictMode: false,
+  experimental: {
+    // Runs `register()` in instrumentation.ts once when each server process starts.
+    instrumentationHook: true,
+  },
   eslint: {
     // Don't run ESLint during production builds to avoid blocking on pre-existing violations
     ignoreDuringBuilds: true,
@@ -27,6 +33,8 @@ module.exports = {
     PUBLIC_BACKEND_URL:
       process.env.PUBLIC_BACKEND_URL || process.env.BACKEND_URL || "",
     UI_VERSION,
+    // Off until the data provider accepts searches as POST requests.
+    BULK_SEARCH_POST_ENABLED: process.env.BULK_SEARCH_POST === "true",
   },
   async rewrites() {
     return [
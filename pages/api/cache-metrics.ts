@@ -0,0 +1,53 @@
+// node_modules
+import type { NextApiRequest, NextApiResponse } from "next";
+// lib
+import { getCacheStats, type CacheStats } from "../../lib/cache";
+import { getCacheHealth, type CacheHealth } from "../../lib/cache-client";
+import {
+  getCacheMetrics,
+  type CacheFamilyMetrics,
+} from "../../lib/cache-metrics";
+import { HTTP_STATUS_CODE, isHttpMethod } from "../../lib/fetch-request";
+
+/**
+ * The cache metrics returned by this API endpoint.
+ */
+export type CacheMetricsResponse = {
+  // Counters and latency histograms of the cache for each key family.
+  families: Record<string, CacheFamilyMetrics>;
+  // Hit and miss counts for the memory and Redis tiers.
+  tiers: CacheStats;
+  // Health of the Redis connection.
+  health: CacheHealth;
+};
+
+/**
+ * This endpoint returns the metrics of the server cache for the server process that handles the
+ * request, for monitoring. Each server process keeps its own metrics, so repeated requests can
+ * return different values behind a load balancer; the structured log records aggregate all of
+ * them. The health includes Redis error messages naming internal hosts, so the production nginx
+ * config doesn't pass this path through; request it from inside the task on port 3000.
+ *
+ * @param req {NextApiRequest} NextJS API request object.
+ * @param res {NextApiResponse} NextJS API response object.
+ */
+export default function cacheMetrics(
+  req: NextApiRequest,
+  res: NextApiResponse
+): void {
+  // Only allow GET requests for this endpoint.
+  if (!isHttpMethod(req.method, "GET")) {
+    res.status(HTTP_STATUS_CODE.METHOD_NOT_ALLOWED).json({
+      error: "Method not allowed",
+    });
+    return;
+  }
+
+  const metrics: CacheMetricsResponse = {
+    families: getCacheMetrics(),
+    tiers: getCacheStats(),
+    health: getCacheHealth(),
+  };
+  res.setHeader("Cache-Control", "no-store");
+  res.status(HTTP_STATUS_CODE.OK).json(metrics);
+}
@@ -11,6 +11,7 @@ import { requestDatasetSummary } from "../../lib/common-requests";
 import FetchRequest, { HTTP_STATUS_CODE } from "../../lib/fetch-request";
 import { type LabData } from "../../lib/home";
 import { getQueryStringFromServerQuery } from "../../lib/query-utils";
+import { INDEXED_DATA_TAG } from "../../lib/server-objects";
 
 /**
  * Server cache key for the home page lab chart.
@@ -73,11 +74,14 @@ export default async function datasetSummary(
   // Get the cookie from the request headers. Use empty string if missing to allow unauthenticated requests.
   const cookie = req.headers.cookie || "";
 
-  // Request the lab chart data from the cache, or fetch it if it's not in the cache.
+  // Request the lab chart data from the cache, or fetch it if it's not in the cache. The data
+  // gets fetched again once the indexer finishes indexing new data.
   const labData = await getCachedDataFetch<LabData>(
     genLabChartDataCacheKey(queryType),
     async () => fetchHomePageData(cookie, queryString),
-    LAB_CHART_DATA_TTL
+    LAB_CHART_DATA_TTL,
+    "",
+    { tags: [INDEXED_DATA_TAG] }
   );
 
   // Return either the cached or fetched data, or a 404 if something went wrong.
@@ -8,83 +8,11 @@
 // node_modules
 import type { NextApiRequest, NextApiResponse } from "next";
 // lib
-import { getCachedDataFetch } from "../../lib/cache";
-import { UI_VERSION } from "../../lib/constants";
-import FetchRequest, {
-  HTTP_STATUS_CODE,
-  isHttpMethod,
-} from "../../lib/fetch-request";
+import { HTTP_STATUS_CODE, isHttpMethod } from "../../lib/fetch-request";
+import { retrieveVersionsInfo } from "../../lib/server-objects";
 import { type VersionsInfo } from "../../lib/site-versions";
 // root
-import type {
-  ApiErrorObject,
-  ApiObject,
-  DataProviderObject,
-} from "../../globals";
-
-/**
- * Server cache key for the versions object.
- */
-const VERSIONS_KEY = "versions";
-
-/**
- * Time-to-live for the versions cache in seconds.
- */
-const VERSIONS_TTL = 30 * 60; // 30 minutes
-
-/**
- * Unknown version string used when a version cannot be determined.
- */
-const UNKNOWN_VERSION = "unknown";
-
-/**
- * Type guard to check if a DataProviderObject is an ApiObject.
- *
- * @param obj - Object to check
- * @returns True if the object is an ApiObject
- */
-function isApiObject(obj: DataProviderObject): obj is ApiObject {
-  return "app_version" in obj && typeof obj.app_version === "string";
-}
-
-/**
- * Fetches the version data for the UI and data provider (server). `uiVersion` could return
- * `unknown` if the UI_VERSION environment variable is not set -- a highly unlikely scenario.
- * `serverVersion` will return `unknown` if the data provider root endpoint fails or does not
- * provide an app_version.
- *
- * @param cookie - Cookie to use for the request to the data provider
- * @returns Promise that resolves to the versions info
- */
-async function fetchVersionsInfoData(cookie?: string): Promise<VersionsInfo> {
-  let uiVersion = UNKNOWN_VERSION;
-  let serverVersion = UNKNOWN_VERSION;
-  const request = new FetchRequest({ cookie });
-  const response = (await request.getObject("/")).optional();
-
-  // Retrieve the server version from the data provider root endpoint.
-  if (response && isApiObject(response)) {
-    // TypeScript now knows response is ApiObject with app_version property
-    serverVersion = response.app_version;
-  } else if (response) {
-    console.warn("API root response missing expected ApiObject properties");
-  } else {
-    console.error("API root endpoint request failed");
-  }
-
-  // Retrieve the UI version from an environment variable. This should always be set during
-  // build time, but handle the case where it isn't just in case.
-  if (UI_VERSION) {
-    uiVersion = UI_VERSION;
-  } else {
-    console.warn("UI_VERSION environment variable is not set");
-  }
-
-  return {
-    uiVersion,
-    serverVersion,
-  };
-}
+import type { ApiErrorObject } from "../../globals";
 
 /**
  * This endpoint is used to determine the current UI and server software release versions. These
@@ -103,11 +31,7 @@ export default async function versions(
   if (isHttpMethod(req.method, "GET")) {
     // Fetch the versions info from the cache, or fetch from the data provider if it's not in the
     // cache.
-    const versionsInfo = await getCachedDataFetch<VersionsInfo>(
-      VERSIONS_KEY,
-      async () => fetchVersionsInfoData(req.headers.cookie),
-      VERSIONS_TTL
-    );
+    const versionsInfo = await retrieveVersionsInfo(req.headers.cookie);
 
     // Return the cached or fetched versions info, or handle error case.
     if (versionsInfo) {
@@ -17,6 +17,7 @@ import {
   getFileSetTypeConfig,
   requestSummary,
 } from "../lib/home";
+import { INDEXED_DATA_TAG } from "../lib/server-objects";
 
 /**
  * Map file-set types to corresponding icons.
@@ -288,11 +289,14 @@ async function fetchHomePageStatistics(cookie) {
 }
 
 export async function getServerSideProps({ req }) {
+  // The statistics get fetched again once the indexer finishes indexing new data.
   const { processedCount, predictionsCount, rawCount } =
     await getCachedDataFetch(
       STATISTICS_CACHE_KEY,
       async () => fetchHomePageStatistics(req.headers.cookie || ""),
-      STATISTICS_CACHE_TTL
+      STATISTICS_CACHE_TTL,
+      "",
+      { tags: [INDEXED_DATA_TAG] }
     );
 
   return {
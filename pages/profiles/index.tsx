@@ -36,11 +36,7 @@ import {
   type SearchMode,
 } from "../../lib/profiles";
 import { decodeUriElement, encodeUriElement } from "../../lib/query-encoding";
-import {
-  retrieveCollectionNames,
-  retrieveCollectionTitles,
-  retrieveProfiles,
-} from "../../lib/server-objects";
+import { retrieveServerObjects } from "../../lib/server-objects";
 // root
 import type {
   CollectionTitles,
@@ -399,20 +395,12 @@ export default function Profiles({
 }
 
 export async function getServerSideProps({ req }) {
-  const schemas = await retrieveProfiles(req.headers.cookie);
-  if (!schemas) {
-    // 404 page
-    return { notFound: true };
-  }
-
-  const collectionTitles = await retrieveCollectionTitles(req.headers.cookie);
-  if (!collectionTitles) {
-    // 404 page
-    return { notFound: true };
-  }
-
-  const collectionNames = await retrieveCollectionNames(req.headers.cookie);
-  if (!collectionNames) {
+  const {
+    profiles: schemas,
+    collectionTitles,
+    collectionNames,
+  } = await retrieveServerObjects(req.headers.cookie);
+  if (!schemas || !collectionTitles || !collectionNames) {
     // 404 page
     return { notFound: true };
   }